@@ -27,18 +27,18 @@ if os.getenv('PYTHONPATH') == '.' or os.getenv('CI') == 'true':
     # In CI environment, imports are relative to project root
     from src.core.db.fetch_unprocessed_articles import get_unprocessed_articles
     from src.core.utils.lock_manager import acquire_lock, release_lock
-    from src.modules.processing.article_processor import process_article
+    from src.modules.processing.article_processor import process_articles_pipelined
 else:
     # In local environment, imports are relative to src directory
     try:
         from core.db.fetch_unprocessed_articles import get_unprocessed_articles
         from core.utils.lock_manager import acquire_lock, release_lock
-        from modules.processing.article_processor import process_article
+        from modules.processing.article_processor import process_articles_pipelined
     except ImportError:
         # Fallback to src. prefix if relative imports fail
         from src.core.db.fetch_unprocessed_articles import get_unprocessed_articles
         from src.core.utils.lock_manager import acquire_lock, release_lock
-        from src.modules.processing.article_processor import process_article 
+        from src.modules.processing.article_processor import process_articles_pipelined
 
 # Note: find_similar_articles.py now has fetch_recent_embeddings.
 # We might need a different function here if we want *just* the newly processed ones for some reason
@@ -65,19 +65,11 @@ async def main():
         else:
             print(f"Found {len(unprocessed_articles)} unprocessed articles.")
 
-        # Step 2: Process each article through the pipeline
+        # Step 2: Process the articles through the extract -> LLM -> DB -> embed -> upsert stage pipeline
         processed_article_ids = set()
-        processing_tasks = []
 
-        # Create concurrent tasks for processing articles
-        for i, article in enumerate(unprocessed_articles):
-             print(f"\nScheduling article {i+1}/{len(unprocessed_articles)} for processing (ID: {article.get('id', 'N/A')})")
-             task = asyncio.create_task(process_article(article))
-             processing_tasks.append(task)
-
-        # Wait for all processing tasks to complete
-        print(f"\nWaiting for {len(processing_tasks)} article processing tasks to complete...")
-        results = await asyncio.gather(*processing_tasks)
+        print(f"\nProcessing {len(unprocessed_articles)} articles through the staged pipeline...")
+        results = await process_articles_pipelined(unprocessed_articles)
 
         # Collect successfully processed IDs
         processed_count = 0
@@ -93,7 +93,13 @@ async def process_article_batch(batch_articles: List[Dict], batch_num: int, tota
     return successful_count, failed_count
 
 
-async def main():
+async def main(argv: Optional[List[str]] = None):
+    """
+    Run the batched cleanup pipeline.
+
+    Args:
+        argv: Command line arguments (default: sys.argv[1:]).
+    """
     parser = argparse.ArgumentParser(description='Batched Cleanup Pipeline')
     parser.add_argument('--batch-size', type=int, default=10, 
                        help='Number of articles to process per batch (default: 10)')
@@ -106,7 +112,7 @@ async def main():
     parser.add_argument('--dry-run', action='store_true',
                        help='Show what would be processed without actually processing')
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     
     # Validate arguments
     if args.batch_size < 1:
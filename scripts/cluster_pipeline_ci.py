@@ -4,11 +4,13 @@ This version includes additional error handling and resource management
 specifically designed for GitHub Actions CI environment.
 """
 
+import argparse
 import logging
 import os
 import sys
 import time
 from pathlib import Path
+from typing import Callable, List, Optional
 
 # Add src directory to Python path to allow importing project modules
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
@@ -52,7 +54,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def process_new_ci(threshold: float = 0.82, merge_threshold: float = 0.9, max_retries: int = 3) -> None:
+# Credentials the pipeline cannot do anything useful without
+REQUIRED_ENV_VARS = ("SUPABASE_URL", "SUPABASE_KEY")
+
+def process_new_ci(threshold: float = 0.82, merge_threshold: float = 0.9, max_retries: int = 3,
+                   sleep: Callable[[float], None] = time.sleep) -> None:
     """
     CI-optimized article clustering process with enhanced error handling.
     
@@ -60,6 +66,7 @@ def process_new_ci(threshold: float = 0.82, merge_threshold: float = 0.9, max_re
         threshold: Similarity threshold for cluster matching (default: 0.82)
         merge_threshold: Threshold for merging similar clusters (default: 0.9)
         max_retries: Maximum number of retry attempts for failed operations (default: 3)
+        sleep: Called with the backoff delay in seconds between retries (default: time.sleep)
     """
     if not acquire_lock():
         logger.info("Clustering pipeline is already running or lock file exists. Exiting.")
@@ -82,7 +89,7 @@ def process_new_ci(threshold: float = 0.82, merge_threshold: float = 0.9, max_re
                 if attempt == max_retries - 1:
                     logger.error("Max retries reached for old cluster status update. Continuing...")
                 else:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                    sleep(2 ** attempt)  # Exponential backoff
 
         # Step 2: Repair zero centroid clusters with retry logic
         for attempt in range(max_retries):
@@ -97,7 +104,7 @@ def process_new_ci(threshold: float = 0.82, merge_threshold: float = 0.9, max_re
                 if attempt == max_retries - 1:
                     logger.error("Max retries reached for zero centroid repair. Continuing...")
                 else:
-                    time.sleep(2 ** attempt)  # Exponential backoff
+                    sleep(2 ** attempt)  # Exponential backoff
 
         # Step 3: Run main clustering process with retry logic
         clustering_success = False
@@ -115,7 +122,7 @@ def process_new_ci(threshold: float = 0.82, merge_threshold: float = 0.9, max_re
                     logger.error("Max retries reached for main clustering process. Pipeline failed.")
                     raise
                 else:
-                    time.sleep(5 * (attempt + 1))  # Longer backoff for main process
+                    sleep(5 * (attempt + 1))  # Longer backoff for main process
 
         # Step 4: Fix cluster member counts if main clustering succeeded
         if clustering_success:
@@ -133,7 +140,7 @@ def process_new_ci(threshold: float = 0.82, merge_threshold: float = 0.9, max_re
                     if attempt == max_retries - 1:
                         logger.error("Max retries reached for member count verification. Continuing...")
                     else:
-                        time.sleep(2 ** attempt)  # Exponential backoff
+                        sleep(2 ** attempt)  # Exponential backoff
 
         logger.info("=== CI-Optimized Clustering Pipeline Complete ===")
         
@@ -144,9 +151,8 @@ def process_new_ci(threshold: float = 0.82, merge_threshold: float = 0.9, max_re
         release_lock()
         logger.info("--- Clustering lock released. Pipeline shutdown complete. ---")
 
-if __name__ == "__main__":
-    import argparse
-    
+def build_arg_parser() -> argparse.ArgumentParser:
+    """Build the command line parser for the CI clustering pipeline."""
     parser = argparse.ArgumentParser(description='Run CI-optimized article clustering pipeline')
     parser.add_argument('--threshold', type=float, default=0.82,
                         help='Similarity threshold for cluster matching (default: 0.82)')
@@ -154,24 +160,45 @@ if __name__ == "__main__":
                         help='Threshold for merging similar clusters (default: 0.9)')
     parser.add_argument('--max-retries', type=int, default=3,
                         help='Maximum number of retry attempts (default: 3)')
-    
-    args = parser.parse_args()
+    return parser
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """
+    Parse and validate the command line arguments.
+    Invalid values are reported through ``parser.error``, which exits with status 2.
+    """
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
     
     # Validate arguments
     if args.threshold < 0.0 or args.threshold > 1.0:
-        print("error: threshold must be between 0.0 and 1.0", file=sys.stderr)
-        sys.exit(2)
+        parser.error("threshold must be between 0.0 and 1.0")
     
     if args.merge_threshold < 0.0 or args.merge_threshold > 1.0:
-        print("error: merge-threshold must be between 0.0 and 1.0", file=sys.stderr)
-        sys.exit(2)
+        parser.error("merge-threshold must be between 0.0 and 1.0")
         
     if args.max_retries < 1:
-        print("error: max-retries must be at least 1", file=sys.stderr)
-        sys.exit(2)
+        parser.error("max-retries must be at least 1")
+    return args
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Parse the command line and run the CI clustering pipeline.
+    Exits with status 1 before taking the lock if any of REQUIRED_ENV_VARS is unset,
+    rather than failing each database step through its retries.
+    """
+    args = parse_args(argv)
+    
+    missing = [name for name in REQUIRED_ENV_VARS if not os.getenv(name)]
+    if missing:
+        logger.error(f"Required environment variables are not set: {', '.join(missing)}")
+        sys.exit(1)
     
     process_new_ci(
         threshold=args.threshold,
         merge_threshold=args.merge_threshold,
         max_retries=args.max_retries
     )
+
+if __name__ == "__main__":
+    main()
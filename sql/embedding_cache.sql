@@ -0,0 +1,10 @@
+-- Persistent embedding cache read and written by src/core/utils/create_embeddings.py.
+-- Rows are keyed by the SHA-256 hash of "<model>:<content>". Once this table exists,
+-- enable the cache with EMBEDDING_CACHE_TABLE=EmbeddingCache.
+CREATE EXTENSION IF NOT EXISTS vector;
+
+CREATE TABLE IF NOT EXISTS "EmbeddingCache" (
+    key TEXT PRIMARY KEY,
+    vector vector(1536) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
@@ -13,7 +13,8 @@ which orchestrates the overall clustering workflow and not as a standalone scrip
 
 import numpy as np
 import logging
-from typing import Dict, List, Tuple, Optional
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Tuple, Optional
 
 from src.core.clustering.vector_utils import cosine_similarity, normalize_vector_dimensions
 from src.core.clustering.db_access import (
@@ -29,14 +30,26 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Initial row capacity of the pending-article matrix; it doubles when full
+_PENDING_INITIAL_CAPACITY = 64
+
+def _unit_vector(vector: np.ndarray) -> np.ndarray:
+    """Return vector as a flat float32 unit vector, or all zeros if its norm is zero."""
+    row = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(row)
+    return row / norm if norm else np.zeros_like(row)
+
 class ClusterManager:
     """
     Manager class for handling article clustering operations.
 
     Attributes:
         similarity_threshold (float): Minimum similarity score for articles to be considered related.
-        pending_articles (Dict[int, np.ndarray]): Articles not yet assigned to a cluster.
+        pending_articles (Mapping[int, np.ndarray]): Read-only view of the articles not yet assigned
+            to a cluster; change it through add_to_pending/remove_from_pending.
         clusters (List[Tuple[str, np.ndarray, int]]): List of clusters as (cluster_id, centroid, member_count).
+            Assign a new list, or use add_cluster/replace_cluster, rather than mutating it in place,
+            so the stacked centroid matrix used for matching stays in sync.
     """
     def __init__(self, similarity_threshold: float = 0.82, check_old_clusters: bool = True):
         """
@@ -51,13 +64,89 @@ class ClusterManager:
             ValueError: If similarity_threshold is not between 0 and 1.
         """
         self.similarity_threshold = similarity_threshold
-        self.pending_articles: Dict[int, np.ndarray] = {}
+        self._pending_articles: Dict[int, np.ndarray] = {}
+        # Pending articles as unit-normalised rows of one matrix, for find_best_pending_match.
+        # _pending_ids[i] owns row i; rows past len(_pending_ids) are spare capacity.
+        self._pending_ids: List[int] = []
+        self._pending_rows: Dict[int, int] = {}
+        self._pending_matrix: Optional[np.ndarray] = None
+        self._pending_stackable = True
         self.clusters: List[Tuple[str, np.ndarray, int]] = []
         # Check and update cluster statuses if enabled
         if check_old_clusters:
             from src.core.clustering.db_access import update_old_clusters_status
             update_old_clusters_status()
 
+    @property
+    def pending_articles(self) -> Mapping[int, np.ndarray]:
+        return MappingProxyType(self._pending_articles)
+
+    @property
+    def clusters(self) -> List[Tuple[str, np.ndarray, int]]:
+        return self._clusters
+
+    @clusters.setter
+    def clusters(self, clusters: List[Tuple[str, np.ndarray, int]]) -> None:
+        self._clusters = list(clusters)
+        self._cluster_index: Dict[str, int] = {cluster_id: i for i, (cluster_id, _, _) in enumerate(self._clusters)}
+        # Unit-normalised centroids, one row per cluster; built lazily by _get_centroid_matrix
+        self._centroid_matrix: Optional[np.ndarray] = None
+
+    def add_cluster(self, cluster_id: str, centroid: np.ndarray, count: int) -> None:
+        """
+        Append a cluster to the in-memory cluster list.
+        Args:
+            cluster_id (str): The ID of the cluster.
+            centroid (np.ndarray): The centroid of the cluster.
+            count (int): The member count of the cluster.
+        Returns:
+            None
+        """
+        self._cluster_index[cluster_id] = len(self._clusters)
+        self._clusters.append((cluster_id, centroid, count))
+        self._centroid_matrix = None
+
+    def replace_cluster(self, cluster_id: str, centroid: np.ndarray, count: int) -> None:
+        """
+        Replace the centroid and member count of a cluster in the in-memory cluster list.
+        Only the cluster's row of the centroid matrix is recomputed.
+        Args:
+            cluster_id (str): The ID of the cluster to replace.
+            centroid (np.ndarray): The new centroid of the cluster.
+            count (int): The new member count of the cluster.
+        Returns:
+            None
+        Raises:
+            KeyError: If the cluster ID is not in the cluster list.
+        """
+        i = self._cluster_index[cluster_id]
+        self._clusters[i] = (cluster_id, centroid, count)
+        matrix = self._centroid_matrix
+        if matrix is not None:
+            row = _unit_vector(centroid)
+            if row.shape[0] == matrix.shape[1]:
+                matrix[i] = row
+            else:
+                self._centroid_matrix = None
+
+    def _get_centroid_matrix(self) -> Optional[np.ndarray]:
+        """
+        Return the (n_clusters, dim) matrix of unit-normalised centroids, building it if needed.
+        Zero centroids get a zero row, so they score 0.0 like cosine_similarity.
+        Returns None if the centroids do not all share one dimension.
+        """
+        if self._centroid_matrix is not None and self._centroid_matrix.shape[0] == len(self._clusters):
+            return self._centroid_matrix
+        centroids = [np.asarray(centroid, dtype=np.float32).ravel() for _, centroid, _ in self._clusters]
+        if not centroids or len({c.shape[0] for c in centroids}) != 1:
+            self._centroid_matrix = None
+            return None
+        matrix = np.vstack(centroids)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        np.divide(matrix, norms, out=matrix, where=norms > 0)
+        self._centroid_matrix = matrix
+        return matrix
+
     def update_cluster(self, cluster_id: str, old_centroid: np.ndarray, 
                       old_count: int, new_vector: np.ndarray) -> Tuple[np.ndarray, int]:
         """
@@ -119,16 +208,37 @@ class ClusterManager:
         Returns:
             Optional[Tuple[str, np.ndarray, int, float]]: Tuple with cluster ID, centroid, count, and similarity score if a match is found, or None if no suitable match is found.
         """
+        if not self._clusters:
+            return None
+        matrix = self._get_centroid_matrix()
+        vec = np.asarray(article_vec, dtype=np.float32).ravel()
+        if matrix is None or vec.shape[0] != matrix.shape[1]:
+            # Mixed or mismatched dimensions: cosine_similarity handles the downsampling per pair
+            return self._find_best_cluster_match_pairwise(article_vec)
+        norm = np.linalg.norm(vec)
+        if norm == 0:
+            scores = np.zeros(matrix.shape[0], dtype=np.float32)
+        else:
+            # One matrix-vector product scores the article against every cluster
+            scores = matrix @ (vec / norm)
+        # Evaluate all clusters and return the best matching one above the threshold
+        i = int(np.argmax(scores))
+        score = float(scores[i])
+        if score <= self.similarity_threshold:
+            return None
+        cluster_id, centroid, count = self._clusters[i]
+        return cluster_id, centroid, count, score
+
+    def _find_best_cluster_match_pairwise(self,
+                                          article_vec: np.ndarray) -> Optional[Tuple[str, np.ndarray, int, float]]:
+        """Per-cluster fallback for find_best_cluster_match when the centroids cannot be stacked."""
         best_score = self.similarity_threshold
         best_match = None
-        for cluster_id, centroid, count in self.clusters:
+        for cluster_id, centroid, count in self._clusters:
             score = cosine_similarity(article_vec, centroid)
             if score > best_score:
                 best_score = score
                 best_match = (cluster_id, centroid, count, score)
-                
-        # Changed from breaking at first successful match to evaluating all clusters
-        # and returning the best matching one above the threshold
         return best_match
 
     def find_best_pending_match(self, 
@@ -142,9 +252,29 @@ class ClusterManager:
         Returns:
             Optional[Tuple[int, np.ndarray, float]]: Tuple with article ID, vector, and similarity score if a match is found, or None if no suitable match is found.
         """
+        count = len(self._pending_ids)
+        if not count:
+            return None
+        vec = _unit_vector(article_vec)
+        matrix = self._pending_matrix
+        if not self._pending_stackable or vec.shape[0] != matrix.shape[1]:
+            # Mixed or mismatched dimensions: cosine_similarity handles the downsampling per pair
+            return self._find_best_pending_match_pairwise(article_vec)
+        # One matrix-vector product over the occupied rows scores every pending article
+        scores = matrix[:count] @ vec
+        i = int(np.argmax(scores))
+        score = float(scores[i])
+        if score <= self.similarity_threshold:
+            return None
+        article_id = self._pending_ids[i]
+        return article_id, self._pending_articles[article_id], score
+
+    def _find_best_pending_match_pairwise(self,
+                                          article_vec: np.ndarray) -> Optional[Tuple[int, np.ndarray, float]]:
+        """Per-article fallback for find_best_pending_match when the pending vectors cannot be stacked."""
         best_score = self.similarity_threshold
         best_match = None
-        for article_id, vector in self.pending_articles.items():
+        for article_id, vector in self._pending_articles.items():
             score = cosine_similarity(article_vec, vector)
             if score > best_score:
                 best_score = score
@@ -164,7 +294,26 @@ class ClusterManager:
         Raises:
             ValueError: If the vector is not a valid numpy array.
         """
-        self.pending_articles[article_id] = vector
+        self._pending_articles[article_id] = vector
+        row = _unit_vector(vector)
+        matrix = self._pending_matrix
+        if matrix is None:
+            matrix = self._pending_matrix = np.zeros((_PENDING_INITIAL_CAPACITY, row.shape[0]), dtype=np.float32)
+        elif row.shape[0] != matrix.shape[1]:
+            self._pending_stackable = False
+        if self._pending_stackable:
+            i = self._pending_rows.get(article_id)
+            if i is None:
+                i = len(self._pending_ids)
+                if i == matrix.shape[0]:
+                    # Full: double the capacity so appends stay amortised O(1)
+                    matrix = self._pending_matrix = np.concatenate([matrix, np.zeros_like(matrix)])
+                self._pending_rows[article_id] = i
+                self._pending_ids.append(article_id)
+            matrix[i] = row
+        elif article_id not in self._pending_rows:
+            self._pending_rows[article_id] = len(self._pending_ids)
+            self._pending_ids.append(article_id)
         logger.debug(f"Added article {article_id} to pending list")
 
     def remove_from_pending(self, article_id: int) -> None:
@@ -179,8 +328,20 @@ class ClusterManager:
         Raises:
             KeyError: If the article ID is not found in the pending list.
         """
-        if article_id in self.pending_articles:
-            del self.pending_articles[article_id]
+        if article_id in self._pending_articles:
+            del self._pending_articles[article_id]
+            # Move the last row into the freed slot so the occupied rows stay contiguous
+            i = self._pending_rows.pop(article_id)
+            last_id = self._pending_ids.pop()
+            if last_id != article_id:
+                self._pending_ids[i] = last_id
+                self._pending_rows[last_id] = i
+                if self._pending_stackable:
+                    self._pending_matrix[i] = self._pending_matrix[len(self._pending_ids)]
+            if not self._pending_ids:
+                # Empty again: the next article may set a new dimension
+                self._pending_matrix = None
+                self._pending_stackable = True
             logger.debug(f"Removed article {article_id} from pending list")
 
     def update_cluster_statuses(self) -> int:
@@ -214,64 +375,73 @@ class ClusterManager:
             logger.debug("Not enough clusters to consider merging.")
             return False
             
-        merged = False
-        # Make a copy to avoid modifying during iteration
-        clusters_to_check = list(self.clusters)
-        
-        for i, (cluster_id1, centroid1, count1) in enumerate(clusters_to_check):
-            for j, (cluster_id2, centroid2, count2) in enumerate(clusters_to_check[i+1:], i+1):
-                try:
-                    # Compute similarity between cluster centroids
-                    similarity = cosine_similarity(centroid1, centroid2)
-                    
-                    if similarity > merge_threshold:
-                        logger.info(f"Found similar clusters to merge: {cluster_id1} and {cluster_id2} with similarity {similarity:.4f}")
-                        
-                        # Merge the smaller cluster into the larger one for stability
-                        if count1 >= count2:
-                            primary_id, primary_centroid, primary_count = cluster_id1, centroid1, count1
+        for i, j, similarity in self._similar_cluster_pairs(merge_threshold):
+            cluster_id1, centroid1, count1 = self._clusters[i]
+            cluster_id2, centroid2, count2 = self._clusters[j]
+            try:
+                logger.info(f"Found similar clusters to merge: {cluster_id1} and {cluster_id2} with similarity {similarity:.4f}")
+                
+                # Merge the smaller cluster into the larger one for stability
+                if count1 >= count2:
+                    primary_id, primary_centroid, primary_count = cluster_id1, centroid1, count1
 
-                            secondary_id, secondary_centroid, secondary_count = cluster_id2, centroid2, count2
-                        else:
-                            primary_id, primary_centroid, primary_count = cluster_id2, centroid2, count2
-                            secondary_id, secondary_centroid, secondary_count = cluster_id1, centroid1, count1
-                        
-                        # Calculate weighted average of centroids
-                        total_count = primary_count + secondary_count
-                        new_centroid = ((primary_centroid * primary_count) + (secondary_centroid * secondary_count)) / total_count
-                        
-                        # Update the primary cluster in the database
-                        update_cluster_in_db(primary_id, new_centroid, total_count, isContent=False)
-                        
-                        # Reassign articles from secondary cluster to primary cluster in batch
-                        from src.core.clustering.db_access import sb
-                        articles_resp = sb.table("SourceArticles").select("id").eq("cluster_id", secondary_id).execute()
-                        sec_ids = [a["id"] for a in articles_resp.data]
-                        batch_assign_articles_to_cluster([(aid, primary_id) for aid in sec_ids])
-                        
-                        # Delete the secondary cluster from the database
-                        sb.table("clusters").delete().eq("cluster_id", secondary_id).execute()
-                        
-                        # Update the in-memory clusters list
-                        self.clusters = [(id, centroid, count) for id, centroid, count in self.clusters 
-                                        if id != secondary_id]
-                        
-                        # Update the primary cluster in the in-memory list
-                        self.clusters = [(primary_id if id == primary_id else id, 
-                                       new_centroid if id == primary_id else centroid,
-                                       total_count if id == primary_id else count)
-                                      for id, centroid, count in self.clusters]
-                        
-                        merged = True
-                        logger.info(f"Merged cluster {secondary_id} into {primary_id}. New count: {total_count}")
-                        
-                        # Since we modified the clusters list, break out and restart if needed
-                        break
-                    
-                except Exception as e:
-                    logger.error(f"Error comparing clusters {cluster_id1} and {cluster_id2}: {str(e)}")
+                    secondary_id, secondary_centroid, secondary_count = cluster_id2, centroid2, count2
+                else:
+                    primary_id, primary_centroid, primary_count = cluster_id2, centroid2, count2
+                    secondary_id, secondary_centroid, secondary_count = cluster_id1, centroid1, count1
+                
+                # Calculate weighted average of centroids
+                total_count = primary_count + secondary_count
+                new_centroid = ((primary_centroid * primary_count) + (secondary_centroid * secondary_count)) / total_count
+                
+                # Update the primary cluster in the database
+                update_cluster_in_db(primary_id, new_centroid, total_count, isContent=False)
                 
-            if merged:
-                break
+                # Reassign articles from secondary cluster to primary cluster in batch
+                from src.core.clustering.db_access import sb
+                articles_resp = sb.table("SourceArticles").select("id").eq("cluster_id", secondary_id).execute()
+                sec_ids = [a["id"] for a in articles_resp.data]
+                batch_assign_articles_to_cluster([(aid, primary_id) for aid in sec_ids])
                 
-        return merged
\ No newline at end of file
+                # Delete the secondary cluster from the database
+                sb.table("clusters").delete().eq("cluster_id", secondary_id).execute()
+                
+                # Update the in-memory clusters list: drop the secondary, update the primary
+                self.clusters = [(id, new_centroid, total_count) if id == primary_id else (id, centroid, count)
+                                 for id, centroid, count in self._clusters
+                                 if id != secondary_id]
+                
+                logger.info(f"Merged cluster {secondary_id} into {primary_id}. New count: {total_count}")
+                
+                # Since we modified the clusters list, stop here; callers re-run to merge further
+                return True
+                
+            except Exception as e:
+                logger.error(f"Error comparing clusters {cluster_id1} and {cluster_id2}: {str(e)}")
+                
+        return False
+
+    def _similar_cluster_pairs(self, merge_threshold: float):
+        """
+        Yield (i, j, similarity) for cluster pairs i < j whose centroids are more similar than
+        merge_threshold, in the same row-major order as comparing every pair in turn.
+        All pairs are scored at once from the centroid matrix (one matrix product); if the
+        centroids cannot be stacked, each pair is scored with cosine_similarity instead.
+        """
+        matrix = self._get_centroid_matrix()
+        if matrix is not None:
+            similarities = matrix @ matrix.T
+            # Only the strict upper triangle: each pair once, no self-similarity
+            candidates = np.triu(similarities > merge_threshold, k=1)
+            for i, j in np.argwhere(candidates):
+                yield int(i), int(j), float(similarities[i, j])
+            return
+        for i in range(len(self._clusters)):
+            for j in range(i + 1, len(self._clusters)):
+                try:
+                    similarity = cosine_similarity(self._clusters[i][1], self._clusters[j][1])
+                except Exception as e:
+                    logger.error(f"Error comparing clusters {self._clusters[i][0]} and {self._clusters[j][0]}: {str(e)}")
+                    continue
+                if similarity > merge_threshold:
+                    yield i, j, similarity
@@ -11,6 +11,7 @@ from dotenv import load_dotenv
 import os
 import sys
 import logging
+from collections import Counter, defaultdict
 from typing import Dict, List, Tuple, Optional
 from postgrest.exceptions import APIError 
 
@@ -25,6 +26,15 @@ logger = logging.getLogger(__name__)
 
 IS_CI = os.getenv("CI") == 'true' or os.getenv("GITHUB_ACTIONS") == 'true'
 
+# Maximum number of ids per in_() filter; the ids end up in the request URL,
+# so unbounded lists would run into URL length limits (HTTP 414)
+IN_FILTER_CHUNK_SIZE = 200
+
+def _chunks(items: List[str], size: int):
+    """Yield consecutive slices of items holding at most size elements."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
 # Initialize Supabase client with proper error handling
 def init_supabase_client() -> Optional[object]:
     """Initialize the Supabase client with proper error handling.
@@ -443,12 +453,8 @@ def recalculate_cluster_member_counts() -> Dict[str, Tuple[int, int]]:
         logger.error(f"Unexpected error fetching data in recalculate_cluster_member_counts: {e}")
         return {}
 
-    # Build actual counts from articles
-    cluster_articles: Dict[str, List[int]] = {}
-    for row in resp_articles.data:
-        cid = row.get("cluster_id")
-        cluster_articles.setdefault(cid, []).append(row.get("id"))
-    actual_counts = {cid: len(ids) for cid, ids in cluster_articles.items()}
+    # Build actual counts from articles in a single counting pass
+    actual_counts = Counter(row["cluster_id"] for row in resp_articles.data if row.get("cluster_id"))
 
     # Attempt RPC batch processing if available, otherwise fall back to manual
     if hasattr(sb, 'rpc'):
@@ -492,27 +498,30 @@ def recalculate_cluster_member_counts() -> Dict[str, Tuple[int, int]]:
                 return {}
     # Manual fallback when RPC is unavailable or failed
     logger.info("Performing manual batch recalculate cluster member_counts (without RPC)...")
-    # Delete single-member clusters (unassign articles and delete cluster)
+    single_member = [cid for cid, cnt in actual_counts.items() if cnt == 1]
+    to_delete = single_member + [cid for cid in current_counts if cid not in actual_counts]
+    to_upsert = [
+        {"cluster_id": cid, "member_count": cnt}
+        for cid, cnt in actual_counts.items()
+        if cnt > 1 and cid not in current_counts
+    ]
+    # Group changed clusters by their new count so each distinct count is one update
+    to_update: Dict[int, List[str]] = defaultdict(list)
     for cid, cnt in actual_counts.items():
-        if cnt == 1:
-            sb.table("SourceArticles").update({"cluster_id": None}).eq("cluster_id", cid).execute()
-            sb.table("clusters").delete().in_("cluster_id", [cid]).execute()
-    # Delete clusters with no members
-    for cid in current_counts:
-        if cid not in actual_counts:
-            sb.table("clusters").delete().in_("cluster_id", [cid]).execute()
-    # Update clusters with more than one member
-    clusters_to_upsert = []
-    for cid, cnt in actual_counts.items():
-        if cnt > 1:
-            if cid in current_counts:
-                # Update existing cluster
-                sb.table("clusters").update({"member_count": cnt}).eq("cluster_id", cid).execute()
-            else:
-                # This cluster doesn't exist in current_counts, needs to be created
-                clusters_to_upsert.append({"cluster_id": cid, "member_count": cnt})
-    if clusters_to_upsert:
-        sb.table("clusters").upsert(clusters_to_upsert, on_conflict="cluster_id").execute()
+        if cnt > 1 and cid in current_counts and current_counts[cid] != cnt:
+            to_update[cnt].append(cid)
+
+    # Unassign articles from single-member clusters, then delete those and empty clusters
+    # Id lists are sent in bounded chunks to keep each request URL short
+    for chunk in _chunks(single_member, IN_FILTER_CHUNK_SIZE):
+        sb.table("SourceArticles").update({"cluster_id": None}).in_("cluster_id", chunk).execute()
+    for chunk in _chunks(to_delete, IN_FILTER_CHUNK_SIZE):
+        sb.table("clusters").delete().in_("cluster_id", chunk).execute()
+    for cnt, cids in to_update.items():
+        for chunk in _chunks(cids, IN_FILTER_CHUNK_SIZE):
+            sb.table("clusters").update({"member_count": cnt}).in_("cluster_id", chunk).execute()
+    if to_upsert:
+        sb.table("clusters").upsert(to_upsert, on_conflict="cluster_id").execute()
     # Compute discrepancies for all clusters (union of old and new counts)
     discrepancies: Dict[str, Tuple[int, int]] = {}
     for cid in set(current_counts.keys()).union(actual_counts.keys()):
@@ -7,6 +7,7 @@ Designed for both local development and CI environments.
 """
 
 import os
+from functools import lru_cache
 from typing import Literal, Tuple, Optional
 from openai import OpenAI
 from dotenv import load_dotenv
@@ -111,3 +112,13 @@ def initialize_llm_client(model_type: ModelType = "gpt-5-mini") -> Tuple[Optiona
     client = OpenAI(api_key=api_key, base_url=config["base_url"])
     print(f"DEBUG: Using provider='{config.get('provider')}', model='{config['model']}'")
     return client, config["model"]
+
+@lru_cache(maxsize=None)
+def get_llm_client(model_type: ModelType = "gpt-5-mini") -> Tuple[Optional[OpenAI], Optional[str]]:
+    """
+    Return a shared (client, model_name) pair for the requested type, creating it on first use.
+    Modules should call this where the client is needed instead of initializing clients at
+    import time, so importing them stays cheap and free of network/auth side effects.
+    Failed initializations (missing API key outside CI) raise and are not cached.
+    """
+    return initialize_llm_client(model_type)
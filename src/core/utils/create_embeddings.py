@@ -1,8 +1,14 @@
 from openai import OpenAI, APIError, APITimeoutError, RateLimitError, APIConnectionError, APIStatusError
 import os
 import sys 
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
 from dotenv import load_dotenv
-from typing import List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from supabase import create_client, Client
 import numpy as np  
 import logging
@@ -20,6 +26,55 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
+# Embedding model and batching limits for create_and_store_embeddings_batch.
+# The token budget is estimated from character counts (~4 chars per token).
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_BATCH_SIZE = 96
+EMBEDDING_BATCH_MAX_TOKENS = 8000
+# Number of ArticleVector rows buffered before they are written with one bulk insert
+UPSERT_BATCH = int(os.getenv("EMBEDDING_UPSERT_BATCH", "200"))
+# OpenAI Batch API: asynchronous, half-price embeddings for large backfills.
+# Requests are split into jobs within the API's per-job limits (50,000 requests, 200 MB).
+# Submitted jobs are polled every EMBEDDING_BATCH_API_POLL_SECONDS until they reach a final
+# status; jobs still running after EMBEDDING_BATCH_API_MAX_WAIT_SECONDS are cancelled.
+EMBEDDING_BATCH_API_MAX_REQUESTS = 50000
+EMBEDDING_BATCH_API_MAX_BYTES = 200 * 1024 * 1024
+EMBEDDING_BATCH_API_POLL_SECONDS = float(os.getenv("EMBEDDING_BATCH_API_POLL_SECONDS", "30"))
+# The 24h completion window plus an hour of slack for the job to be finalised
+EMBEDDING_BATCH_API_MAX_WAIT_SECONDS = float(os.getenv("EMBEDDING_BATCH_API_MAX_WAIT_SECONDS", str(25 * 3600)))
+_BATCH_API_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+# Embeddings are cached by content hash: an in-process LRU in front of an optional
+# persistent Supabase table (columns "key" and "vector", see sql/embedding_cache.sql).
+# The persistent layer is only used when EMBEDDING_CACHE_TABLE names that table.
+EMBEDDING_CACHE_TABLE = os.getenv("EMBEDDING_CACHE_TABLE") or None
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+_embedding_cache: "OrderedDict[str, List[float]]" = OrderedDict()
+_embedding_cache_lock = threading.Lock()
+
+# Near-duplicate layer: content whose 64-bit SimHash is within SIMHASH_MAX_DISTANCE
+# bits of an in-memory cached entry reuses that entry's embedding. Fingerprints are
+# indexed by _SIMHASH_BANDS bands of 16 bits; a neighbour is only guaranteed to share
+# a band when it differs in fewer bits than there are bands, so larger distances
+# are clamped to _SIMHASH_BANDS - 1.
+_SIMHASH_BANDS = 4
+
+def _bounded_simhash_distance(distance: int) -> int:
+    """Clamp a configured SimHash distance to what the band index can find."""
+    limit = _SIMHASH_BANDS - 1
+    if distance > limit:
+        logger.warning(
+            "EMBEDDING_SIMHASH_DISTANCE=%d exceeds the %d bits the %d-band index can match; using %d",
+            distance, limit, _SIMHASH_BANDS, limit,
+        )
+        return limit
+    return max(distance, 0)
+
+SIMHASH_MAX_DISTANCE = _bounded_simhash_distance(int(os.getenv("EMBEDDING_SIMHASH_DISTANCE", "3")))
+_simhash_bands: Dict[Tuple[int, int], List[str]] = {}
+_simhash_by_key: Dict[str, int] = {}
+_WORD_RE = re.compile(r"\w+")
+
 # Check if running in CI environment and set a flag
 IS_CI = os.getenv("CI") == 'true' or os.getenv("GITHUB_ACTIONS") == 'true'
 
@@ -42,6 +97,125 @@ elif not IS_CI:
     logger.warning("SUPABASE_URL or SUPABASE_KEY not found in environment. Supabase client-dependent functions will not be functional.")
 
 
+def _cache_key(content: str, model: str = EMBEDDING_MODEL) -> str:
+    """Cache key for the embedding of ``content`` produced by ``model``."""
+    return hashlib.sha256(f"{model}:{content}".encode("utf-8")).hexdigest()
+
+def _remember_embedding(key: str, embedding: List[float]) -> None:
+    """Add an embedding to the in-process LRU, evicting the least recently used entry when full."""
+    with _embedding_cache_lock:
+        _embedding_cache[key] = embedding
+        _embedding_cache.move_to_end(key)
+        if len(_embedding_cache) > EMBEDDING_CACHE_MAX_ENTRIES:
+            evicted, _ = _embedding_cache.popitem(last=False)
+            _forget_simhash(evicted)
+
+def _simhash(text: str) -> Optional[int]:
+    """
+    64-bit SimHash of the lower-cased words in ``text`` (None if it has no words).
+    Punctuation and whitespace changes leave the fingerprint unchanged; small
+    wording changes flip only a few bits.
+    """
+    counts = Counter(_WORD_RE.findall(text.lower()))
+    if not counts:
+        return None
+    digests = b"".join(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest() for token in counts)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    weights = np.fromiter(counts.values(), dtype=np.int64) @ (2 * bits.astype(np.int64) - 1)
+    return int(np.packbits(weights > 0, bitorder="little").view("<u8")[0])
+
+def _simhash_band_keys(fingerprint: int) -> List[Tuple[int, int]]:
+    return [(band, (fingerprint >> (16 * band)) & 0xFFFF) for band in range(_SIMHASH_BANDS)]
+
+def _forget_simhash(key: str) -> None:
+    """Drop ``key`` from the near-duplicate index. Caller must hold _embedding_cache_lock."""
+    fingerprint = _simhash_by_key.pop(key, None)
+    if fingerprint is None:
+        return
+    for band_key in _simhash_band_keys(fingerprint):
+        members = _simhash_bands.get(band_key)
+        if members is not None:
+            members.remove(key)
+            if not members:
+                del _simhash_bands[band_key]
+
+def _index_simhash(key: str, fingerprint: Optional[int]) -> None:
+    """Make the cached embedding under ``key`` findable by near-duplicate content."""
+    if fingerprint is None:
+        return
+    with _embedding_cache_lock:
+        if key not in _embedding_cache or key in _simhash_by_key:
+            return
+        _simhash_by_key[key] = fingerprint
+        for band_key in _simhash_band_keys(fingerprint):
+            _simhash_bands.setdefault(band_key, []).append(key)
+
+def _near_duplicate_embedding(fingerprint: Optional[int]) -> Optional[List[float]]:
+    """Return the cached embedding of content within SIMHASH_MAX_DISTANCE bits of ``fingerprint``."""
+    if fingerprint is None:
+        return None
+    with _embedding_cache_lock:
+        for band_key in _simhash_band_keys(fingerprint):
+            for key in _simhash_bands.get(band_key, ()):
+                if (_simhash_by_key[key] ^ fingerprint).bit_count() > SIMHASH_MAX_DISTANCE:
+                    continue
+                embedding = _embedding_cache.get(key)
+                if embedding is not None:
+                    _embedding_cache.move_to_end(key)
+                    return embedding
+    return None
+
+def _lookup_cached_embeddings(keys: Iterable[str]) -> Dict[str, List[float]]:
+    """
+    Look up cached embeddings, first in memory and then in EMBEDDING_CACHE_TABLE, if set.
+    All keys missing from memory are fetched with a single Supabase query. A failed
+    lookup is treated as a cache miss.
+    Args:
+        keys (Iterable[str]): Cache keys built with _cache_key.
+    Returns:
+        Dict[str, List[float]]: The embeddings that were found, by key.
+    """
+    found: Dict[str, List[float]] = {}
+    missing: List[str] = []
+    with _embedding_cache_lock:
+        for key in keys:
+            embedding = _embedding_cache.get(key)
+            if embedding is None:
+                missing.append(key)
+            else:
+                _embedding_cache.move_to_end(key)
+                found[key] = embedding
+
+    if missing and EMBEDDING_CACHE_TABLE and supabase_client is not None:
+        try:
+            response = supabase_client.table(EMBEDDING_CACHE_TABLE).select("key, vector").in_("key", missing).execute()
+            for row in response.data or []:
+                vector = row["vector"]
+                # pgvector columns come back as their text representation
+                if isinstance(vector, str):
+                    vector = json.loads(vector)
+                if isinstance(vector, list):
+                    found[row["key"]] = vector
+                    _remember_embedding(row["key"], vector)
+        except Exception as e:
+            logger.warning("Embedding cache lookup failed, computing embeddings instead: %s", e)
+    return found
+
+def _cache_embeddings(embeddings: Dict[str, List[float]]) -> None:
+    """Store freshly computed embeddings in memory and in EMBEDDING_CACHE_TABLE, if set."""
+    if not embeddings:
+        return
+    for key, embedding in embeddings.items():
+        _remember_embedding(key, embedding)
+    if not EMBEDDING_CACHE_TABLE or supabase_client is None:
+        return
+    try:
+        rows = [{"key": key, "vector": embedding} for key, embedding in embeddings.items()]
+        supabase_client.table(EMBEDDING_CACHE_TABLE).upsert(rows, on_conflict="key").execute()
+    except Exception as e:
+        logger.warning("Failed to persist %d embeddings to the embedding cache: %s", len(embeddings), e)
+
+
 def create_embedding(text: str, article_id: Optional[int] = None) -> Optional[List[float]]:
     """
     Create an embedding for the given text using OpenAI's API.
@@ -69,13 +243,26 @@ def create_embedding(text: str, article_id: Optional[int] = None) -> Optional[Li
          logger.error("OpenAI client is not configured with an API key. Cannot create embedding for article_id: %s.", article_id)
          return None
 
+    key = _cache_key(text)
+    cached = _lookup_cached_embeddings([key])
+    if key in cached:
+        return cached[key]
+    fingerprint = _simhash(text)
+    near_duplicate = _near_duplicate_embedding(fingerprint)
+    if near_duplicate is not None:
+        logger.info("Reusing the embedding of near-duplicate content for article_id %s.", article_id)
+        return near_duplicate
+
     try:
         response = openai_client_instance.embeddings.create(
-            model="text-embedding-3-small",
+            model=EMBEDDING_MODEL,
             input=text,
             encoding_format="float"
         )
-        return response.data[0].embedding
+        embedding = response.data[0].embedding
+        _cache_embeddings({key: embedding})
+        _index_simhash(key, fingerprint)
+        return embedding
     except APITimeoutError as e:
         logger.error("OpenAI APITimeoutError for article_id %s: %s", article_id, e)
         return None
@@ -182,4 +369,295 @@ def create_and_store_embedding(article_id: int, content: str) -> None:
     except Exception as e:
         # This catch block is for unexpected errors in normalize_embedding or during the call to store_embedding,
         # though store_embedding now also has its own internal error handling.
-        logger.error("Error during embedding normalization or dispatching to storage for article %s: %s", article_id, e, exc_info=True)
\ No newline at end of file
+        logger.error("Error during embedding normalization or dispatching to storage for article %s: %s", article_id, e, exc_info=True)
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token count used to size embedding batches without a tokenizer."""
+    return len(text) // 4 + 1
+
+
+def iter_embedding_batches(articles: List[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Split articles into batches of at most batch_size items and about EMBEDDING_BATCH_MAX_TOKENS tokens.
+    An article that is larger than the token budget on its own gets a batch to itself.
+    """
+    batch: List[Dict[str, Any]] = []
+    batch_tokens = 0
+    for article in articles:
+        tokens = _estimate_tokens(article["content"])
+        if batch and (len(batch) >= batch_size or batch_tokens + tokens > EMBEDDING_BATCH_MAX_TOKENS):
+            yield batch
+            batch, batch_tokens = [], 0
+        batch.append(article)
+        batch_tokens += tokens
+    if batch:
+        yield batch
+
+
+def _resolve_from_cache(
+    articles: List[Dict[str, Any]], keys: List[str]
+) -> Tuple[Dict[str, List[float]], Dict[str, Dict[str, Any]], Dict[str, Optional[int]]]:
+    """
+    Look articles up in the embedding cache and the near-duplicate index.
+    Returns the embeddings found (by key), the first article for every key missing from the
+    exact cache, and the SimHash fingerprints of those articles. Keys of first_article that are
+    not in the returned embeddings still have to be sent to OpenAI.
+    """
+    cached = _lookup_cached_embeddings(keys)
+    # Articles with identical content (e.g. syndicated stories) share one key;
+    # each distinct uncached content is embedded once and fanned out to all of them
+    first_article: Dict[str, Dict[str, Any]] = {}
+    for key, article in zip(keys, articles):
+        if key not in cached:
+            first_article.setdefault(key, article)
+    fingerprints = {key: _simhash(article["content"]) for key, article in first_article.items()}
+    for key, fingerprint in fingerprints.items():
+        near_duplicate = _near_duplicate_embedding(fingerprint)
+        if near_duplicate is not None:
+            logger.info("Reusing the embedding of near-duplicate content for article_id %s.", first_article[key]["id"])
+            cached[key] = near_duplicate
+    return cached, first_article, fingerprints
+
+def create_embeddings_batch(articles: List[Dict[str, Any]]) -> List[Optional[List[float]]]:
+    """
+    Create embeddings for several articles with a single OpenAI request.
+    Articles whose content is already in the embedding cache are not sent to OpenAI.
+    If the batched request fails, or its response does not hold one embedding per input, every
+    article is retried on its own through create_embedding so that one bad input does not fail
+    the whole batch.
+    Args:
+        articles (List[Dict[str, Any]]): Articles with "id" and "content" keys.
+    Returns:
+        List[Optional[List[float]]]: One embedding per article (in order), None where creation failed.
+    """
+    if openai_client_instance is None or not getattr(openai_client_instance, 'api_key', None):
+        logger.error("OpenAI client is not initialized or has no API key. Cannot create embeddings for articles %s.", tuple(article["id"] for article in articles))
+        return [None] * len(articles)
+
+    keys = [_cache_key(article["content"]) for article in articles]
+    cached, first_article, fingerprints = _resolve_from_cache(articles, keys)
+    pending = [key for key in first_article if key not in cached]
+    if not pending:
+        return [cached[key] for key in keys]
+
+    try:
+        response = openai_client_instance.embeddings.create(
+            model=EMBEDDING_MODEL,
+            input=[first_article[key]["content"] for key in pending],
+            encoding_format="float"
+        )
+        # The API returns one item per input, in input order; anything else cannot be mapped back
+        if len(response.data) != len(pending):
+            raise ValueError(f"expected {len(pending)} embeddings, got {len(response.data)}")
+    except Exception as e:
+        logger.warning("Batched embedding request failed (%s); retrying %d articles one by one.", e, len(pending))
+        for key in pending:
+            article = first_article[key]
+            embedding = create_embedding(article["content"], article_id=article["id"])
+            if embedding is not None:
+                cached[key] = embedding
+        return [cached.get(key) for key in keys]
+
+    computed = {key: item.embedding for key, item in zip(pending, response.data)}
+    _cache_embeddings(computed)
+    for key in computed:
+        _index_simhash(key, fingerprints[key])
+    cached.update(computed)
+    return [cached[key] for key in keys]
+
+def _split_batch_api_requests(lines: List[str]) -> List[List[str]]:
+    """Group JSONL request lines into jobs within the Batch API's request and file size limits."""
+    groups: List[List[str]] = []
+    group_bytes = 0
+    for line in lines:
+        # Each line is followed by a newline in the uploaded file
+        line_bytes = len(line.encode("utf-8")) + 1
+        if (not groups or len(groups[-1]) >= EMBEDDING_BATCH_API_MAX_REQUESTS
+                or group_bytes + line_bytes > EMBEDDING_BATCH_API_MAX_BYTES):
+            groups.append([])
+            group_bytes = 0
+        groups[-1].append(line)
+        group_bytes += line_bytes
+    return groups
+
+def _wait_for_batch_job(job: Any, poll_interval: float, deadline: float) -> Optional[Any]:
+    """
+    Poll a Batch API job until it reaches a final status.
+    Returns the finished job, or None if it was still running at the deadline (time.monotonic()),
+    in which case the job is cancelled.
+    """
+    while job.status not in _BATCH_API_FINAL_STATUSES:
+        if time.monotonic() >= deadline:
+            logger.error("Embedding batch job %s still %s after the maximum wait; cancelling it.", job.id, job.status)
+            try:
+                openai_client_instance.batches.cancel(job.id)
+            except APIError as e:
+                logger.warning("Failed to cancel embedding batch job %s: %s", job.id, e)
+            return None
+        time.sleep(poll_interval)
+        job = openai_client_instance.batches.retrieve(job.id)
+    return job
+
+def create_embeddings_via_batch_api(
+    articles: List[Dict[str, Any]],
+    poll_interval: float = EMBEDDING_BATCH_API_POLL_SECONDS,
+    max_wait: float = EMBEDDING_BATCH_API_MAX_WAIT_SECONDS,
+) -> List[Optional[List[float]]]:
+    """
+    Create embeddings for many articles through the OpenAI Batch API.
+    The requests are uploaded as JSONL files, split into as many jobs as the Batch API limits
+    require, and processed asynchronously at half the price of interactive calls, so this suits
+    large backfills rather than the live pipeline. The jobs are polled every poll_interval seconds
+    until they finish; any job still running after max_wait seconds is cancelled and its articles
+    get no embedding. Cached and near-duplicate content is not submitted.
+    Args:
+        articles (List[Dict[str, Any]]): Articles with "id" and "content" keys.
+        poll_interval (float): Seconds to wait between job status checks.
+        max_wait (float): Seconds to wait for all jobs before cancelling the unfinished ones.
+    Returns:
+        List[Optional[List[float]]]: One embedding per article (in order), None where creation failed.
+    """
+    if openai_client_instance is None or not getattr(openai_client_instance, 'api_key', None):
+        logger.error("OpenAI client is not initialized or has no API key. Cannot create embeddings for articles %s.", tuple(article["id"] for article in articles))
+        return [None] * len(articles)
+
+    keys = [_cache_key(article["content"]) for article in articles]
+    cached, first_article, fingerprints = _resolve_from_cache(articles, keys)
+    pending = [key for key in first_article if key not in cached]
+    if not pending:
+        return [cached[key] for key in keys]
+
+    # The cache key doubles as custom_id, so results map straight back to their content
+    requests = [
+        json.dumps({
+            "custom_id": key,
+            "method": "POST",
+            "url": "/v1/embeddings",
+            "body": {"model": EMBEDDING_MODEL, "input": first_article[key]["content"], "encoding_format": "float"},
+        })
+        for key in pending
+    ]
+    # Submit every job before waiting on any, so they are processed concurrently
+    jobs = []
+    for group in _split_batch_api_requests(requests):
+        try:
+            input_file = openai_client_instance.files.create(file=("embeddings.jsonl", "\n".join(group).encode("utf-8")), purpose="batch")
+            job = openai_client_instance.batches.create(input_file_id=input_file.id, endpoint="/v1/embeddings", completion_window="24h")
+            logger.info("Submitted embedding batch job %s for %d articles.", job.id, len(group))
+            jobs.append(job)
+        except APIError as e:
+            logger.error("OpenAI APIError submitting an embedding batch job for %d articles: %s", len(group), e, exc_info=True)
+
+    computed: Dict[str, List[float]] = {}
+    deadline = time.monotonic() + max_wait
+    for job in jobs:
+        try:
+            job = _wait_for_batch_job(openai_client_instance.batches.retrieve(job.id), poll_interval, deadline)
+            if job is None:
+                continue
+            if job.status != "completed":
+                logger.error("Embedding batch job %s ended with status %s.", job.id, job.status)
+                continue
+            # Failed requests only appear in the job's error file; no output file means none succeeded
+            output = openai_client_instance.files.content(job.output_file_id).text if job.output_file_id else ""
+        except APIError as e:
+            logger.error("OpenAI APIError during embedding batch job %s: %s", job.id, e, exc_info=True)
+            continue
+
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            response = result.get("response") or {}
+            if response.get("status_code") == 200:
+                computed[result["custom_id"]] = response["body"]["data"][0]["embedding"]
+
+    for key in pending:
+        if key not in computed:
+            logger.error("No embedding returned by the Batch API for article_id %s.", first_article[key]["id"])
+    _cache_embeddings(computed)
+    for key in computed:
+        _index_simhash(key, fingerprints[key])
+    cached.update(computed)
+    return [cached.get(key) for key in keys]
+
+def store_embeddings_batch(rows: List[Dict[str, Any]]) -> bool:
+    """
+    Store several embeddings in the ArticleVector table with one bulk insert.
+    Like store_embedding, this inserts: ArticleVector has no unique constraint on
+    SourceArticle for an upsert to conflict on.
+    Args:
+        rows (List[Dict[str, Any]]): Rows with "embedding" and "SourceArticle" keys.
+    Returns:
+        bool: True if the rows were stored (or there was nothing to store), False otherwise.
+    """
+    if not rows:
+        return True
+
+    article_ids = tuple(row["SourceArticle"] for row in rows)
+    is_ci = os.getenv("CI") == 'true' or os.getenv("GITHUB_ACTIONS") == 'true'
+    if supabase_client is None:
+        if is_ci:
+            logger.warning("Supabase client not initialized in CI. Skipping embedding storage for articles %s.", article_ids)
+        else:
+            logger.error("Supabase client not initialized. Cannot store embeddings for articles %s.", article_ids)
+        return False
+
+    try:
+        supabase_client.table("ArticleVector").insert(rows).execute()
+        logger.info("Successfully stored embeddings for articles %s", article_ids)
+        return True
+    except Exception as e:
+        logger.error("Error storing embeddings for articles %s: %s", article_ids, e, exc_info=True)
+        return False
+
+def create_and_store_embeddings_batch(
+    articles: List[Dict[str, Any]], batch_size: int = EMBEDDING_BATCH_SIZE, use_batch_api: bool = False
+) -> List[int]:
+    """
+    Create and store embeddings for many articles.
+    Batched counterpart of create_and_store_embedding: each batch costs one OpenAI request, and
+    the resulting rows are buffered and written with one Supabase insert per UPSERT_BATCH rows.
+    With use_batch_api, all articles are submitted through the OpenAI Batch API instead, in as
+    few jobs as its limits allow (see create_embeddings_via_batch_api), and batch_size is not used.
+    Args:
+        articles (List[Dict[str, Any]]): Articles with "id" and "content" keys.
+        batch_size (int): Maximum number of articles sent in one OpenAI request.
+        use_batch_api (bool): Embed through the asynchronous OpenAI Batch API.
+    Returns:
+        List[int]: IDs of the articles whose embeddings were stored.
+    Raises:
+        ValueError: If batch_size is less than 1.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+
+    stored_ids: List[int] = []
+    rows: List[Dict[str, Any]] = []
+    if use_batch_api:
+        batches: Iterable[List[Dict[str, Any]]] = [articles] if articles else []
+        embed = create_embeddings_via_batch_api
+    else:
+        batches = iter_embedding_batches(articles, batch_size)
+        embed = create_embeddings_batch
+    for batch in batches:
+        embeddings = embed(batch)
+
+        for article, embedding in zip(batch, embeddings):
+            if embedding is None:
+                logger.info("Embedding creation failed for article %s (see previous errors), skipping storage.", article["id"])
+                continue
+            try:
+                rows.append({"embedding": normalize_embedding(embedding), "SourceArticle": article["id"]})
+            except Exception as e:
+                logger.error("Error during embedding normalization for article %s: %s", article["id"], e, exc_info=True)
+
+        while len(rows) >= UPSERT_BATCH:
+            chunk, rows = rows[:UPSERT_BATCH], rows[UPSERT_BATCH:]
+            if store_embeddings_batch(chunk):
+                stored_ids.extend(row["SourceArticle"] for row in chunk)
+
+    if store_embeddings_batch(rows):
+        stored_ids.extend(row["SourceArticle"] for row in rows)
+    return stored_ids
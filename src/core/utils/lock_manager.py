@@ -8,7 +8,8 @@ import os
 import tempfile
 
 LOCK_FILE_NAME = "pipeline.lock"
-LOCK_FILE_PATH = os.path.join(tempfile.gettempdir(), LOCK_FILE_NAME)
+# PIPELINE_LOCK_FILE overrides the default location, e.g. to give each test run its own lock
+LOCK_FILE_PATH = os.environ.get("PIPELINE_LOCK_FILE", os.path.join(tempfile.gettempdir(), LOCK_FILE_NAME))
 
 def acquire_lock():
     """
@@ -84,10 +84,7 @@ def run_clustering_process(similarity_threshold: float = 0.82, merge_threshold:
             assignments.append((article_id, cluster_id))
             
             # Update the in-memory cluster list
-            cluster_manager.clusters = [
-                (c_id, new_centroid, new_count) if c_id == cluster_id else (c_id, c, ct)
-                for c_id, c, ct in cluster_manager.clusters
-            ]
+            cluster_manager.replace_cluster(cluster_id, new_centroid, new_count)
             continue
         
         # Step 2: Try to match with pending articles
@@ -112,7 +109,7 @@ def run_clustering_process(similarity_threshold: float = 0.82, merge_threshold:
             cluster_manager.remove_from_pending(pending_id)
             
             # Add the new cluster to the in-memory list
-            cluster_manager.clusters.append((cluster_id, new_centroid, new_count))
+            cluster_manager.add_cluster(cluster_id, new_centroid, new_count)
             continue
         
         # Step 3: No match found, add to pending list
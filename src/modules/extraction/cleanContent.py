@@ -17,20 +17,24 @@ Process:
 
 import json
 import os
+import hashlib
 import sys
 import re
 import datetime
+import threading
 from dateutil import parser
 import logging
 from typing import Dict, List, Any, Tuple, Optional
 import tiktoken
 from pathlib import Path
 
-# Add src directory to Python path to allow importing project modules
+# Add the project root to the Python path only when run as a script;
+# importing this module must not mutate sys.path
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
-sys.path.append(str(PROJECT_ROOT))
+if __name__ == "__main__":
+    sys.path.insert(0, str(PROJECT_ROOT))
 
-from src.core.utils.LLM_init import initialize_llm_client, ModelType
+from src.core.utils.LLM_init import get_llm_client, ModelType
 from supabase import create_client, Client
 from dotenv import load_dotenv
 
@@ -69,10 +73,23 @@ else:
 # =========================
 # LLM CLIENT INITIALIZATION
 # =========================
+# Clients are created lazily (and shared) via get_llm_client on first use:
 # Extraction: gpt-5-nano (fast/cheap)
 # Classification: gpt-5-mini (strong enough for this task)
-extract_client, extract_model = initialize_llm_client(model_type="gpt-5-nano")
-classify_client, classify_model = initialize_llm_client(model_type="gpt-5-mini")
+EXTRACT_MODEL_TYPE: ModelType = "gpt-5-nano"
+CLASSIFY_MODEL_TYPE: ModelType = "gpt-5-mini"
+
+# =========================
+# CHUNK-LEVEL LLM CACHE
+# =========================
+# Extracted content is split into content-defined chunks (a boundary follows every
+# line whose hash is 0 mod CDC_BOUNDARY_DIVISOR), so boilerplate shared across
+# articles (bios, team intros, boxscores) yields identical chunks wherever it appears.
+# LLM output is cached per chunk hash and only unseen chunks are sent to the model.
+CDC_BOUNDARY_DIVISOR = int(os.getenv("LLM_CDC_DIVISOR", "8"))
+CHUNK_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CHUNK_CACHE_SIZE", "20000"))
+_chunk_cache: Dict[str, Any] = {}
+_chunk_cache_lock = threading.Lock()
 
 
 def load_extracted_content(file_path: str) -> Dict[str, Any]:
@@ -147,19 +164,68 @@ def chunk_text(text: str, max_tokens: int, model: str) -> List[str]:
     return chunks
 
 
+def content_defined_chunks(text: str, divisor: int = CDC_BOUNDARY_DIVISOR) -> List[str]:
+    """
+    Split ``text`` into variable-length chunks at content-defined line boundaries.
+    A chunk ends after every non-blank line whose blake2b hash is 0 mod ``divisor``,
+    so identical runs of lines produce identical chunks regardless of their position.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    for line in text.split("\n"):
+        current.append(line)
+        if not line.strip():
+            continue
+        digest = hashlib.blake2b(line.encode("utf-8"), digest_size=8).digest()
+        if int.from_bytes(digest[:4], "little") % divisor == 0:
+            chunks.append("\n".join(current))
+            current = []
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def _chunk_cache_key(model: str, kind: str, chunk: str) -> str:
+    """
+    Cache key for the LLM output of ``chunk``; outputs are kept per model and prompt kind.
+    """
+    return hashlib.blake2b(f"{model}\0{kind}\0{chunk}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _cache_chunk_result(key: str, value: Any) -> None:
+    """
+    Store a chunk result, evicting the oldest entry once the cache is full.
+    """
+    with _chunk_cache_lock:
+        if key not in _chunk_cache and len(_chunk_cache) >= CHUNK_CACHE_MAX_ENTRIES:
+            _chunk_cache.pop(next(iter(_chunk_cache)))
+        _chunk_cache[key] = value
+
+
 def extract_content_with_llm(content: str) -> Dict[str, str]:
     """
     Extract article content using the configured LLM:
     - Try gpt-5-nano first (fast/cheap)
     - Escalate to gpt-5-mini if results look weak (empty title + short content, or bad date parse)
-    Uses JSON-only responses and chunks long inputs.
+    Uses JSON-only responses. Content is split into content-defined chunks. The metadata
+    prompt covers the first token-bounded window of them; body chunks beyond that window
+    that were seen before (e.g. shared boilerplate) are served from the chunk cache and
+    the remaining ones are sent to the LLM in token-bounded batches.
     """
-    def _run_extraction(client, model, cleaned_content: str, chunk_size: int) -> List[Dict[str, str]]:
-        chunks = chunk_text(cleaned_content, chunk_size, model)
-        out: List[Dict[str, str]] = []
-        for idx, chunk in enumerate(chunks):
-            if idx == 0:
-                prompt = f"""You are a content extraction assistant. Given the article content below, extract these fields and return ONLY a valid JSON object:
+    def _complete(client, model, prompt: str) -> Dict[str, Any]:
+        resp = client.chat.completions.create(
+            model=model,
+            messages=[
+                {"role": "system", "content": "You are a content extraction assistant. Respond with a single JSON object only."},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"}
+        )
+        text = (resp.choices[0].message.content or "").strip()
+        return json.loads(text)
+
+    def _extract_head(client, model, chunk: str) -> Dict[str, str]:
+        prompt = f"""You are a content extraction assistant. Given the article content below, extract these fields and return ONLY a valid JSON object:
 
 - title (string; "" if not found)
 - publication_date (string; keep original format, "" if not found)
@@ -176,24 +242,89 @@ Example:
 
 Article content:
 {chunk}"""
-            else:
-                prompt = f"""Continue extracting ONLY the remaining main article text from the chunk below.
+        return _complete(client, model, prompt)
+
+    def _extract_body(client, model, blocks: List[str]) -> Optional[List[str]]:
+        # Several body chunks share one request; the model returns one string per chunk.
+        # Returns None if the response cannot be mapped back onto the chunks.
+        if len(blocks) == 1:
+            prompt = f"""Continue extracting ONLY the remaining main article text from the chunk below.
 Return a JSON object with only this key:
 {{ "main_content": "..." }}
 
 Text:
-{chunk}"""
+{blocks[0]}"""
+            return [str(_complete(client, model, prompt).get("main_content", ""))]
+
+        numbered = "\n\n".join(f"Block {i}:\n{block}" for i, block in enumerate(blocks, 1))
+        prompt = f"""Continue extracting ONLY the main article text from each numbered block below.
+Return a JSON object with one string per block, in the same order ("" for blocks that are only nav/ads):
+{{ "blocks": ["...", "..."] }}
+
+{numbered}"""
+        texts = _complete(client, model, prompt).get("blocks")
+        if isinstance(texts, list) and len(texts) == len(blocks):
+            return [str(t or "") for t in texts]
+        return None
 
-            resp = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are a content extraction assistant. Respond with a single JSON object only."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
-            text = (resp.choices[0].message.content or "").strip()
-            out.append(json.loads(text))
+    def _run_extraction(client, model, raw_content: str, chunk_size: int) -> List[Dict[str, str]]:
+        # Content-defined chunks, each cleaned and kept within the token budget
+        chunks: List[str] = []
+        for block in content_defined_chunks(raw_content):
+            block = clean_text(block)
+            if not block:
+                continue
+            if num_tokens(block, model) > chunk_size:
+                chunks.extend(chunk_text(block, chunk_size, model))
+            else:
+                chunks.append(block)
+        if not chunks:
+            return []
+
+        # The metadata (title/date/author) prompt sees a full token-bounded window of
+        # leading chunks, cached under the whole window so articles that merely open
+        # with the same boilerplate do not share metadata
+        head_count, head_tokens = 0, 0
+        for chunk in chunks:
+            tokens = num_tokens(chunk, model)
+            if head_count and head_tokens + tokens > chunk_size:
+                break
+            head_count += 1
+            head_tokens += tokens
+        head_window = " ".join(chunks[:head_count])
+        head_key = _chunk_cache_key(model, "head", head_window)
+        head = _chunk_cache.get(head_key)
+        if head is None:
+            head = _extract_head(client, model, head_window)
+            _cache_chunk_result(head_key, head)
+        out: List[Dict[str, str]] = [dict(head)]
+        body_chunks = chunks[head_count:]
+
+        # Body chunks beyond the window: serve cached ones, batch the rest within the token budget
+        body: List[Optional[str]] = []
+        batches: List[List[int]] = [[]]
+        batch_tokens = 0
+        for idx, chunk in enumerate(body_chunks):
+            body.append(_chunk_cache.get(_chunk_cache_key(model, "body", chunk)))
+            if body[idx] is not None:
+                continue
+            tokens = num_tokens(chunk, model)
+            if batches[-1] and batch_tokens + tokens > chunk_size:
+                batches.append([])
+                batch_tokens = 0
+            batches[-1].append(idx)
+            batch_tokens += tokens
+
+        for batch in filter(None, batches):
+            texts = _extract_body(client, model, [body_chunks[i] for i in batch])
+            if texts is None:
+                # Could not map the batch back onto its chunks: retry them one by one
+                texts = [_extract_body(client, model, [body_chunks[i]])[0] for i in batch]
+            for i, text in zip(batch, texts):
+                _cache_chunk_result(_chunk_cache_key(model, "body", body_chunks[i]), text)
+                body[i] = text
+
+        out.extend({"main_content": text} for text in body)
         return out
 
     cleaned_content = clean_text(content)
@@ -202,9 +333,10 @@ Text:
     # Keep headroom; output is small because we force JSON
     chunk_size = max_tokens - 2000
 
-    # 1) Try gpt-5-nano (globals: extract_client/extract_model)
+    # 1) Try gpt-5-nano
     try:
-        results = _run_extraction(extract_client, extract_model, cleaned_content, chunk_size)
+        extract_client, extract_model = get_llm_client(EXTRACT_MODEL_TYPE)
+        results = _run_extraction(extract_client, extract_model, content, chunk_size)
     except Exception as e:
         print(f"Error processing with LLM (nano): {e}")
         # If nano call fails hard, fall back to returning cleaned content as-is
@@ -231,12 +363,9 @@ Text:
     if escalate:
         print("⚠️ Escalating extraction to gpt-5-mini...")
         try:
-            # Reuse your already-initialized mini client if available:
-            # classify_client/classify_model are gpt-5-mini in your setup.
-            mini_client, mini_model = classify_client, classify_model
-            # If you prefer to initialize fresh:
-            # mini_client, mini_model = initialize_llm_client(model_type="gpt-5-mini")
-            results2 = _run_extraction(mini_client, mini_model, cleaned_content, chunk_size)
+            # Reuse the shared gpt-5-mini classification client
+            mini_client, mini_model = get_llm_client(CLASSIFY_MODEL_TYPE)
+            results2 = _run_extraction(mini_client, mini_model, content, chunk_size)
 
             # Rebuild fields only if we actually improved something
             title2 = results2[0].get("title", "") if results2 else title
@@ -335,15 +464,16 @@ Rules:
 Content:
 {content_summary}"""
 
-    # 4) First pass: gpt-5-mini (globals: classify_client/classify_model)
+    # 4) First pass: gpt-5-mini
     try:
+        classify_client, classify_model = get_llm_client(CLASSIFY_MODEL_TYPE)
         result = _run_classification(classify_client, classify_model, prompt)
     except Exception as e:
         print(f"Error analyzing content type (mini): {e}")
         # Try a direct escalation to full gpt-5 when mini fails hard
         try:
             print("⚠️ Escalating classification to gpt-5 due to error...")
-            gpt5_client, gpt5_model = initialize_llm_client(model_type="gpt-5")
+            gpt5_client, gpt5_model = get_llm_client("gpt-5")
             return _run_classification(gpt5_client, gpt5_model, prompt)
         except Exception as e2:
             print(f"Escalation to gpt-5 failed: {e2}")
@@ -361,7 +491,7 @@ Content:
     if escalate:
         print("⚠️ Escalating classification to gpt-5 (low confidence/uncertain)...")
         try:
-            gpt5_client, gpt5_model = initialize_llm_client(model_type="gpt-5")
+            gpt5_client, gpt5_model = get_llm_client("gpt-5")
             result2 = _run_classification(gpt5_client, gpt5_model, prompt)
             return result2
         except Exception as e:
@@ -25,9 +25,11 @@ import asyncio
 import logging
 from pathlib import Path
 
-# Add project root to Python path to allow importing project modules
-PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
-sys.path.insert(0, str(PROJECT_ROOT))
+# Add the project root to the Python path only when run as a script;
+# importing this module must not mutate sys.path
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent.parent
+if __name__ == "__main__":
+    sys.path.insert(0, str(PROJECT_ROOT))
 from typing import Dict, List, Any, Optional, Tuple
 from urllib.parse import unquote
 
@@ -51,11 +53,11 @@ from crawl4ai.extraction_strategy import LLMExtractionStrategy
 try:
     # Try relative imports first (when run from project root)
     from core.db.fetch_unprocessed_articles import get_unprocessed_articles
-    from core.utils.LLM_init import initialize_llm_client
+    from core.utils.LLM_init import get_llm_client, ModelType
 except ImportError:
     # Fallback to src. prefix if relative imports fail
     from src.core.db.fetch_unprocessed_articles import get_unprocessed_articles
-    from src.core.utils.LLM_init import initialize_llm_client
+    from src.core.utils.LLM_init import get_llm_client, ModelType
 
 from supabase import create_client, Client
 from dotenv import load_dotenv
@@ -89,9 +91,10 @@ else:
 # ------------------
 # LLM clients
 # ------------------
+# Clients are created lazily (and shared) via get_llm_client on first use.
 # Extraction (OpenAI): nano → escalate to mini
-extract_client, extract_model = initialize_llm_client("gpt-5-nano")
-classify_client, classify_model = initialize_llm_client("gpt-5-mini")
+EXTRACT_MODEL_TYPE: ModelType = "gpt-5-nano"
+CLASSIFY_MODEL_TYPE: ModelType = "gpt-5-mini"
 # full gpt-5 is initialized on-demand for classification escalation
 
 
@@ -135,17 +138,28 @@ def chunk_text(text: str, max_tokens: int, model: str) -> List[str]:
 # -----------------------------
 # Post-Crawl enrichment helpers
 # -----------------------------
+_HTTP_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
+                   " AppleWebKit/537.36 (KHTML, like Gecko)"
+                   " Chrome/119.0 Safari/537.36"),
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Referer": "https://www.google.com/",
+}
+
+# Shared keep-alive session so enrichment fetches reuse pooled connections
+_http_session: Optional[requests.Session] = None
+
+def _get_http_session() -> requests.Session:
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+        _http_session.headers.update(_HTTP_HEADERS)
+    return _http_session
+
 def _http_get(url: str, timeout: int = 15) -> Optional[str]:
     try:
-        headers = {
-            "User-Agent": ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)"
-                           " AppleWebKit/537.36 (KHTML, like Gecko)"
-                           " Chrome/119.0 Safari/537.36"),
-            "Accept-Language": "en-US,en;q=0.9",
-            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-            "Referer": "https://www.google.com/",
-        }
-        r = requests.get(url, headers=headers, timeout=timeout)
+        r = _get_http_session().get(url, timeout=timeout)
         if 200 <= r.status_code < 300:
             return r.text
     except Exception as e:
@@ -254,64 +268,34 @@ def enrich_content_from_url_if_needed(original_content: str, url: str) -> str:
 # -----------------------------------
 # Use the same OpenAI key for Crawl4AI LLM strategy
 _OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
+# Maximum number of articles crawled at the same time in the crawl phase
+EXTRACTION_CONCURRENCY = int(os.getenv("EXTRACTION_CONCURRENCY", "3"))
+if EXTRACTION_CONCURRENCY < 1:
+    # With no workers every article would be silently dropped
+    raise ValueError("EXTRACTION_CONCURRENCY must be at least 1")
+# Crawl4AI extraction attempts per URL before giving up
+MAX_CRAWL_ATTEMPTS = 4
+
+def create_crawler() -> AsyncWebCrawler:
+    """
+    Create a crawler that can be shared across several extract_main_content calls.
+    Use it as ``async with create_crawler() as crawler:`` so the browser is started
+    once and closed when the batch is done.
+    """
+    return AsyncWebCrawler(verbose=False)
 
-async def extract_main_content(full_url: str) -> str:
+async def extract_main_content(full_url: str, crawler: Optional[AsyncWebCrawler] = None) -> str:
     """
     Extract the main content via Crawl4AI + LLMExtractionStrategy (unchanged behavior).
+    Pass an already-started ``crawler`` to reuse its browser session; otherwise a
+    crawler is started and closed for this single URL.
     Returns a string (possibly JSON-ish blocks depending on strategy), or an error message.
     """
     try:
-        async with AsyncWebCrawler(verbose=False) as crawler:
-            llm_strategy = LLMExtractionStrategy(
-                llm_config={
-                    "provider": f"openai/{extract_model}",   # e.g., openai/gpt-5-nano
-                    "api_token": _OPENAI_API_KEY,
-                },
-                verbose=True,
-                word_count_threshold=50,
-                exclude_tags=["footer", "header", "nav", "aside", "script", "style", "img"],
-                exclude_external_links=True,
-                timeout=40,
-                instructions="""
-                    You are a content extractor. Extract the relevant article text blocks
-                    and return them as plain text with minimal noise.
-                    Exclude navigation, ads, and boilerplate.
-                """,
-                output_format="text",
-                max_retries=3
-            )
-
-            max_attempts = 4
-            for attempt in range(max_attempts):
-                try:
-                    if attempt > 0:
-                        jitter = random.uniform(0.5, 2.0)
-                        wait_time = (2 ** attempt) + jitter
-                        print(f"API attempt {attempt+1}/{max_attempts}, waiting {wait_time:.1f} seconds...")
-                        await asyncio.sleep(wait_time)
-
-                    print(f"Attempting extraction (try {attempt+1}/{max_attempts})...")
-                    result = await crawler.arun(
-                        url=full_url,
-                        extraction_strategy=llm_strategy,
-                        max_pages=1,
-                        cache_mode=CacheMode.WRITE_ONLY,
-                    )
-                    content = result.extracted_content
-                    if content and len(content) > 50:
-                        return content
-                    else:
-                        print(f"LLM returned insufficient content on attempt {attempt+1}")
-                        if attempt == max_attempts - 1:
-                            print("Using best available content after all attempts")
-                            return content if content else "No content could be extracted"
-                except Exception as e:
-                    err = str(e)
-                    print(f"API error on attempt {attempt+1}: {err}")
-                    if attempt == max_attempts - 1:
-                        return f"Failed to extract content after {max_attempts} attempts. Last error: {err}"
-
-            return "Content extraction failed after multiple attempts"
+        if crawler is not None:
+            return await _crawl_main_content(crawler, full_url)
+        async with create_crawler() as crawler:
+            return await _crawl_main_content(crawler, full_url)
 
     except Exception as e:
         error_type = type(e).__name__
@@ -319,6 +303,75 @@ async def extract_main_content(full_url: str) -> str:
         print(f"[ERROR] Outer exception during extraction for {full_url}. Type: {error_type}, Message: {error_message}", file=sys.stderr)
         return f"Extraction failed for {full_url}. Type: {error_type}, Error: {error_message}"
 
+def _build_llm_strategy() -> LLMExtractionStrategy:
+    """LLM extraction strategy used for every Crawl4AI extraction attempt."""
+    _, extract_model = get_llm_client(EXTRACT_MODEL_TYPE)
+    return LLMExtractionStrategy(
+        llm_config={
+            "provider": f"openai/{extract_model}",   # e.g., openai/gpt-5-nano
+            "api_token": _OPENAI_API_KEY,
+        },
+        verbose=True,
+        word_count_threshold=50,
+        exclude_tags=["footer", "header", "nav", "aside", "script", "style", "img"],
+        exclude_external_links=True,
+        timeout=40,
+        instructions="""
+            You are a content extractor. Extract the relevant article text blocks
+            and return them as plain text with minimal noise.
+            Exclude navigation, ads, and boilerplate.
+        """,
+        output_format="text",
+        max_retries=3
+    )
+
+def _retry_delay(attempt: int) -> float:
+    """Exponential backoff (with jitter) before the 0-based extraction attempt ``attempt``."""
+    return (2 ** attempt) + random.uniform(0.5, 2.0)
+
+async def _crawl_attempt(crawler: AsyncWebCrawler, full_url: str, llm_strategy: LLMExtractionStrategy, attempt: int) -> Optional[str]:
+    """
+    Run one extraction attempt (0-based) for full_url.
+    Returns the content to keep, or None if the URL should be tried again.
+    """
+    try:
+        print(f"Attempting extraction (try {attempt+1}/{MAX_CRAWL_ATTEMPTS})...")
+        result = await crawler.arun(
+            url=full_url,
+            extraction_strategy=llm_strategy,
+            max_pages=1,
+            cache_mode=CacheMode.WRITE_ONLY,
+        )
+        content = result.extracted_content
+    except Exception as e:
+        err = str(e)
+        print(f"API error on attempt {attempt+1}: {err}")
+        if attempt == MAX_CRAWL_ATTEMPTS - 1:
+            return f"Failed to extract content after {MAX_CRAWL_ATTEMPTS} attempts. Last error: {err}"
+        return None
+
+    if content and len(content) > 50:
+        return content
+    print(f"LLM returned insufficient content on attempt {attempt+1}")
+    if attempt == MAX_CRAWL_ATTEMPTS - 1:
+        print("Using best available content after all attempts")
+        return content if content else "No content could be extracted"
+    return None
+
+async def _crawl_main_content(crawler: AsyncWebCrawler, full_url: str) -> str:
+    """Run the LLM extraction strategy (with retries) for one URL on an open crawler."""
+    llm_strategy = _build_llm_strategy()
+    for attempt in range(MAX_CRAWL_ATTEMPTS):
+        if attempt > 0:
+            wait_time = _retry_delay(attempt)
+            print(f"API attempt {attempt+1}/{MAX_CRAWL_ATTEMPTS}, waiting {wait_time:.1f} seconds...")
+            await asyncio.sleep(wait_time)
+        content = await _crawl_attempt(crawler, full_url, llm_strategy, attempt)
+        if content is not None:
+            return content
+
+    return "Content extraction failed after multiple attempts"
+
 # ----------------------------
 # OpenAI extraction (escalation)
 # ----------------------------
@@ -368,6 +421,7 @@ def extract_content_with_llm(article_body: str) -> Dict[str, str]:
     """
     Extract fields using gpt-5-nano → escalate to gpt-5-mini when weak.
     """
+    extract_client, extract_model = get_llm_client(EXTRACT_MODEL_TYPE)
     if extract_client is None:  # CI without key
         cleaned = clean_text(article_body)
         return {"title": "", "publication_date": "", "author": "", "main_content": cleaned}
@@ -401,7 +455,7 @@ def extract_content_with_llm(article_body: str) -> Dict[str, str]:
     if escalate:
         print("⚠️ Escalating extraction to gpt-5-mini...")
         try:
-            mini_client, mini_model = classify_client, classify_model
+            mini_client, mini_model = get_llm_client(CLASSIFY_MODEL_TYPE)
             results2 = _run_extraction(mini_client, mini_model, cleaned_content, chunk_size)
             title2 = results2[0].get("title", "") if results2 else title
             pub2 = results2[0].get("publication_date", "") if results2 else publication_date
@@ -484,6 +538,7 @@ Rules:
 Content:
 {content_summary}"""
 
+    classify_client, classify_model = get_llm_client(CLASSIFY_MODEL_TYPE)
     if classify_client is None:
         return {"content_type": "empty_content", "confidence": 0.2, "reasoning": "LLM unavailable in CI"}
 
@@ -493,7 +548,7 @@ Content:
         print(f"Error analyzing content type (mini): {e}")
         try:
             print("⚠️ Escalating classification to gpt-5 due to error...")
-            gpt5_client, gpt5_model = initialize_llm_client("gpt-5")
+            gpt5_client, gpt5_model = get_llm_client("gpt-5")
             return _run_classification(gpt5_client, gpt5_model, prompt)
         except Exception as e2:
             print(f"Escalation to gpt-5 failed: {e2}")
@@ -505,7 +560,7 @@ Content:
     if escalate:
         print("⚠️ Escalating classification to gpt-5 (low confidence/uncertain)...")
         try:
-            gpt5_client, gpt5_model = initialize_llm_client("gpt-5")
+            gpt5_client, gpt5_model = get_llm_client("gpt-5")
             return _run_classification(gpt5_client, gpt5_model, prompt)
         except Exception as e:
             print(f"Escalation to gpt-5 failed: {e}")
@@ -565,28 +620,75 @@ def load_json(path: str) -> Dict[str, Any]:
 async def crawl_phase_write_extracted_json(output_path: str) -> Dict[str, str]:
     """
     1) Fetch unprocessed articles from DB
-    2) Run Crawl4AI extract_main_content for each
+    2) Run Crawl4AI extraction for each, with EXTRACTION_CONCURRENCY workers
     3) Write extracted_contents.json
     Returns the in-memory dict as well.
+
+    Articles are scheduled through a priority queue keyed by attempt number. A failed
+    attempt is pushed back one priority lower once its backoff has elapsed, so a slow or
+    failing URL does not hold a worker (or the URLs queued behind it) while it waits.
     """
     unprocessed_articles = get_unprocessed_articles()
-    extracted_contents: Dict[str, str] = {}
+    results: Dict[int, Tuple[Any, str]] = {}
+
+    if unprocessed_articles:
+        # Items are (attempt, position, article); position breaks ties in input order
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        for position, article in enumerate(unprocessed_articles):
+            queue.put_nowait((0, position, article))
+        workers = min(EXTRACTION_CONCURRENCY, len(unprocessed_articles))
+        strategies: Dict[int, LLMExtractionStrategy] = {}
+
+        def _article_url(article: Dict[str, Any]) -> str:
+            url = unquote(article["url"])
+            return url if url.startswith("http") else "https://www." + url
+
+        async def _requeue(attempt: int, position: int, article: Dict[str, Any]) -> None:
+            wait_time = _retry_delay(attempt)
+            print(f"API attempt {attempt+1}/{MAX_CRAWL_ATTEMPTS}, waiting {wait_time:.1f} seconds...")
+            await asyncio.sleep(wait_time)
+            queue.put_nowait((attempt, position, article))
+
+        def _finish(position: int, article_id: Any, extracted: str) -> None:
+            results[position] = (article_id, extracted)
+            if len(results) == len(unprocessed_articles):
+                # Every article is done: wake each worker with a stop item
+                for n in range(workers):
+                    queue.put_nowait((MAX_CRAWL_ATTEMPTS, len(unprocessed_articles) + n, None))
+
+        async def _worker(crawler: AsyncWebCrawler, tg: asyncio.TaskGroup) -> None:
+            while True:
+                attempt, position, article = await queue.get()
+                if article is None:
+                    return
+                article_id = article["id"]
+                article_url = _article_url(article)
+                try:
+                    if attempt == 0:
+                        print(f"Extracting content from {article_url}")
+                        strategies[position] = _build_llm_strategy()
+                    extracted = await _crawl_attempt(crawler, article_url, strategies[position], attempt)
+                except Exception as e:
+                    print(f"[ERROR] Failed to extract content from {article_url}: {e}")
+                    _finish(position, article_id, f"Extraction error: {str(e)}")
+                    continue
+                if extracted is None:
+                    tg.create_task(_requeue(attempt + 1, position, article))
+                    continue
+                if not extracted or extracted.startswith("Failed to extract"):
+                    print(f"Warning: Extraction issue for {article_url}")
+                else:
+                    print(f"Successfully extracted {len(extracted)} characters from {article_url}")
+                _finish(position, article_id, extracted)
 
-    for article in unprocessed_articles:
-        article_id = article["id"]
-        url = unquote(article["url"])
-        article_url = url if url.startswith("http") else "https://www." + url
-        print(f"Extracting content from {article_url}")
-        try:
-            extracted = await extract_main_content(article_url)
-            if not extracted or extracted.startswith("Failed to extract"):
-                print(f"Warning: Extraction issue for {article_url}")
-            else:
-                print(f"Successfully extracted {len(extracted)} characters from {article_url}")
-            extracted_contents[article_id] = extracted
-        except Exception as e:
-            print(f"[ERROR] Failed to extract content from {article_url}: {e}")
-            extracted_contents[article_id] = f"Extraction error: {str(e)}"
+        # One crawler (browser session) is shared by every article in the run
+        async with create_crawler() as crawler:
+            async with asyncio.TaskGroup() as tg:
+                for _ in range(workers):
+                    tg.create_task(_worker(crawler, tg))
+
+    # Write the JSON in input order, whatever order the articles finished in
+    extracted_contents: Dict[str, str] = dict(results[position] for position in range(len(results)))
 
     save_json(extracted_contents, output_path)
     print("Content extraction complete.")
@@ -6,50 +6,72 @@ Process:
 2. Cleaning and structuring the extracted content using LLM.
 3. Creating an embedding for the cleaned content.
 4. Updating the article in the database with the cleaned content and embedding.
+
+Each step is implemented as a separate stage so that many articles can be run
+through ``process_articles_pipelined``, which feeds the stages with independent
+worker pools connected by ``asyncio.Queue``s. In the pipelined path embeddings
+are created in batches (one OpenAI request per batch) and written to the
+database with bulk inserts.
 """
 import asyncio
 import traceback
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from urllib.parse import unquote
 
 # Assuming the top-level directory is in sys.path (handled by Pipeline.py)
-from src.modules.extraction.extractContent import extract_main_content
+from src.modules.extraction.extractContent import extract_main_content, create_crawler
 from src.modules.extraction.cleanContent import extract_content_with_llm, analyze_content_type
-from src.core.utils.create_embeddings import create_and_store_embedding
+from src.core.utils.create_embeddings import (
+    UPSERT_BATCH,
+    create_and_store_embedding,
+    create_embeddings_batch,
+    iter_embedding_batches,
+    normalize_embedding,
+    store_embeddings_batch,
+)
 from src.core.db.update_article import update_article_in_db
 
-async def process_article(article: Dict[str, Any]) -> Optional[int]:
+# Default worker pool sizes and queue bound for process_articles_pipelined
+DEFAULT_EXTRACT_WORKERS = 4
+DEFAULT_LLM_WORKERS = 2
+DEFAULT_DB_WORKERS = 2
+DEFAULT_QUEUE_SIZE = 64
+# Maximum number of articles embedded with one OpenAI request in process_articles_pipelined
+DEFAULT_EMBED_BATCH = 32
+
+
+def _resolve_article_url(article: Dict[str, Any]) -> Optional[str]:
     """
-    Process a single article through extraction, cleaning, embedding, and DB update.
+    Build the absolute URL for an article.
     Args:
         article (Dict[str, Any]): Dictionary containing article information.
     Returns:
-        Optional[int]: The article ID if processed successfully, None otherwise.
-    Raises:
-        Exception: If there is an error during the processing steps.
+        Optional[str]: The normalized URL, or None if the article has no URL.
     """
-    article_id = article["id"]
     # Normalize URL: use article["url"] if it starts with http; otherwise, prepend "https://www."
     url = article["url"]
     # Ensure URL is not None or empty before processing
     if not url:
-        print(f"[ERROR] Skipping article {article_id} due to missing URL.")
         return None
-    
+
     # URL decode the URL in case it's been URL-encoded
     url = unquote(url)
-    article_url = url if url.startswith("http") else "https://www." + url
+    return url if url.startswith("http") else "https://www." + url
 
-    print(f"\n{'='*50}")
-    print(f"Processing article: {article_id} - {article_url}")
-    print(f"{'='*50}\n")
-
-    processed_data = None # To hold structured data for embedding/update
 
-    # Step 1: Extract content
+async def extract_article_stage(article_id: int, article_url: str, crawler: Optional[Any] = None) -> str:
+    """
+    Stage 1: extract the raw content of an article.
+    Args:
+        article_id (int): The ID of the article (for logging).
+        article_url (str): The normalized URL of the article.
+        crawler (Optional[Any]): Open crawler to reuse; a new one is started if None.
+    Returns:
+        str: The extracted content, or an error string if extraction failed.
+    """
     print(f"[1/4] Extracting content from {article_url}")
     try:
-        extracted_content = await extract_main_content(article_url)
+        extracted_content = await extract_main_content(article_url, crawler=crawler)
         if not extracted_content or extracted_content.startswith("Failed to extract") or extracted_content.startswith("Extraction error:") :
             print(f"Warning: Extraction issue for article {article_id}. Content: '{extracted_content[:100]}...'")
             # Decide if we should stop or try to proceed with potentially bad content
@@ -60,8 +82,20 @@ async def process_article(article: Dict[str, Any]) -> Optional[int]:
         print(f"[ERROR] Failed to extract content for article {article_id}: {e}")
         print(traceback.format_exc())
         extracted_content = f"Extraction error: {str(e)}" # Store error
+    return extracted_content
+
 
-    # Step 2: Clean and structure content
+def clean_article_stage(article_id: int, extracted_content: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Stage 2: clean, structure and classify extracted content with the LLM.
+    This step is synchronous (blocking OpenAI calls); async callers should run it
+    through ``asyncio.to_thread``.
+    Args:
+        article_id (int): The ID of the article.
+        extracted_content (Optional[str]): Content returned by the extraction stage.
+    Returns:
+        Optional[Dict[str, Any]]: The processed article, or None if cleaning failed.
+    """
     print(f"[2/4] Cleaning and structuring content for article {article_id}")
     try:
         # Process with LLM
@@ -95,57 +129,275 @@ async def process_article(article: Dict[str, Any]) -> Optional[int]:
         print(f"  Content length: {len(processed_article.get('main_content', ''))} chars")
         print(f"  Content type: {processed_article.get('content_type', 'N/A')} (confidence: {processed_article.get('type_confidence', 0.0):.2f})")
 
-        processed_data = processed_article # Store for next steps
+        return processed_article
 
     except Exception as e:
         print(f"[ERROR] Failed to clean content for article {article_id}: {e}")
         print(traceback.format_exc())
         # If cleaning fails, we can still try to update DB with error state or skip
         # For now, we want to skip embedding and DB update if cleaning fails
-        processed_data = None
+        return None
 
 
+async def update_article_stage(article_id: int, processed_data: Optional[Dict[str, Any]]) -> bool:
+    """
+    Stage 3: update the database with the cleaned content.
+    Args:
+        article_id (int): The ID of the article.
+        processed_data (Optional[Dict[str, Any]]): Output of the cleaning stage.
+    Returns:
+        bool: True if the article was updated, False if it was skipped or the update failed.
+    """
     # Proceed only if cleaning was successful and we have content
-    if processed_data and processed_data.get("main_content"):
-        # Step 3: Update the database with processed content
-        print(f"[3/4] Updating database for article {article_id}")
-        db_update_successful = False
+    if not (processed_data and processed_data.get("main_content")):
+        # If cleaning failed leave isProcessed=False. For now, we just log and return False.
+        print(f"Skipping database update and embedding for article {article_id} due to issues in previous steps.")
+        return False
+
+    print(f"[3/4] Updating database for article {article_id}")
+    db_update_successful = False
+    try:
+        update_data = {
+            "contentType": processed_data["content_type"],
+            "Content": processed_data["main_content"],
+            "Author": processed_data["author"],
+            "isProcessed": True
+        }
+
+        # The Supabase client is synchronous; run it in a worker thread so the
+        # blocking HTTP round-trip does not stall the other articles' tasks
+        db_update_successful = await asyncio.to_thread(
+            update_article_in_db,
+            article_id,
+            update_data
+        )
+        if db_update_successful:
+            print(f"Successfully updated article {article_id} in database")
+        else:
+            print(f"Warning: Database update for article {article_id} did not return data. Check if article exists or if update conditions matched.")
+    except Exception as e:
+        print(f"[ERROR] Failed to update database for article {article_id}: {e}")
+        print(traceback.format_exc())
+
+    if not db_update_successful:
+        print(f"Skipping embedding for article {article_id} due to database update failure.")
+    return bool(db_update_successful)
+
+
+async def store_article_stage(article_id: int, processed_data: Optional[Dict[str, Any]]) -> Optional[int]:
+    """
+    Stages 3 and 4: update the database and create/store the embedding.
+    Args:
+        article_id (int): The ID of the article.
+        processed_data (Optional[Dict[str, Any]]): Output of the cleaning stage.
+    Returns:
+        Optional[int]: The article ID if stored successfully, None otherwise.
+    """
+    # Step 4: Create and store embedding *only* if DB update was successful
+    if await update_article_stage(article_id, processed_data):
+        print(f"[4/4] Creating and storing embedding for article {article_id}")
         try:
-            update_data = {
-                "contentType": processed_data["content_type"],
-                "Content": processed_data["main_content"],
-                "Author": processed_data["author"],
-                "isProcessed": True
-            }
-
-            db_update_successful = update_article_in_db(article_id, update_data)
-            if db_update_successful:
-                print(f"Successfully updated article {article_id} in database")
-            else:
-                print(f"Warning: Database update for article {article_id} did not return data. Check if article exists or if update conditions matched.")
+            # Use asyncio.to_thread to run the synchronous embedding function
+            await asyncio.to_thread(
+                create_and_store_embedding,
+                article_id,
+                processed_data["main_content"] # Use the cleaned main content
+            )
+            # Assuming create_and_store_embedding handles its own prints/errors
+            return article_id # Return ID on full success
         except Exception as e:
-            print(f"[ERROR] Failed to update database for article {article_id}: {e}")
+            print(f"[ERROR] Failed to create/store embedding for article {article_id}: {e}")
             print(traceback.format_exc())
+    return None
 
-        # Step 4: Create and store embedding *only* if DB update was successful
-        if db_update_successful:
-            print(f"[4/4] Creating and storing embedding for article {article_id}")
+
+async def process_article(article: Dict[str, Any]) -> Optional[int]:
+    """
+    Process a single article through extraction, cleaning, embedding, and DB update.
+    Args:
+        article (Dict[str, Any]): Dictionary containing article information.
+    Returns:
+        Optional[int]: The article ID if processed successfully, None otherwise.
+    Raises:
+        Exception: If there is an error during the processing steps.
+    """
+    article_id = article["id"]
+    article_url = _resolve_article_url(article)
+    if article_url is None:
+        print(f"[ERROR] Skipping article {article_id} due to missing URL.")
+        return None
+
+    print(f"\n{'='*50}")
+    print(f"Processing article: {article_id} - {article_url}")
+    print(f"{'='*50}\n")
+
+    extracted_content = await extract_article_stage(article_id, article_url)
+    processed_data = await asyncio.to_thread(clean_article_stage, article_id, extracted_content)
+    return await store_article_stage(article_id, processed_data)
+
+
+async def process_articles_pipelined(
+    articles: List[Dict[str, Any]],
+    extract_workers: int = DEFAULT_EXTRACT_WORKERS,
+    llm_workers: int = DEFAULT_LLM_WORKERS,
+    db_workers: int = DEFAULT_DB_WORKERS,
+    queue_size: int = DEFAULT_QUEUE_SIZE,
+    embed_batch_size: int = DEFAULT_EMBED_BATCH
+) -> List[Optional[int]]:
+    """
+    Process many articles with one worker pool per stage.
+    Extraction, LLM cleaning, DB updates, embedding and embedding storage run
+    concurrently in independent worker pools connected by bounded queues, so a
+    slow stage for one article does not delay the other stages from picking up
+    the next article. The embedding stage sends whatever articles are waiting
+    to OpenAI in requests of up to embed_batch_size articles and
+    EMBEDDING_BATCH_MAX_TOKENS tokens, and the storage stage
+    writes the resulting rows with bulk inserts of up to UPSERT_BATCH rows.
+    Args:
+        articles (List[Dict[str, Any]]): Articles to process.
+        extract_workers (int): Number of concurrent extraction workers.
+        llm_workers (int): Number of concurrent LLM cleaning workers.
+        db_workers (int): Number of concurrent database update workers.
+        queue_size (int): Maximum number of items buffered between two stages.
+        embed_batch_size (int): Maximum number of articles embedded with one OpenAI request.
+    Returns:
+        List[Optional[int]]: For each input article (in order), its ID if processed successfully, None otherwise.
+    Raises:
+        ValueError: If any worker count or the embedding batch size is less than 1.
+    """
+    if min(extract_workers, llm_workers, db_workers) < 1:
+        raise ValueError("Each stage needs at least one worker")
+    if embed_batch_size < 1:
+        raise ValueError("embed_batch_size must be at least 1")
+
+    results: List[Optional[int]] = [None] * len(articles)
+    extract_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    llm_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    db_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    embed_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    write_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    async def produce() -> None:
+        for index, article in enumerate(articles):
+            await extract_q.put((index, article))
+        for _ in range(extract_workers):
+            await extract_q.put(None)
+
+    async def extract_worker(crawler: Any) -> None:
+        while True:
+            item = await extract_q.get()
+            if item is None:
+                return
+            index, article = item
             try:
-                # Use asyncio.to_thread to run the synchronous embedding function
-                await asyncio.to_thread(
-                    create_and_store_embedding,
-                    article_id,
-                    processed_data["main_content"] # Use the cleaned main content
-                )
-                # Assuming create_and_store_embedding handles its own prints/errors
-                return article_id # Return ID on full success
+                article_id = article["id"]
+                article_url = _resolve_article_url(article)
             except Exception as e:
-                print(f"[ERROR] Failed to create/store embedding for article {article_id}: {e}")
-                print(traceback.format_exc())
-        else:
-             print(f"Skipping embedding for article {article_id} due to database update failure.")
+                print(f"[ERROR] Skipping malformed article at position {index}: {e}")
+                continue
+            if article_url is None:
+                print(f"[ERROR] Skipping article {article_id} due to missing URL.")
+                continue
+            print(f"Processing article: {article_id} - {article_url}")
+            extracted_content = await extract_article_stage(article_id, article_url, crawler=crawler)
+            await llm_q.put((index, article_id, extracted_content))
 
-    else:
-        # If cleaning failed leave isProcessed=False. For now, we just log and return None.
-        print(f"Skipping database update and embedding for article {article_id} due to issues in previous steps.")
-    return None 
+    async def llm_worker() -> None:
+        while True:
+            item = await llm_q.get()
+            if item is None:
+                return
+            index, article_id, extracted_content = item
+            processed_data = await asyncio.to_thread(clean_article_stage, article_id, extracted_content)
+            await db_q.put((index, article_id, processed_data))
+
+    async def db_worker() -> None:
+        while True:
+            item = await db_q.get()
+            if item is None:
+                return
+            index, article_id, processed_data = item
+            try:
+                if await update_article_stage(article_id, processed_data):
+                    await embed_q.put((index, article_id, processed_data["main_content"]))
+            except Exception as e:
+                print(f"[ERROR] Unexpected failure storing article {article_id}: {e}")
+
+    async def embed_batch(batch: List[Tuple[int, int, str]]) -> List[Tuple[int, Dict[str, Any]]]:
+        print(f"[4/4] Creating embeddings for articles {[article_id for _, article_id, _ in batch]}")
+        articles = [{"id": article_id, "content": content} for _, article_id, content in batch]
+        try:
+            # Keep each OpenAI request within the embedding token budget as well as the batch size
+            embeddings = []
+            for chunk in iter_embedding_batches(articles, embed_batch_size):
+                embeddings.extend(await asyncio.to_thread(create_embeddings_batch, chunk))
+        except Exception as e:
+            print(f"[ERROR] Failed to create embeddings for {len(batch)} articles: {e}")
+            print(traceback.format_exc())
+            return []
+
+        rows = []
+        for (index, article_id, _), embedding in zip(batch, embeddings):
+            if embedding is None:
+                print(f"Skipping embedding storage for article {article_id}: embedding creation failed.")
+                continue
+            rows.append((index, {"embedding": normalize_embedding(embedding), "SourceArticle": article_id}))
+        return rows
+
+    async def embed_worker() -> None:
+        finished = False
+        while not finished:
+            # Wait for one article, then take whatever else is already queued
+            batch: List[Tuple[int, int, str]] = []
+            item = await embed_q.get()
+            while True:
+                if item is None:
+                    finished = True
+                    break
+                batch.append(item)
+                if len(batch) >= embed_batch_size or embed_q.empty():
+                    break
+                item = embed_q.get_nowait()
+            if batch:
+                await write_q.put(await embed_batch(batch))
+
+    async def write_worker() -> None:
+        pending: List[Tuple[int, Dict[str, Any]]] = []
+        while True:
+            item = await write_q.get()
+            if item is not None:
+                pending.extend(item)
+            # Write when a full insert batch is buffered or nothing else is waiting
+            if pending and (item is None or write_q.empty() or len(pending) >= UPSERT_BATCH):
+                while pending:
+                    chunk, pending = pending[:UPSERT_BATCH], pending[UPSERT_BATCH:]
+                    if await asyncio.to_thread(store_embeddings_batch, [row for _, row in chunk]):
+                        for index, row in chunk:
+                            results[index] = row["SourceArticle"]
+            if item is None:
+                return
+
+    async def run_stage(workers: List["asyncio.Task"], next_q: Optional[asyncio.Queue], next_count: int) -> None:
+        # Wait for every worker of a stage, then shut the next stage down
+        await asyncio.gather(*workers)
+        if next_q is not None:
+            for _ in range(next_count):
+                await next_q.put(None)
+
+    # All extract workers share one crawler so the browser session is reused
+    async with create_crawler() as crawler:
+        extract_tasks = [asyncio.create_task(extract_worker(crawler)) for _ in range(extract_workers)]
+        llm_tasks = [asyncio.create_task(llm_worker()) for _ in range(llm_workers)]
+        db_tasks = [asyncio.create_task(db_worker()) for _ in range(db_workers)]
+        embed_task = asyncio.create_task(embed_worker())
+        write_task = asyncio.create_task(write_worker())
+
+        await asyncio.gather(
+            produce(),
+            run_stage(extract_tasks, llm_q, llm_workers),
+            run_stage(llm_tasks, db_q, db_workers),
+            run_stage(db_tasks, embed_q, 1),
+            run_stage([embed_task], write_q, 1),
+            run_stage([write_task], None, 0),
+        )
+    return results
@@ -9,11 +9,15 @@ This is a template configuration file. To customize:
 3. Add module-specific configuration options
 """
 
-from dataclasses import dataclass
-from typing import Dict, Any, List, Optional
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Sequence, Tuple
 
 
-@dataclass
+DEFAULT_CONTENT_TYPES: Tuple[str, ...] = ('text/html', 'application/xhtml+xml')
+
+
+@dataclass(slots=True, frozen=True)
 class ExampleConfig:
     """
     Configuration class for Example extractor.
@@ -21,6 +25,9 @@ class ExampleConfig:
     This class defines all configurable parameters for the content extraction
     process, including timeouts, retry logic, and extraction settings.
     
+    Instances are immutable and hashable, so presets can be shared freely and
+    used as cache keys. Use ``dataclasses.replace`` to derive a modified copy.
+    
     Template Usage:
     - Replace 'Example' with your actual extractor name
     - Modify default values as needed for your use case
@@ -40,16 +47,21 @@ class ExampleConfig:
     max_content_length: int = 50000
     
     # Supported content types
-    supported_content_types: Optional[List[str]] = None
+    supported_content_types: Tuple[str, ...] = DEFAULT_CONTENT_TYPES
     
-    # Custom headers
-    custom_headers: Optional[Dict[str, str]] = None
+    # Custom headers (stored read-only; not part of the hash)
+    custom_headers: Mapping[str, str] = field(
+        default_factory=lambda: MappingProxyType({}), hash=False
+    )
     
     # Extraction parameters
     extract_images: bool = True
     extract_links: bool = True
     extract_metadata: bool = True
     
+    # Parse with selectolax when installed; set False to keep the BeautifulSoup path
+    use_selectolax: bool = True
+    
     # Text processing
     clean_html: bool = True
     normalize_whitespace: bool = True
@@ -60,15 +72,14 @@ class ExampleConfig:
     log_level: str = "INFO"
     
     def __post_init__(self):
-        """Initialize default values for mutable fields."""
-        if self.supported_content_types is None:
-            self.supported_content_types = [
-                'text/html',
-                'application/xhtml+xml'
-            ]
+        """Freeze collection fields passed in as lists/dicts (or None)."""
+        content_types: Optional[Sequence[str]] = self.supported_content_types
+        if content_types is None:
+            content_types = DEFAULT_CONTENT_TYPES
+        object.__setattr__(self, 'supported_content_types', tuple(content_types))
         
-        if self.custom_headers is None:
-            self.custom_headers = {}
+        headers = self.custom_headers or {}
+        object.__setattr__(self, 'custom_headers', MappingProxyType(dict(headers)))
     
     def get_headers(self) -> Dict[str, str]:
         """
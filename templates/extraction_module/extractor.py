@@ -11,18 +11,43 @@ Template Usage:
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from functools import cached_property
+from typing import Dict, Any, FrozenSet, List, Optional
+import asyncio
 import logging
-from urllib.parse import urlparse
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 try:
     from .config import ExampleConfig
+    from .utils import Document, get_domain, make_document
 except ImportError:
     from config import ExampleConfig
+    from utils import Document, get_domain, make_document
+
+# Optional HTTP/2 support for extract_many (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    _HAS_HTTP2 = True
+except ImportError:
+    _HAS_HTTP2 = False
 
 
 logger = logging.getLogger(__name__)
 
+# Connection pool sizing for the extractor's HTTP session
+POOL_CONNECTIONS = 10
+POOL_MAXSIZE = 50
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Concurrency limits for extract_many
+MAX_CONCURRENT_FETCHES = 16
+ASYNC_MAX_CONNECTIONS = 100
+ASYNC_MAX_KEEPALIVE = 20
+
 
 class BaseExtractor(ABC):
     """Base class for all content extractors."""
@@ -67,6 +92,85 @@ class ExampleExtractor(BaseExtractor):
         """
         self.config = config or ExampleConfig()
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self._domain_set: Optional[FrozenSet[str]] = None
+        self._session = self._create_session()
+        self._raw_html: Optional[str] = None
+    
+    def __enter__(self) -> 'ExampleExtractor':
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Close the HTTP session and its pooled connections."""
+        self._session.close()
+    
+    def _create_session(self) -> requests.Session:
+        """
+        Create the HTTP session shared by all fetches of this extractor.
+        
+        Reusing one session keeps TCP/TLS connections to the same host alive
+        across articles; retries with backoff are handled by the adapter.
+        
+        Returns:
+            Configured requests session
+        """
+        session = requests.Session()
+        session.headers.update(self.config.get_headers())
+        
+        adapter = HTTPAdapter(
+            pool_connections=POOL_CONNECTIONS,
+            pool_maxsize=POOL_MAXSIZE,
+            max_retries=Retry(
+                total=self.config.max_retries,
+                backoff_factor=self.config.retry_delay,
+                status_forcelist=RETRY_STATUS_CODES
+            )
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+    
+    def _load_page(self, html: str) -> None:
+        """
+        Set the HTML of the page currently being extracted.
+        
+        Drops any document parsed for the previous page; the new one is
+        parsed lazily, once, on first access to ``self.soup``.
+        
+        Args:
+            html: Page HTML
+        """
+        self._raw_html = html
+        self.__dict__.pop('soup', None)
+    
+    @cached_property
+    def soup(self) -> Document:
+        """
+        Parsed document of the current page, shared by all extraction helpers.
+        
+        Returns:
+            Document built with utils.make_document
+        """
+        return make_document(self._raw_html or '', self.config.use_selectolax)
+    
+    def _fetch(self, url: str) -> str:
+        """
+        Fetch a page through the shared session.
+        
+        Args:
+            url: URL to fetch
+            
+        Returns:
+            Response body as text
+            
+        Raises:
+            requests.RequestException: If the request fails
+        """
+        response = self._session.get(url, timeout=self.config.timeout)
+        response.raise_for_status()
+        return response.text
     
     def extract(self, url: str) -> Dict[str, Any]:
         """
@@ -97,8 +201,8 @@ class ExampleExtractor(BaseExtractor):
             # This is a template - replace with your implementation
             # 
             # Example implementation steps:
-            # 1. Make HTTP request to URL
-            # 2. Parse HTML with BeautifulSoup
+            # 1. Fetch the page: self._load_page(self._fetch(url)) (pooled session)
+            # 2. Pass self.soup (parsed once, on first use) to every helper
             # 3. Extract title, content, author, date
             # 4. Clean and normalize text
             # 5. Extract metadata
@@ -119,6 +223,104 @@ class ExampleExtractor(BaseExtractor):
             self.logger.error(f"Failed to extract content from {url}: {str(e)}")
             raise
     
+    async def extract_many(self, urls: List[str], max_concurrency: int = MAX_CONCURRENT_FETCHES) -> List[Optional[Dict[str, Any]]]:
+        """
+        Extract content from many URLs concurrently.
+        
+        Pages are fetched over one shared async client (HTTP/2 when available),
+        at most ``max_concurrency`` at a time, and parsed in worker threads so
+        parsing overlaps with the remaining downloads.
+        
+        Args:
+            urls: URLs to extract content from
+            max_concurrency: Maximum number of requests in flight
+            
+        Returns:
+            One result per URL, in input order (see extract()). When
+            config.raise_on_error is False, failed URLs yield None.
+            
+        Raises:
+            ValueError: If a URL is unsupported and config.raise_on_error is True
+            Exception: If an extraction fails and config.raise_on_error is True
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+        async with self._create_async_client() as client:
+            return await asyncio.gather(
+                *(self._extract_one(client, semaphore, url) for url in urls)
+            )
+    
+    def _create_async_client(self) -> httpx.AsyncClient:
+        """
+        Create the async HTTP client used by extract_many.
+        
+        Returns:
+            Configured httpx.AsyncClient
+        """
+        return httpx.AsyncClient(
+            http2=_HAS_HTTP2,
+            limits=httpx.Limits(
+                max_connections=ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=ASYNC_MAX_KEEPALIVE
+            ),
+            timeout=self.config.timeout,
+            headers=self.config.get_headers(),
+            follow_redirects=True
+        )
+    
+    async def _extract_one(self, client: httpx.AsyncClient, semaphore: asyncio.Semaphore, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch and parse a single URL for extract_many.
+        
+        Args:
+            client: Shared async HTTP client
+            semaphore: Limits the number of requests in flight
+            url: URL to extract content from
+            
+        Returns:
+            Extracted content, or None on failure when errors are not raised
+        """
+        try:
+            if not self.validate_url(url):
+                raise ValueError(f"Unsupported URL: {url}")
+            
+            async with semaphore:
+                response = await client.get(url)
+                response.raise_for_status()
+            
+            # Parsing is CPU-bound; keep it off the event loop
+            return await asyncio.to_thread(self._parse_page, url, response.text)
+            
+        except Exception as e:
+            self.logger.error(f"Failed to extract content from {url}: {str(e)}")
+            if self.config.raise_on_error:
+                raise
+            return None
+    
+    def _parse_page(self, url: str, html: str) -> Dict[str, Any]:
+        """
+        Build the extraction result for a fetched page.
+        
+        Args:
+            url: URL of the page
+            html: Page HTML
+            
+        Returns:
+            Dict with the same keys as extract()
+            
+        Template Note:
+            Fill in title, content, author and date for your target site
+        """
+        document = make_document(html, self.config.use_selectolax)
+        
+        return {
+            'url': url,
+            'title': '',
+            'content': '',
+            'author': '',
+            'publish_date': None,
+            'metadata': self._extract_metadata(document) if self.config.extract_metadata else {}
+        }
+    
     def validate_url(self, url: str) -> bool:
         """
         Validate if the URL can be processed by this extractor.
@@ -130,19 +332,28 @@ class ExampleExtractor(BaseExtractor):
             True if URL is supported, False otherwise
         """
         try:
-            parsed_url = urlparse(url)
-            domain = parsed_url.netloc.lower()
-            
-            # Remove www. prefix for comparison
-            if domain.startswith('www.'):
-                domain = domain[4:]
-            
-            return domain in self.get_supported_domains()
+            return get_domain(url) in self._supported_domain_set()
             
         except Exception as e:
             self.logger.warning(f"Failed to validate URL {url}: {str(e)}")
             return False
     
+    def _supported_domain_set(self) -> FrozenSet[str]:
+        """
+        Return the supported domains as a frozenset, built on first use.
+        
+        Membership is O(1) regardless of how many domains are supported,
+        instead of a linear scan over the list on every URL.
+        
+        Returns:
+            Lower-cased supported domains
+        """
+        if self._domain_set is None:
+            self._domain_set = frozenset(
+                domain.lower() for domain in self.get_supported_domains()
+            )
+        return self._domain_set
+    
     def get_supported_domains(self) -> List[str]:
         """
         Return list of supported domains.
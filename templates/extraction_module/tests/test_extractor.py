@@ -5,7 +5,11 @@ This file serves as a template for testing extractor modules.
 Copy and modify this when creating new extractors.
 """
 
+import asyncio
+import httpx
 import pytest
+import requests
+from dataclasses import FrozenInstanceError, replace
 from unittest.mock import Mock, patch
 import sys
 import os
@@ -14,6 +18,7 @@ import os
 sys.path.insert(0, os.path.abspath('../../../'))
 
 from templates.extraction_module.extractor import ExampleExtractor, BaseExtractor
+from templates.extraction_module.utils import get_domain
 from templates.extraction_module.config import ExampleConfig
 
 
@@ -30,6 +35,7 @@ class TestExampleConfig:
         assert config.extract_images is True
         assert config.extract_links is True
         assert config.extract_metadata is True
+        assert config.use_selectolax is True
     
     def test_config_validation(self):
         """Test configuration validation."""
@@ -39,14 +45,25 @@ class TestExampleConfig:
         assert config.validate() is True
         
         # Invalid configurations should raise ValueError
-        config.timeout = -1
         with pytest.raises(ValueError, match="Timeout must be positive"):
-            config.validate()
+            replace(config, timeout=-1).validate()
         
-        config.timeout = 30
-        config.max_retries = -1
         with pytest.raises(ValueError, match="Max retries cannot be negative"):
-            config.validate()
+            replace(config, max_retries=-1).validate()
+    
+    def test_config_is_immutable_and_hashable(self):
+        """Test that configs are frozen and usable as cache keys."""
+        config = ExampleConfig(custom_headers={'X-Test': '1'}, supported_content_types=['text/html'])
+        
+        with pytest.raises(FrozenInstanceError):
+            config.timeout = 10
+        with pytest.raises(TypeError):
+            config.custom_headers['X-Other'] = '2'
+        
+        assert config.supported_content_types == ('text/html',)
+        assert config.get_headers()['X-Test'] == '1'
+        assert not hasattr(config, '__dict__')
+        assert {config: 'cached'}[ExampleConfig(custom_headers={'X-Test': '1'}, supported_content_types=('text/html',))] == 'cached'
     
     def test_get_headers(self):
         """Test HTTP headers generation."""
@@ -100,6 +117,72 @@ class TestExampleExtractor:
         extractor = ExampleExtractor()
         assert isinstance(extractor.config, ExampleConfig)
     
+    def test_session_is_reused_across_fetches(self):
+        """Test that every fetch goes through the one pooled session."""
+        session = self.extractor._session
+        adapter = session.get_adapter('https://example.com')
+        assert adapter.max_retries.total == self.config.max_retries
+        assert session.headers['User-Agent'] == self.config.user_agent
+        
+        with patch.object(session, 'get') as mock_get:
+            mock_get.return_value.text = '<html></html>'
+            assert self.extractor._fetch('https://example.com/a') == '<html></html>'
+            assert self.extractor._fetch('https://example.com/b') == '<html></html>'
+        
+        assert self.extractor._session is session
+        assert mock_get.call_count == 2
+        mock_get.assert_called_with('https://example.com/b', timeout=self.config.timeout)
+    
+    def test_context_manager_closes_session(self):
+        """Test that leaving the context closes the session."""
+        with patch.object(requests.Session, 'close') as mock_close:
+            with ExampleExtractor(self.config) as extractor:
+                mock_close.assert_not_called()
+        
+        assert isinstance(extractor, ExampleExtractor)
+        mock_close.assert_called_once()
+    
+    def test_extract_many_fetches_concurrently(self):
+        """Test batch extraction over one async client, with per-URL failures."""
+        requested = []
+        
+        def handler(request):
+            requested.append(str(request.url))
+            if request.url.path == '/missing':
+                return httpx.Response(404)
+            return httpx.Response(200, text='<html><body><p>Story</p></body></html>')
+        
+        def client():
+            return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        
+        urls = ['https://example.com/a', 'https://example.com/missing', 'https://unsupported.com/x']
+        extractor = ExampleExtractor(replace(self.config, raise_on_error=False))
+        with patch.object(extractor, '_create_async_client', side_effect=client):
+            results = asyncio.run(extractor.extract_many(urls, max_concurrency=2))
+        
+        assert results[0]['url'] == 'https://example.com/a'
+        assert results[1:] == [None, None]
+        assert sorted(requested) == ['https://example.com/a', 'https://example.com/missing']
+        
+        with patch.object(self.extractor, '_create_async_client', side_effect=client):
+            with pytest.raises(httpx.HTTPStatusError):
+                asyncio.run(self.extractor.extract_many(urls[:2]))
+    
+    def test_soup_is_parsed_once_per_page(self):
+        """Test that the page is parsed lazily, once, and re-parsed for the next page."""
+        with patch('templates.extraction_module.extractor.make_document') as mock_make:
+            mock_make.side_effect = lambda html, use_selectolax: Mock(html=html)
+            
+            self.extractor._load_page('<p>first</p>')
+            mock_make.assert_not_called()
+            assert self.extractor.soup is self.extractor.soup
+            assert self.extractor.soup.html == '<p>first</p>'
+            
+            self.extractor._load_page('<p>second</p>')
+            assert self.extractor.soup.html == '<p>second</p>'
+        
+        assert mock_make.call_count == 2
+    
     def test_get_supported_domains(self):
         """Test supported domains list."""
         domains = self.extractor.get_supported_domains()
@@ -121,6 +204,28 @@ class TestExampleExtractor:
         assert self.extractor.validate_url('invalid-url') is False
         assert self.extractor.validate_url('') is False
     
+    def test_validate_url_builds_domain_set_once(self):
+        """Test that the supported domain list is only materialized once."""
+        with patch.object(ExampleExtractor, 'get_supported_domains', return_value=['Example.com']) as mock_domains:
+            extractor = ExampleExtractor(self.config)
+            
+            assert extractor.validate_url('https://example.com/a') is True
+            assert extractor.validate_url('https://www.example.com/b') is True
+            assert extractor.validate_url('https://other.com/c') is False
+            
+            mock_domains.assert_called_once()
+    
+    def test_validate_url_uses_cached_domain(self):
+        """Test that repeated URLs hit the get_domain cache."""
+        get_domain.cache_clear()
+        
+        assert self.extractor.validate_url('https://WWW.Example.com/story') is True
+        assert self.extractor.validate_url('https://WWW.Example.com/story') is True
+        
+        info = get_domain.cache_info()
+        assert info.misses == 1
+        assert info.hits == 1
+    
     def test_extract_unsupported_url(self):
         """Test extraction with unsupported URL."""
         with pytest.raises(ValueError, match="Unsupported URL"):
@@ -0,0 +1,306 @@
+"""
+Test suite for the Example Content Extractor utility helpers.
+"""
+
+import pytest
+from unittest.mock import patch
+import sys
+import os
+
+# Add the project root to sys.path for imports
+sys.path.insert(0, os.path.abspath('../../../'))
+
+from templates.extraction_module import utils
+from templates.extraction_module.utils import (
+    make_soup,
+    make_document,
+    parse_for_assets,
+    extract_all,
+    as_dicts,
+    Link,
+    Image,
+    extract_assets,
+    stream_extract,
+    clean_text,
+    truncate_text,
+    validate_url,
+    get_domain,
+    extract_links,
+    extract_images,
+    extract_meta_tags,
+    find_main_content,
+    remove_unwanted_elements,
+)
+
+
+SAMPLE_HTML = """
+<html>
+  <head>
+    <meta name="Description" content=" Game recap ">
+    <meta property="og:title" content="Week 1 Recap">
+  </head>
+  <body>
+    <nav><a href="/home">Home</a></nav>
+    <article>
+      <p>Kickoff   &amp; first drive.</p>
+      <a href="/players/1" title="Player">Player  one</a>
+      <img src="img/photo.jpg" alt="Photo" width="100" height="50">
+    </article>
+    <div class="ads">Buy now</div>
+    <script>var x = 1;</script>
+  </body>
+</html>
+"""
+
+
+@pytest.fixture(params=['bs4', 'selectolax'])
+def soup(request):
+    """Parsed page for each supported backend; helpers must behave the same on both."""
+    if request.param == 'selectolax':
+        pytest.importorskip('selectolax')
+        return make_document(SAMPLE_HTML)
+    return make_soup(SAMPLE_HTML)
+
+
+class TestParsing:
+    """Test soup construction."""
+    
+    def test_make_soup_uses_lxml(self):
+        """Test that soups are built with the lxml parser."""
+        assert utils.HTML_PARSER == 'lxml'
+        assert make_soup(SAMPLE_HTML).builder.NAME == 'lxml'
+    
+    def test_make_document_falls_back_to_bs4(self):
+        """Test that the BeautifulSoup path is kept when selectolax is disabled or missing."""
+        assert make_document(SAMPLE_HTML, use_selectolax=False).builder.NAME == 'lxml'
+        with patch.object(utils, '_HAS_SELECTOLAX', False):
+            assert make_document(SAMPLE_HTML).builder.NAME == 'lxml'
+    
+    def test_meta_keys_are_interned(self):
+        """Test that the same meta name on different pages maps to one key object."""
+        first = extract_meta_tags('<meta name="Description" content="a">')
+        second = extract_meta_tags('<meta name="DESCRIPTION" content="b">')
+        
+        key_a, = first
+        key_b, = second
+        assert key_a == 'description'
+        assert key_a is key_b
+    
+    def test_records_are_slotted(self):
+        """Test that link records carry no per-instance dict."""
+        link = Link('https://example.com/', 'Home', '')
+        assert not hasattr(link, '__dict__')
+    
+    def test_helpers_work_on_lxml_soup(self, soup):
+        """Test the extraction helpers on an lxml-built soup."""
+        links = extract_links(soup, 'https://example.com/news/')
+        assert Link('https://example.com/players/1', 'Player one', 'Player') in links
+        
+        images = extract_images(soup, 'https://example.com/news/')
+        assert images == [Image('https://example.com/news/img/photo.jpg', 'Photo', '', '100', '50')]
+        assert as_dicts(images) == [{
+            'url': 'https://example.com/news/img/photo.jpg',
+            'alt': 'Photo',
+            'title': '',
+            'width': '100',
+            'height': '50'
+        }]
+        
+        meta = extract_meta_tags(soup)
+        assert meta == {'description': 'Game recap', 'og:title': 'Week 1 Recap'}
+        
+        lexbor = utils._is_lexbor(soup)
+        main = find_main_content(soup)
+        assert (main.tag if lexbor else main.name) == 'article'
+        
+        cleaned = remove_unwanted_elements(soup)
+        select = cleaned.css if lexbor else cleaned.select
+        for selector in ('script', 'nav', '.ads'):
+            assert select(selector) == []
+
+
+class TestMainContent:
+    """Test main content detection."""
+    
+    def test_selector_priority_is_preserved(self, soup):
+        """Test that the combined selector returns what per-selector lookups would."""
+        page = (
+            '<body><div class="content" id="c1">a</div><div id="main">b</div>'
+            '<section role="main" id="r1">c</section><div class="post-content">d</div></body>'
+        )
+        doc = make_document(page) if utils._is_lexbor(soup) else make_soup(page)
+        
+        found = find_main_content(doc)
+        
+        found_id = found.attributes['id'] if utils._is_lexbor(doc) else found['id']
+        assert found_id == 'r1'
+    
+    def test_fallback_picks_largest_text_block(self):
+        """Test that the bottom-up fallback agrees with measuring get_text() per block."""
+        page = make_soup(
+            '<body><div id="outer"><section id="s1"><div id="d1">short</div>'
+            '<script>ignored script text that is very long</script></section>'
+            '<div id="d2">a much longer paragraph of text<!-- long comment here --></div>'
+            '<div id="d3"><div id="d4">nested</div> tail</div></div>'
+            '<section id="s2">tie</section><div id="d5">tie</div></body>'
+        )
+        
+        blocks = page.find_all(['div', 'section', 'article'])
+        expected = max(blocks, key=lambda x: len(x.get_text()))
+        
+        assert find_main_content(page) is expected
+        assert expected['id'] == 'outer'
+        
+        page.find(id='outer').unwrap()
+        blocks = page.find_all(['div', 'section', 'article'])
+        assert utils._largest_text_block(page) is max(blocks, key=lambda x: len(x.get_text()))
+
+
+class TestFusedExtraction:
+    """Test the single-traversal extract_all helper."""
+    
+    def test_extract_all_matches_individual_helpers(self, soup):
+        """Test that one walk yields the same results as the separate helpers."""
+        base_url = 'https://example.com/news/'
+        expected = {
+            'links': extract_links(soup, base_url),
+            'images': extract_images(soup, base_url),
+            'meta': extract_meta_tags(soup),
+        }
+        
+        assert extract_all(soup, base_url) == expected
+    
+    def test_extract_all_can_remove_unwanted_elements(self, soup):
+        """Test that unwanted elements are decomposed after extraction."""
+        result = extract_all(soup, 'https://example.com/news/', remove_unwanted=True)
+        
+        # Links inside removed elements were extracted before removal
+        assert 'https://example.com/home' in [link.url for link in result['links']]
+        select = soup.css if utils._is_lexbor(soup) else soup.select
+        for selector in ('script', 'nav', '.ads'):
+            assert select(selector) == []
+        assert len(select('article')) == 1
+
+
+class TestStreamingExtraction:
+    """Test the incremental (streaming) extraction path."""
+    
+    def test_stream_extract_matches_full_parse(self):
+        """Test that streaming in small chunks yields the same records as a full parse."""
+        base_url = 'https://example.com/news/'
+        expected = extract_all(make_soup(SAMPLE_HTML), base_url)
+        
+        assert stream_extract(SAMPLE_HTML.encode(), base_url, chunk_size=16) == expected
+        chunks = [SAMPLE_HTML[i:i + 7].encode() for i in range(0, len(SAMPLE_HTML), 7)]
+        assert stream_extract(chunks, base_url) == expected
+    
+    def test_link_text_survives_nested_images(self):
+        """Test that pruning after an inner image keeps the enclosing link's text."""
+        page = '<body><a href="/p"><span>Player</span> <img src="x.png"> one</a></body>'
+        
+        result = stream_extract(page, 'https://example.com/')
+        
+        assert result['links'][0].text == 'Player one'
+        assert result['images'][0].url == 'https://example.com/x.png'
+    
+    def test_extract_assets_streams_large_pages(self):
+        """Test that only pages above the threshold take the streaming path."""
+        base_url = 'https://example.com/news/'
+        with patch.object(utils, 'stream_extract', wraps=utils.stream_extract) as mock_stream:
+            small = extract_assets(SAMPLE_HTML, base_url)
+            mock_stream.assert_not_called()
+            
+            with patch.object(utils, 'STREAMING_THRESHOLD_BYTES', 10):
+                large = extract_assets(SAMPLE_HTML, base_url)
+            mock_stream.assert_called_once()
+        
+        assert small == large
+
+
+class TestStrainedParsing:
+    """Test parsing only the tags each helper needs."""
+    
+    def test_helpers_accept_raw_html(self):
+        """Test that raw HTML is parsed with the matching strainer."""
+        base_url = 'https://example.com/news/'
+        full = make_soup(SAMPLE_HTML)
+        
+        assert extract_links(SAMPLE_HTML, base_url) == extract_links(full, base_url)
+        assert extract_images(SAMPLE_HTML, base_url) == extract_images(full, base_url)
+        assert extract_meta_tags(SAMPLE_HTML) == extract_meta_tags(full)
+    
+    def test_asset_soup_serves_all_helpers(self):
+        """Test that one union-strained parse serves links, images and meta tags."""
+        base_url = 'https://example.com/news/'
+        assets = parse_for_assets(SAMPLE_HTML)
+        full = make_soup(SAMPLE_HTML)
+        
+        assert assets.find('script') is None
+        assert assets.find('p') is None
+        assert extract_links(assets, base_url) == extract_links(full, base_url)
+        assert extract_images(assets, base_url) == extract_images(full, base_url)
+        assert extract_meta_tags(assets) == extract_meta_tags(full)
+
+
+class TestTextAndUrls:
+    """Test text cleaning and URL helpers."""
+    
+    def test_clean_text(self):
+        """Test entity decoding and whitespace collapsing."""
+        assert clean_text("  Kickoff&nbsp;\n\t&amp;  drive  ") == "Kickoff & drive"
+        assert clean_text("No\u2003entities\u00a0\r\n here ") == "No entities here"
+        assert clean_text("") == ""
+        assert clean_text(None) == ""
+    
+    def test_truncate_text(self):
+        """Test that truncation breaks at a late word boundary or hard-cuts."""
+        text = "word " * 40
+        
+        assert truncate_text(text[:50], max_length=50) == text[:50]
+        assert truncate_text(text, max_length=50) == "word word word word word word word word word..."
+        # No space in the last 20% of the window: cut at the hard limit
+        assert truncate_text("x" * 30 + " " + "y" * 100, max_length=50) == "x" * 30 + " " + "y" * 16 + "..."
+        assert truncate_text("z" * 100, max_length=10, suffix="") == "z" * 10
+    
+    def test_url_helpers_share_parse_cache(self):
+        """Test that validate_url and get_domain reuse cached parses."""
+        # get_domain is memoized too; a warm entry would skip the parse cache entirely
+        utils.get_domain.cache_clear()
+        utils._cached_urlparse.cache_clear()
+        url = 'https://www.Example.com/story'
+        
+        assert validate_url(url) is True
+        assert get_domain(url) == 'example.com'
+        assert validate_url('not a url') is False
+        
+        info = utils._cached_urlparse.cache_info()
+        assert info.hits == 1
+        assert info.misses == 2
+    
+    def test_absolute_links_skip_urljoin(self):
+        """Test that absolute links are kept as-is and relative ones still resolve."""
+        base_url = 'https://example.com/news/'
+        with patch.object(utils, 'urljoin', wraps=utils.urljoin) as mock_join:
+            assert utils._absolute_url(base_url, 'https://cdn.example.com/a.jpg') == 'https://cdn.example.com/a.jpg'
+            mock_join.assert_not_called()
+            
+            assert utils._absolute_url(base_url, '../scores') == 'https://example.com/scores'
+            assert utils._absolute_url(base_url, '//cdn.example.com/b.jpg') == 'https://cdn.example.com/b.jpg'
+            assert mock_join.call_count == 2
+
+
+class TestCleanup:
+    """Test removal of unwanted elements."""
+    
+    def test_nested_unwanted_elements_removed_in_one_pass(self):
+        """Test that one precompiled selector removes nested matches without errors."""
+        page = make_soup(
+            '<body><aside class="sidebar"><div class="ads"><script>x</script></div></aside>'
+            '<article><p>Keep me</p><div class="comments">c</div></article></body>'
+        )
+        
+        with patch.object(utils, '_UNWANTED_PATTERN', wraps=utils._UNWANTED_PATTERN) as mock_pattern:
+            cleaned = remove_unwanted_elements(page)
+        
+        mock_pattern.select.assert_called_once_with(page)
+        assert cleaned.get_text() == 'Keep me'
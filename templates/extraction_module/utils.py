@@ -4,16 +4,167 @@ Utility functions for Example Content Extractor
 Author: Tackle4Loss Development Team
 """
 
-import re
 import html
 import logging
-from typing import List, Optional, Dict, Any
+import sys
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple, Union
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup, Tag
+import soupsieve
+from lxml import etree
+from bs4 import BeautifulSoup, CData, NavigableString, SoupStrainer, Tag
+
+# Optional selectolax support (pip install selectolax): Lexbor-backed C parser
+# with native CSS selection, used for the hot extraction paths when available
+try:
+    from selectolax.lexbor import LexborHTMLParser, LexborNode
+    _HAS_SELECTOLAX = True
+except ImportError:
+    LexborHTMLParser = LexborNode = None
+    _HAS_SELECTOLAX = False
 
 
 logger = logging.getLogger(__name__)
 
+# A parsed page: either a BeautifulSoup tree or a selectolax Lexbor tree
+Document = Union[BeautifulSoup, 'LexborHTMLParser']
+
+# Elements removed by remove_unwanted_elements: plain tag names and classes
+UNWANTED_SELECTORS = (
+    'script',
+    'style',
+    'nav',
+    'header',
+    'footer',
+    'aside',
+    '.advertisement',
+    '.ads',
+    '.sidebar',
+    '.comments',
+    '.social-share',
+    '.related-posts'
+)
+# Common main-content selectors, highest priority first
+MAIN_CONTENT_SELECTORS = (
+    'main',
+    'article',
+    '[role="main"]',
+    '.main-content',
+    '.content',
+    '.post-content',
+    '.entry-content',
+    '#content',
+    '#main'
+)
+# Compiled once at import (soupsieve is BeautifulSoup's CSS engine)
+_MAIN_CONTENT_PATTERN = soupsieve.compile(', '.join(MAIN_CONTENT_SELECTORS))
+_MAIN_CONTENT_PATTERNS = tuple(soupsieve.compile(selector) for selector in MAIN_CONTENT_SELECTORS)
+
+# All unwanted selectors as one selector group, matched in a single tree walk
+UNWANTED_SELECTOR = ', '.join(UNWANTED_SELECTORS)
+_UNWANTED_PATTERN = soupsieve.compile(UNWANTED_SELECTOR)
+_UNWANTED_TAGS = frozenset(sel for sel in UNWANTED_SELECTORS if not sel.startswith('.'))
+_UNWANTED_CLASSES = frozenset(sel[1:] for sel in UNWANTED_SELECTORS if sel.startswith('.'))
+
+# Pages larger than this are streamed by extract_assets instead of parsed whole
+STREAMING_THRESHOLD_BYTES = 1_000_000
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# urlparse is pure Python and pages repeat the same URLs; memoize it
+_cached_urlparse = lru_cache(maxsize=8192)(urlparse)
+
+_ABSOLUTE_PREFIXES = ('http://', 'https://')
+
+# Parser used for every soup built by this module; lxml is C-based and much
+# faster than the pure-Python "html.parser" on full article pages.
+HTML_PARSER = 'lxml'
+
+
+def _absolute_url(base_url: str, href: str) -> str:
+    """
+    Resolve ``href`` against ``base_url``.
+    
+    Links that are already absolute are returned as-is (urljoin would not
+    change them), skipping the pure-Python urljoin.
+    """
+    if href.startswith(_ABSOLUTE_PREFIXES):
+        return href
+    return urljoin(base_url, href)
+
+
+def make_soup(html_text: str) -> BeautifulSoup:
+    """
+    Parse HTML into a BeautifulSoup object using the lxml parser.
+    
+    Use this instead of constructing BeautifulSoup directly so all helpers
+    in this module operate on trees built by the same (fast) parser.
+    
+    Args:
+        html_text: Raw HTML
+        
+    Returns:
+        Parsed BeautifulSoup object
+    """
+    return BeautifulSoup(html_text, HTML_PARSER)
+
+
+def make_document(html_text: str, use_selectolax: bool = True) -> Document:
+    """
+    Parse HTML with selectolax when available, otherwise with BeautifulSoup.
+    
+    All helpers in this module accept either kind of tree.
+    
+    Args:
+        html_text: Raw HTML
+        use_selectolax: Set to False to keep the BeautifulSoup path
+            (see ExampleConfig.use_selectolax)
+        
+    Returns:
+        LexborHTMLParser tree, or BeautifulSoup object as a fallback
+    """
+    if use_selectolax and _HAS_SELECTOLAX:
+        return LexborHTMLParser(html_text)
+    return make_soup(html_text)
+
+
+def _is_lexbor(doc: Any) -> bool:
+    """Return True if ``doc`` is a selectolax tree."""
+    return _HAS_SELECTOLAX and isinstance(doc, LexborHTMLParser)
+
+
+# Strainers restricting parsing to the tags a helper actually reads, so no
+# Python objects are built for the rest of the page
+LINK_STRAINER = SoupStrainer('a', href=True)
+IMAGE_STRAINER = SoupStrainer('img', src=True)
+META_STRAINER = SoupStrainer('meta')
+ASSET_STRAINER = SoupStrainer(['a', 'img', 'meta'])
+
+
+def parse_for_links(html_text: str) -> BeautifulSoup:
+    """Parse only the ``<a href>`` tags of a page."""
+    return BeautifulSoup(html_text, HTML_PARSER, parse_only=LINK_STRAINER)
+
+
+def parse_for_images(html_text: str) -> BeautifulSoup:
+    """Parse only the ``<img src>`` tags of a page."""
+    return BeautifulSoup(html_text, HTML_PARSER, parse_only=IMAGE_STRAINER)
+
+
+def parse_for_meta(html_text: str) -> BeautifulSoup:
+    """Parse only the ``<meta>`` tags of a page."""
+    return BeautifulSoup(html_text, HTML_PARSER, parse_only=META_STRAINER)
+
+
+def parse_for_assets(html_text: str) -> BeautifulSoup:
+    """
+    Parse the ``<a>``, ``<img>`` and ``<meta>`` tags of a page in one pass.
+    
+    Use this when calling several of extract_links / extract_images /
+    extract_meta_tags on the same page, instead of parsing it once per helper.
+    """
+    return BeautifulSoup(html_text, HTML_PARSER, parse_only=ASSET_STRAINER)
+
 
 def clean_text(text: str) -> str:
     """
@@ -28,186 +179,397 @@ def clean_text(text: str) -> str:
     if not text:
         return ''
     
-    # Decode HTML entities
-    text = html.unescape(text)
+    # Decode HTML entities (only possible if there is an '&')
+    if '&' in text:
+        text = html.unescape(text)
     
-    # Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text)
+    # Collapse whitespace runs and trim; str.split() covers the same
+    # Unicode whitespace as \s and runs in C
+    return ' '.join(text.split())
+
+
+@dataclass(slots=True)
+class Link:
+    """A link found on a page (slotted: pages can hold hundreds of these)."""
+    url: str
+    text: str
+    title: str
+
+
+@dataclass(slots=True)
+class Image:
+    """An image found on a page."""
+    url: str
+    alt: str
+    title: str
+    width: Optional[str] = None
+    height: Optional[str] = None
+
+
+def as_dicts(records: Iterable[Union[Link, Image]]) -> List[Dict[str, Any]]:
+    """
+    Convert Link/Image records to plain dictionaries.
     
-    # Remove leading/trailing whitespace
-    text = text.strip()
+    Args:
+        records: Records returned by the extraction helpers
+        
+    Returns:
+        List of dictionaries with the record fields as keys
+    """
+    return [asdict(record) for record in records]
+
+
+def _link_record(attrs: Mapping[str, Any], get_text: Callable[[], str], base_url: str) -> Optional[Link]:
+    """Build the Link for an ``<a>`` tag, or None if it has no href."""
+    href = (attrs.get('href') or '').strip()
+    if not href:
+        return None
     
-    return text
+    return Link(
+        _absolute_url(base_url, href),  # Resolve relative URLs
+        clean_text(get_text()),
+        (attrs.get('title') or '').strip()
+    )
+
+
+def _image_record(attrs: Mapping[str, Any], base_url: str) -> Optional[Image]:
+    """Build the Image for an ``<img>`` tag, or None if it has no src."""
+    src = (attrs.get('src') or '').strip()
+    if not src:
+        return None
+    
+    return Image(
+        _absolute_url(base_url, src),  # Resolve relative URLs
+        (attrs.get('alt') or '').strip(),
+        (attrs.get('title') or '').strip(),
+        attrs.get('width'),  # Dimensions if available
+        attrs.get('height')
+    )
+
+
+def _meta_entry(attrs: Mapping[str, Any]) -> Optional[Tuple[str, str]]:
+    """Return the (name, content) pair of a ``<meta>`` tag, or None."""
+    name = attrs.get('name') or attrs.get('property') or attrs.get('http-equiv')
+    content = attrs.get('content')
+    
+    if name and content:
+        # Meta names repeat across pages; intern them so every page's dict
+        # shares one key object per name
+        return sys.intern(name.lower()), content.strip()
+    return None
+
+
+def _class_list(attrs: Mapping[str, Any]) -> List[str]:
+    """Return a tag's classes (bs4 stores a list, selectolax a string)."""
+    classes = attrs.get('class') or ()
+    return classes.split() if isinstance(classes, str) else list(classes)
 
 
-def extract_links(soup: BeautifulSoup, base_url: str) -> List[Dict[str, str]]:
+def extract_links(soup: Union[Document, str], base_url: str) -> List[Link]:
     """
     Extract all links from the page.
     
     Args:
-        soup: BeautifulSoup object
+        soup: BeautifulSoup object, selectolax tree, or raw HTML
+            (parsed with parse_for_links)
         base_url: Base URL for resolving relative links
         
     Returns:
-        List of dictionaries containing link information
+        List of Link records (use as_dicts() for plain dictionaries)
     """
-    links = []
+    if isinstance(soup, str):
+        soup = parse_for_links(soup)
     
-    for link in soup.find_all('a', href=True):
-        href = link.get('href', '').strip()
-        if not href:
-            continue
-        
-        # Resolve relative URLs
-        absolute_url = urljoin(base_url, href)
-        
-        # Get link text
-        text = clean_text(link.get_text())
-        
-        # Get title attribute
-        title = link.get('title', '').strip()
-        
-        links.append({
-            'url': absolute_url,
-            'text': text,
-            'title': title
-        })
+    if _is_lexbor(soup):
+        records = (_link_record(node.attributes, node.text, base_url) for node in soup.css('a[href]'))
+    else:
+        records = (_link_record(tag.attrs, tag.get_text, base_url) for tag in soup.find_all('a', href=True))
     
-    return links
+    return [record for record in records if record]
 
 
-def extract_images(soup: BeautifulSoup, base_url: str) -> List[Dict[str, str]]:
+def extract_images(soup: Union[Document, str], base_url: str) -> List[Image]:
     """
     Extract all images from the page.
     
     Args:
-        soup: BeautifulSoup object
+        soup: BeautifulSoup object, selectolax tree, or raw HTML
+            (parsed with parse_for_images)
         base_url: Base URL for resolving relative URLs
         
     Returns:
-        List of dictionaries containing image information
+        List of Image records (use as_dicts() for plain dictionaries)
     """
-    images = []
+    if isinstance(soup, str):
+        soup = parse_for_images(soup)
     
-    for img in soup.find_all('img', src=True):
-        src = img.get('src', '').strip()
-        if not src:
-            continue
-        
-        # Resolve relative URLs
-        absolute_url = urljoin(base_url, src)
-        
-        # Get alt text
-        alt = img.get('alt', '').strip()
-        
-        # Get title attribute
-        title = img.get('title', '').strip()
-        
-        # Get dimensions if available
-        width = img.get('width')
-        height = img.get('height')
-        
-        images.append({
-            'url': absolute_url,
-            'alt': alt,
-            'title': title,
-            'width': width,
-            'height': height
-        })
+    if _is_lexbor(soup):
+        records = (_image_record(node.attributes, base_url) for node in soup.css('img[src]'))
+    else:
+        records = (_image_record(tag.attrs, base_url) for tag in soup.find_all('img', src=True))
     
-    return images
+    return [record for record in records if record]
 
 
-def extract_meta_tags(soup: BeautifulSoup) -> Dict[str, str]:
+def extract_meta_tags(soup: Union[Document, str]) -> Dict[str, str]:
     """
     Extract meta tags from the page.
     
     Args:
-        soup: BeautifulSoup object
+        soup: BeautifulSoup object, selectolax tree, or raw HTML
+            (parsed with parse_for_meta)
         
     Returns:
         Dictionary of meta tag content
     """
-    meta_data = {}
+    if isinstance(soup, str):
+        soup = parse_for_meta(soup)
     
-    # Standard meta tags
-    for meta in soup.find_all('meta'):
-        name = meta.get('name') or meta.get('property') or meta.get('http-equiv')
-        content = meta.get('content')
+    if _is_lexbor(soup):
+        entries = (_meta_entry(node.attributes) for node in soup.css('meta'))
+    else:
+        entries = (_meta_entry(tag.attrs) for tag in soup.find_all('meta'))
+    
+    return dict(entry for entry in entries if entry)
+
+
+def extract_all(soup: Document, base_url: str, remove_unwanted: bool = False) -> Dict[str, Any]:
+    """
+    Extract links, images and meta tags in a single traversal of the page.
+    
+    Equivalent to calling extract_links, extract_images and extract_meta_tags
+    (and optionally remove_unwanted_elements afterwards), but walks the tree
+    once instead of once per helper.
+    
+    Args:
+        soup: BeautifulSoup object or selectolax tree
+        base_url: Base URL for resolving relative URLs
+        remove_unwanted: Also decompose the UNWANTED_SELECTORS elements,
+            in one batch after extraction
         
-        if name and content:
-            meta_data[name.lower()] = content.strip()
+    Returns:
+        Dictionary with 'links', 'images' and 'meta' entries
+    """
+    links: List[Link] = []
+    images: List[Image] = []
+    meta_data: Dict[str, str] = {}
+    unwanted = []
+    
+    if _is_lexbor(soup):
+        selector = 'a[href], img[src], meta'
+        if remove_unwanted:
+            selector += ', ' + UNWANTED_SELECTOR
+        nodes = ((node.tag, node.attributes, node.text, node) for node in soup.css(selector))
+    else:
+        nodes = ((tag.name, tag.attrs, tag.get_text, tag) for tag in soup.find_all(True))
+    
+    for name, attrs, get_text, node in nodes:
+        if name == 'a' and 'href' in attrs:
+            record = _link_record(attrs, get_text, base_url)
+            if record:
+                links.append(record)
+        elif name == 'img' and 'src' in attrs:
+            record = _image_record(attrs, base_url)
+            if record:
+                images.append(record)
+        elif name == 'meta':
+            entry = _meta_entry(attrs)
+            if entry:
+                meta_data[entry[0]] = entry[1]
+        
+        if remove_unwanted and (name in _UNWANTED_TAGS or not _UNWANTED_CLASSES.isdisjoint(_class_list(attrs))):
+            unwanted.append(node)
+    
+    for node in unwanted:
+        node.decompose()
+    
+    return {'links': links, 'images': images, 'meta': meta_data}
+
+
+def stream_extract(
+    html_data: Union[bytes, str, Iterable[bytes]],
+    base_url: str,
+    chunk_size: int = STREAM_CHUNK_SIZE
+) -> Dict[str, Any]:
+    """
+    Extract links, images and meta tags by streaming HTML through lxml.
+    
+    The page is fed to an incremental parser in chunks and each ``<a>``,
+    ``<img>`` and ``<meta>`` element is turned into a record as soon as it is
+    closed. Processed elements and their earlier siblings are then dropped,
+    so peak memory stays bounded instead of growing with the full tree.
+    
+    Args:
+        html_data: Raw HTML, or an iterable of byte chunks
+            (e.g. ``response.iter_content()``)
+        base_url: Base URL for resolving relative URLs
+        chunk_size: Bytes fed per step when ``html_data`` is a single string
+        
+    Returns:
+        Dictionary with 'links', 'images' and 'meta' entries, as extract_all
+    """
+    links: List[Link] = []
+    images: List[Image] = []
+    meta_data: Dict[str, str] = {}
+    
+    if isinstance(html_data, (bytes, str)):
+        chunks = (html_data[i:i + chunk_size] for i in range(0, len(html_data), chunk_size))
+    else:
+        chunks = html_data
     
-    return meta_data
+    parser = etree.HTMLPullParser(events=('end',), tag=('a', 'img', 'meta'))
+    
+    def consume_events() -> None:
+        for _, elem in parser.read_events():
+            attrs = elem.attrib
+            if elem.tag == 'a' and 'href' in attrs:
+                record = _link_record(attrs, lambda: ''.join(elem.itertext()), base_url)
+                if record:
+                    links.append(record)
+            elif elem.tag == 'img' and 'src' in attrs:
+                record = _image_record(attrs, base_url)
+                if record:
+                    images.append(record)
+            elif elem.tag == 'meta':
+                entry = _meta_entry(attrs)
+                if entry:
+                    meta_data[entry[0]] = entry[1]
+            
+            # Free processed nodes, unless an enclosing link still needs its text
+            if next(elem.iterancestors('a'), None) is None:
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+    
+    for chunk in chunks:
+        parser.feed(chunk)
+        consume_events()
+    parser.close()
+    consume_events()
+    
+    return {'links': links, 'images': images, 'meta': meta_data}
+
+
+def extract_assets(html_data: Union[bytes, str], base_url: str) -> Dict[str, Any]:
+    """
+    Extract links, images and meta tags, streaming pages above the threshold.
+    
+    Pages larger than STREAMING_THRESHOLD_BYTES go through stream_extract;
+    smaller ones are parsed with parse_for_assets and extract_all.
+    
+    Args:
+        html_data: Raw HTML (or the response body)
+        base_url: Base URL for resolving relative URLs
+        
+    Returns:
+        Dictionary with 'links', 'images' and 'meta' entries
+    """
+    if len(html_data) > STREAMING_THRESHOLD_BYTES:
+        return stream_extract(html_data, base_url)
+    return extract_all(parse_for_assets(html_data), base_url)
 
 
-def find_main_content(soup: BeautifulSoup) -> Optional[Tag]:
+def find_main_content(soup: Document) -> Optional[Union[Tag, 'LexborNode']]:
     """
     Attempt to find the main content area of the page.
     
     Args:
-        soup: BeautifulSoup object
+        soup: BeautifulSoup object or selectolax tree
         
     Returns:
-        BeautifulSoup Tag containing main content, or None
+        Tag (or LexborNode for a selectolax tree) containing main content, or None
     """
     # Try common content selectors
-    content_selectors = [
-        'main',
-        'article',
-        '[role="main"]',
-        '.main-content',
-        '.content',
-        '.post-content',
-        '.entry-content',
-        '#content',
-        '#main'
-    ]
-    
-    for selector in content_selectors:
-        content = soup.select_one(selector)
-        if content:
-            return content
+    if _is_lexbor(soup):
+        # Lexbor selection runs in C; per-selector lookups are already cheap
+        for selector in MAIN_CONTENT_SELECTORS:
+            content = soup.css_first(selector)
+            if content is not None:
+                return content
+        
+        text_blocks = soup.css('div, section, article')
+        if text_blocks:
+            return max(text_blocks, key=lambda x: len(x.text()))
+        return None
+    
+    # One walk over the combined selector, then keep the match of the
+    # highest-priority selector (first in document order)
+    candidates = _MAIN_CONTENT_PATTERN.select(soup)
+    if candidates:
+        return _highest_priority(candidates)
     
     # Fallback: look for the largest text block
-    text_blocks = soup.find_all(['div', 'section', 'article'])
-    if text_blocks:
-        # Sort by text length
-        largest_block = max(text_blocks, key=lambda x: len(x.get_text()))
-        return largest_block
+    return _largest_text_block(soup)
+
+
+def _highest_priority(candidates: List[Tag]) -> Tag:
+    """
+    Return the candidate matching the earliest MAIN_CONTENT_SELECTORS entry.
     
-    return None
+    Candidates are in document order, so among equal priorities the first
+    wins, exactly as with one select_one() per selector in priority order.
+    """
+    best, best_priority = None, len(MAIN_CONTENT_SELECTORS)
+    for node in candidates:
+        # Only selectors that would beat the current best need checking
+        priority = next((i for i in range(best_priority) if _MAIN_CONTENT_PATTERNS[i].match(node)), best_priority)
+        if priority < best_priority:
+            best, best_priority = node, priority
+            if priority == 0:
+                break
+    return best
+
+
+# String types counted by Tag.get_text() (excludes comments, scripts, styles)
+_TEXT_TYPES = (NavigableString, CData)
+_BLOCK_TAGS = frozenset({'div', 'section', 'article'})
 
 
-def remove_unwanted_elements(soup: BeautifulSoup) -> BeautifulSoup:
+def _largest_text_block(soup: BeautifulSoup) -> Optional[Tag]:
+    """
+    Return the div/section/article with the longest get_text().
+    
+    Text lengths are computed bottom-up in one pass (each tag adds up its
+    direct strings and its children's totals), instead of calling get_text()
+    on every block, which re-walks nested blocks and is quadratic on deeply
+    nested pages. Ties go to the first block in document order, like max().
+    """
+    sizes: Dict[int, int] = {}
+    largest_block, largest_size = None, -1
+    
+    # Reverse document order visits every child before its parent
+    for tag in reversed(soup.find_all(True)):
+        size = 0
+        for child in tag.contents:
+            if isinstance(child, Tag):
+                size += sizes[id(child)]
+            elif type(child) in _TEXT_TYPES:
+                size += len(child)
+        sizes[id(tag)] = size
+        
+        if tag.name in _BLOCK_TAGS and size >= largest_size:
+            largest_block, largest_size = tag, size
+    
+    return largest_block
+
+
+def remove_unwanted_elements(soup: Document) -> Document:
     """
     Remove unwanted elements from the soup.
     
     Args:
-        soup: BeautifulSoup object to clean
+        soup: BeautifulSoup object or selectolax tree to clean
         
     Returns:
-        Cleaned BeautifulSoup object
-    """
-    # Elements to remove
-    unwanted_selectors = [
-        'script',
-        'style',
-        'nav',
-        'header',
-        'footer',
-        'aside',
-        '.advertisement',
-        '.ads',
-        '.sidebar',
-        '.comments',
-        '.social-share',
-        '.related-posts'
-    ]
-    
-    for selector in unwanted_selectors:
-        for element in soup.select(selector):
-            element.decompose()
+        The same object, cleaned
+    """
+    if _is_lexbor(soup):
+        elements = soup.css(UNWANTED_SELECTOR)
+    else:
+        elements = _UNWANTED_PATTERN.select(soup)
+    
+    for element in elements:
+        element.decompose()
     
     return soup
 
@@ -223,16 +585,20 @@ def validate_url(url: str) -> bool:
         True if URL is valid, False otherwise
     """
     try:
-        result = urlparse(url)
+        result = _cached_urlparse(url)
         return all([result.scheme, result.netloc])
     except Exception:
         return False
 
 
+@lru_cache(maxsize=16384)
 def get_domain(url: str) -> Optional[str]:
     """
     Extract domain from URL.
     
+    Cached: the same URLs are validated repeatedly across a pipeline run
+    (e.g. by ExampleExtractor.validate_url for every article).
+    
     Args:
         url: URL to extract domain from
         
@@ -240,7 +606,7 @@ def get_domain(url: str) -> Optional[str]:
         Domain name or None if invalid URL
     """
     try:
-        parsed = urlparse(url)
+        parsed = _cached_urlparse(url)
         domain = parsed.netloc.lower()
         
         # Remove www. prefix
@@ -267,11 +633,10 @@ def truncate_text(text: str, max_length: int = 1000, suffix: str = '...') -> str
     if not text or len(text) <= max_length:
         return text
     
-    # Try to break at word boundary
-    truncated = text[:max_length - len(suffix)]
-    last_space = truncated.rfind(' ')
-    
-    if last_space > max_length * 0.8:  # Don't truncate too much
-        truncated = truncated[:last_space]
+    # Try to break at word boundary, but only look for a space in the last
+    # 20% of the allowed length so we don't truncate too much
+    cut = max_length - len(suffix)
+    last_space = text.rfind(' ', int(max_length * 0.8) + 1, cut)
+    end = last_space if last_space != -1 else cut
     
-    return truncated + suffix
+    return text[:end] + suffix
@@ -1,4 +1,7 @@
+import asyncio
 import unittest
+import pytest
+import re
 from unittest.mock import patch, MagicMock, call
 import sys
 import os
@@ -8,8 +11,8 @@ import logging
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../../src')))
 
 # Modules to be tested or that contain components to be mocked
-# Note: The client name in create_embeddings is now openai_client_instance
-from src.core.utils.create_embeddings import create_and_store_embedding, openai_client_instance
+from src.core.utils import create_embeddings
+from src.core.utils.create_embeddings import create_and_store_embedding, create_and_store_embeddings_batch
 from openai import APIError, APIConnectionError # For simulating OpenAI errors
 
 # Configure a simple logger for the test output (captures print statements from the module)
@@ -20,13 +23,21 @@ if not acceptance_test_logger.hasHandlers(): # Ensure handler is not added multi
     stream_handler = logging.StreamHandler(sys.stdout)
     acceptance_test_logger.addHandler(stream_handler)
 
-# This will be the mock for the logger inside create_embeddings.py
-mock_create_embeddings_logger = MagicMock(spec=logging.Logger)
+class TestEmbeddingResilience(unittest.IsolatedAsyncioTestCase):
 
-class TestEmbeddingResilience(unittest.TestCase):
+    # Inputs containing either phrase make the simulated OpenAI call fail
+    _FAIL_RE = staticmethod(re.compile(r"OpenAI APIError|also fail with OpenAI").search)
+
+    @pytest.fixture(autouse=True)
+    def _use_fake_openai(self, fake_openai):
+        # tests/conftest.py swaps openai_client_instance for a FakeOpenAI
+        self.fake_openai = fake_openai
 
     def setUp(self):
-        mock_create_embeddings_logger.reset_mock()
+        # Start every scenario with an empty in-memory embedding cache
+        for cache in (create_embeddings._embedding_cache, create_embeddings._simhash_bands, create_embeddings._simhash_by_key):
+            cache.clear()
+            self.addCleanup(cache.clear)
         # Sample articles
         self.sample_articles = [
             {"id": 1, "content": "This is a normal article content."},
@@ -34,98 +45,198 @@ class TestEmbeddingResilience(unittest.TestCase):
             {"id": 3, "content": "Another normal article."},
             {"id": 4, "content": "This one will also fail with OpenAI."},
         ]
-        self.mock_successful_embedding = [0.1, 0.2, 0.3, 0.4, 0.5]
 
 
-    @patch('src.core.utils.create_embeddings.logger', mock_create_embeddings_logger) # Patch the logger in the CUT
     @patch('src.core.utils.create_embeddings.supabase_client', new_callable=MagicMock)
-    @patch('src.core.utils.create_embeddings.openai_client_instance') # Patch the actual client instance used
-    def test_openai_failures_are_handled(self, mock_actual_openai_client, mock_supabase_client_for_embeddings):
-        # mock_actual_openai_client is the one used by create_embedding if not None
-        # The logger is patched directly with mock_create_embeddings_logger and not passed as an argument.
+    def test_openai_failures_are_handled(self, mock_supabase_client_for_embeddings):
+        # self.fake_openai is the client used by create_embedding (see tests/conftest.py)
+        # Log records from create_embeddings.py are captured with assertLogs below.
 
         acceptance_test_logger.info("\n--- Scenario 1: OpenAI API Failure during Embedding Creation ---")
 
-        # Ensure the client is not None for this test path, so create_embedding tries to use it.
-        # If we wanted to test client being None, we'd patch openai_client_instance to None.
-        # Here, we want to test its 'create' method failing.
-        # So, mock_actual_openai_client should simulate a configured client.
-        mock_actual_openai_client.api_key = "fake_key_for_test" # Ensure it passes the api_key check
-
-        # This error will be raised by the 'embeddings.create' call
+        # This error will be raised by 'embeddings.create' for any request that
+        # carries a failing input; a batched request fails if any input is bad
         simulated_error = APIConnectionError(message="Simulated OpenAI Connection Error", request=MagicMock())
-
-        def openai_create_side_effect(*args, **kwargs):
-            input_text = kwargs.get('input', '')
-            if "OpenAI APIError" in input_text or "also fail with OpenAI" in input_text:
-                raise simulated_error
-
-            mock_embedding_response = MagicMock()
-            mock_embedding_response.data = [MagicMock()]
-            mock_embedding_response.data[0].embedding = self.mock_successful_embedding
-            return mock_embedding_response
-
-        # Configure the .create method on the (already mocked) openai_client_instance
-        mock_actual_openai_client.embeddings.create.side_effect = openai_create_side_effect
-
-        # Mock the store_embedding's Supabase call
-        mock_supabase_insert_chain = MagicMock()
-        mock_supabase_client_for_embeddings.table.return_value.insert.return_value = mock_supabase_insert_chain
-        mock_supabase_insert_chain.execute.return_value = MagicMock(error=None)
+        self.fake_openai.fail_on = self._FAIL_RE
+        self.fake_openai.fail_with = simulated_error
+
+        # Give each Supabase table its own mock so ArticleVector writes can be told
+        # apart from EmbeddingCache reads/writes
+        supabase_tables = {}
+        def supabase_table(name):
+            if name not in supabase_tables:
+                supabase_tables[name] = MagicMock()
+                supabase_tables[name].select.return_value.in_.return_value.execute.return_value.data = []
+            return supabase_tables[name]
+        mock_supabase_client_for_embeddings.table.side_effect = supabase_table
+
+        # Stored ArticleVector rows are recorded by article id as they are written
+        inserted_by_id = {}
+        def capture_rows(rows):
+            for row in rows:
+                inserted_by_id[row["SourceArticle"]] = row
+            return MagicMock()
+        supabase_table("ArticleVector").insert.side_effect = capture_rows
 
         # --- Execution ---
         acceptance_test_logger.info("Processing articles for embedding and storage...")
-        for article in self.sample_articles:
-            acceptance_test_logger.info(f"Attempting to process article_id: {article['id']}")
-            create_and_store_embedding(article_id=article['id'], content=article['content'])
+        with self.assertLogs('src.core.utils.create_embeddings', level=logging.INFO) as captured:
+            stored_ids = create_and_store_embeddings_batch(self.sample_articles)
 
         # --- Verification ---
         acceptance_test_logger.info("\nVerifying results...")
 
-        # 1. Check logs for appropriate error messages (via mock_create_embeddings_logger)
-        # create_embedding logs errors for API failures.
-        # create_and_store_embedding logs info if embedding creation failed.
-
-        # Expected error logs for article 2 and 4 from create_embedding
-        # Format: logger.error("OpenAI APIError type for article_id %s: %s", article_id, e)
-        # Expected info logs for article 2 and 4 from create_and_store_embedding
-        # Format: logger.info("Embedding creation failed for article %s (see previous errors), skipping storage.", article_id)
-
-        # Check calls to the logger injected into create_embeddings.py
-        # Error calls from create_embedding
-        mock_create_embeddings_logger.error.assert_any_call(
-            "OpenAI APIConnectionError for article_id %s: %s", 2, simulated_error
-        )
-        mock_create_embeddings_logger.error.assert_any_call(
-            "OpenAI APIConnectionError for article_id %s: %s", 4, simulated_error
-        )
-        # Info calls from create_and_store_embedding
-        mock_create_embeddings_logger.info.assert_any_call(
-            "Embedding creation failed for article %s (see previous errors), skipping storage.", 2
-        )
-        mock_create_embeddings_logger.info.assert_any_call(
-            "Embedding creation failed for article %s (see previous errors), skipping storage.", 4
-        )
+        # 1. Check the captured log records, grouped by article_id (the first
+        # argument of every per-article message in create_embeddings.py)
+        levels_by_article = {}
+        errors_by_article = {}
+        for record in captured.records:
+            if record.args:
+                levels_by_article.setdefault(record.args[0], set()).add(record.levelno)
+                if record.levelno == logging.ERROR:
+                    errors_by_article[record.args[0]] = record.args[1]
+
+        # After the batched request fails, create_embedding logs an error for each
+        # failing article and create_and_store_embeddings_batch logs that storage was skipped
+        for failed_id in (2, 4):
+            self.assertIn(logging.ERROR, levels_by_article.get(failed_id, set()))
+            self.assertIn(logging.INFO, levels_by_article.get(failed_id, set()))
+            self.assertIs(errors_by_article[failed_id], simulated_error)
+        for stored_id in (1, 3):
+            self.assertNotIn(logging.ERROR, levels_by_article.get(stored_id, set()))
+
+        # The formatted output is joined once so each message check is a single substring search
+        logged = "\n".join(captured.output)
+        for failed_id in (2, 4):
+            self.assertIn(f"ERROR:src.core.utils.create_embeddings:OpenAI APIConnectionError for article_id {failed_id}", logged)
+            self.assertIn(f"INFO:src.core.utils.create_embeddings:Embedding creation failed for article {failed_id} ", logged)
 
         acceptance_test_logger.info("Verified: Error messages were logged for failed OpenAI calls.")
 
-        # 2. Verify that embeddings are "stored" only for successful articles (1 and 3)
-        successful_inserts_args = []
-        for call_args_list_item in mock_supabase_client_for_embeddings.table.return_value.insert.call_args_list:
-            data_inserted = call_args_list_item[0][0]
-            successful_inserts_args.append(data_inserted['SourceArticle'])
+        # 2. All four articles went to OpenAI in a single batched request first
+        batched_calls = [inputs for inputs in self.fake_openai.calls if isinstance(inputs, list)]
+        self.assertEqual(len(batched_calls), 1)
+        self.assertEqual(len(batched_calls[0]), 4)
 
-        self.assertIn(1, successful_inserts_args, "Embedding for article 1 should have been stored.")
-        self.assertIn(3, successful_inserts_args, "Embedding for article 3 should have been stored.")
-        self.assertNotIn(2, successful_inserts_args, "Embedding for article 2 should NOT have been stored.")
-        self.assertNotIn(4, successful_inserts_args, "Embedding for article 4 should NOT have been stored.")
+        # 3. Verify that embeddings are "stored" only for successful articles (1 and 3),
+        # buffered into a single bulk insert
+        self.assertEqual(stored_ids, [1, 3])
+        article_vector_insert = supabase_tables["ArticleVector"].insert
+        article_vector_insert.assert_called_once()
+        self.assertEqual(len(article_vector_insert.call_args[0][0]), 2)
+
+        self.assertIn(1, inserted_by_id, "Embedding for article 1 should have been stored.")
+        self.assertIn(3, inserted_by_id, "Embedding for article 3 should have been stored.")
+        self.assertNotIn(2, inserted_by_id, "Embedding for article 2 should NOT have been stored.")
+        self.assertNotIn(4, inserted_by_id, "Embedding for article 4 should NOT have been stored.")
 
         acceptance_test_logger.info("Verified: Embeddings stored correctly based on OpenAI success/failure.")
 
-        # 3. The script completes without crashing (implicitly verified by test completion)
+        # 4. The script completes without crashing (implicitly verified by test completion)
         acceptance_test_logger.info("Verified: Script completed without crashing.")
         acceptance_test_logger.info("--- Test Scenario 1 Complete ---")
 
+    @patch('src.core.utils.create_embeddings.supabase_client', new_callable=MagicMock)
+    def test_async_batch_embedding(self, mock_supabase_client_for_embeddings):
+        acceptance_test_logger.info("\n--- Scenario 6: Backfill through the OpenAI Batch API ---")
+        # Failing inputs come back as errored request lines of the batch job
+        self.fake_openai.fail_on = self._FAIL_RE
+        supabase_tables = {}
+        def supabase_table(name):
+            if name not in supabase_tables:
+                supabase_tables[name] = MagicMock()
+                supabase_tables[name].select.return_value.in_.return_value.execute.return_value.data = []
+            return supabase_tables[name]
+        mock_supabase_client_for_embeddings.table.side_effect = supabase_table
+
+        with self.assertLogs('src.core.utils.create_embeddings', level=logging.ERROR) as captured:
+            stored_ids = create_and_store_embeddings_batch(self.sample_articles, use_batch_api=True)
+
+        # All four articles went out in one job and nothing used the interactive endpoint
+        self.assertEqual(len(self.fake_openai.batch_api.submitted), 1)
+        self.assertEqual(len(self.fake_openai.batch_api.submitted[0]), 4)
+        self.assertEqual(self.fake_openai.calls, [])
+        self.assertEqual(sorted(record.args[0] for record in captured.records), [2, 4])
+
+        self.assertEqual(stored_ids, [1, 3])
+        article_vector_insert = supabase_tables["ArticleVector"].insert
+        article_vector_insert.assert_called_once()
+        self.assertEqual([row["SourceArticle"] for row in article_vector_insert.call_args[0][0]], [1, 3])
+        acceptance_test_logger.info("--- Test Scenario 6 Complete ---")
+
+    @patch('src.core.utils.create_embeddings.supabase_client', new_callable=MagicMock)
+    def test_repeated_content_is_served_from_cache(self, mock_supabase_client_for_embeddings):
+        acceptance_test_logger.info("\n--- Scenario 2: Re-ingesting an article hits the embedding cache ---")
+        # Nothing in the persistent EmbeddingCache table yet
+        mock_supabase_client_for_embeddings.table.return_value.select.return_value.in_.return_value.execute.return_value.data = []
+
+        article = self.sample_articles[0]
+        create_and_store_embedding(article_id=article['id'], content=article['content'])
+        create_and_store_embedding(article_id=article['id'], content=article['content'])
+
+        self.assertEqual(len(self.fake_openai.calls), 1)
+        # The embedding is still stored for both runs
+        self.assertEqual(mock_supabase_client_for_embeddings.table.return_value.insert.call_count, 2)
+        acceptance_test_logger.info("--- Test Scenario 2 Complete ---")
+
+    @patch('src.core.utils.create_embeddings.supabase_client', new_callable=MagicMock)
+    def test_near_duplicate_content_reuses_embedding(self, mock_supabase_client_for_embeddings):
+        acceptance_test_logger.info("\n--- Scenario 5: A lightly edited repost reuses the cached embedding ---")
+        mock_supabase_client_for_embeddings.table.return_value.select.return_value.in_.return_value.execute.return_value.data = []
+
+        original = self.sample_articles[0]["content"]
+        create_and_store_embedding(article_id=1, content=original)
+        create_and_store_embedding(article_id=3, content=original + " .")
+
+        # Only the original content went to OpenAI
+        self.assertEqual(self.fake_openai.calls, [original])
+        inserted = [c[0][0] for c in mock_supabase_client_for_embeddings.table.return_value.insert.call_args_list]
+        self.assertEqual([row["SourceArticle"] for row in inserted], [1, 3])
+        self.assertEqual(inserted[0]["embedding"], inserted[1]["embedding"])
+        acceptance_test_logger.info("--- Test Scenario 5 Complete ---")
+
+    @patch('src.core.utils.create_embeddings.supabase_client', new_callable=MagicMock)
+    def test_duplicate_content_is_embedded_once(self, mock_supabase_client_for_embeddings):
+        acceptance_test_logger.info("\n--- Scenario 3: Syndicated articles share one embedding request input ---")
+        mock_supabase_client_for_embeddings.table.return_value.select.return_value.in_.return_value.execute.return_value.data = []
+
+        shared = self.sample_articles[0]["content"]
+        stored_ids = create_and_store_embeddings_batch([{"id": 1, "content": shared}, {"id": 3, "content": shared}])
+
+        self.assertEqual(self.fake_openai.calls, [[shared]])
+        # The single vector is fanned out to both articles
+        self.assertEqual(stored_ids, [1, 3])
+        rows = mock_supabase_client_for_embeddings.table.return_value.insert.call_args_list[-1][0][0]
+        self.assertEqual([row["SourceArticle"] for row in rows], [1, 3])
+        self.assertEqual(rows[0]["embedding"], rows[1]["embedding"])
+        acceptance_test_logger.info("--- Test Scenario 3 Complete ---")
+
+    @patch('src.core.utils.create_embeddings.supabase_client', new_callable=MagicMock)
+    async def test_concurrent_single_article_embeddings(self, mock_supabase_client_for_embeddings):
+        acceptance_test_logger.info("\n--- Scenario 4: Concurrent per-article embedding with OpenAI failures ---")
+        self.fake_openai.fail_on = self._FAIL_RE
+        self.fake_openai.fail_with = APIConnectionError(message="Simulated OpenAI Connection Error", request=MagicMock())
+        mock_supabase_client_for_embeddings.table.return_value.select.return_value.in_.return_value.execute.return_value.data = []
+        inserted_by_id = {}
+        def capture_insert(data):
+            inserted_by_id[data["SourceArticle"]] = data
+            return MagicMock()
+        mock_supabase_client_for_embeddings.table.return_value.insert.side_effect = capture_insert
+
+        # Drive all four articles at once, the way the pipeline's worker threads do
+        await asyncio.gather(*[
+            asyncio.to_thread(create_and_store_embedding, article_id=a["id"], content=a["content"])
+            for a in self.sample_articles
+        ])
+
+        # Completion order is not deterministic, so compare sets
+        self.assertEqual(inserted_by_id.keys(), {1, 3})
+        self.assertEqual(
+            set(self.fake_openai.calls),
+            {a["content"] for a in self.sample_articles}
+        )
+        acceptance_test_logger.info("--- Test Scenario 4 Complete ---")
+
 if __name__ == '__main__':
     # This allows running the test directly.
     # In a real CI/CD, you'd use 'python -m unittest discover tests/acceptance'
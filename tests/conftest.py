@@ -0,0 +1,185 @@
+"""
+Shared pytest fixtures for the test suite.
+"""
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+from collections import namedtuple
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+# Make the project root importable (``src.…``) once per session
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+# Plain stand-ins for the OpenAI embeddings response; much cheaper than MagicMock
+EmbResp = namedtuple("EmbResp", "data")
+EmbItem = namedtuple("EmbItem", "embedding")
+
+
+class FakeAsyncBatch:
+    """
+    Stand-in for the OpenAI Batch API, with files/batches namespaces shaped like the real client.
+    ``submit(requests)`` embeds the request lines of an uploaded JSONL file and returns a job id;
+    ``poll(job_id)`` returns ``(status, results)`` and reports every job as completed immediately.
+    Requests whose input matches the owning FakeOpenAI's ``fail_on`` get a 400 result.
+    """
+
+    def __init__(self, client: "FakeOpenAI"):
+        self.client = client
+        self.submitted: List[List[str]] = []
+        self._files: Dict[str, bytes] = {}
+        self._results: Dict[str, List[dict]] = {}
+        self.files = SimpleNamespace(create=self._create_file, content=self._file_content)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve_batch)
+
+    def submit(self, requests: List[dict]) -> str:
+        job_id = f"batch_{len(self._results)}"
+        self.submitted.append([request["body"]["input"] for request in requests])
+        fail_on = self.client.fail_on
+        results = []
+        for request in requests:
+            if fail_on is not None and fail_on(request["body"]["input"]):
+                response = {"status_code": 400, "body": {"error": {"message": "Simulated batch request failure"}}}
+            else:
+                response = {"status_code": 200, "body": {"data": [{"embedding": self.client.embedding}]}}
+            results.append({"custom_id": request["custom_id"], "response": response, "error": None})
+        self._results[job_id] = results
+        return job_id
+
+    def poll(self, job_id: str):
+        return "completed", self._results[job_id]
+
+    def _create_file(self, file, purpose: str) -> SimpleNamespace:
+        file_id = f"file_{len(self._files)}"
+        self._files[file_id] = file[1]
+        return SimpleNamespace(id=file_id)
+
+    def _file_content(self, file_id: str) -> SimpleNamespace:
+        return SimpleNamespace(text=self._files[file_id].decode("utf-8"))
+
+    def _create_batch(self, input_file_id: str, endpoint: str, completion_window: str) -> SimpleNamespace:
+        lines = self._files[input_file_id].decode("utf-8").splitlines()
+        job_id = self.submit([json.loads(line) for line in lines])
+        return SimpleNamespace(id=job_id, status="validating", output_file_id=None)
+
+    def _retrieve_batch(self, job_id: str) -> SimpleNamespace:
+        status, results = self.poll(job_id)
+        output_file_id = f"{job_id}_output"
+        self._files[output_file_id] = "\n".join(json.dumps(result) for result in results).encode("utf-8")
+        return SimpleNamespace(id=job_id, status=status, output_file_id=output_file_id)
+
+
+class FakeOpenAI:
+    """
+    Hand-written stand-in for the OpenAI client used by create_embeddings.
+    ``embeddings.create`` is a plain method that records every ``input`` in ``calls``
+    and returns ``embedding`` for each input. If ``fail_on`` matches any input,
+    ``fail_with`` is raised instead. ``files`` and ``batches`` go to a FakeAsyncBatch (``batch_api``).
+    """
+
+    def __init__(self, embedding: Optional[List[float]] = None):
+        self.api_key = "fake_key_for_test"
+        self.embedding = embedding if embedding is not None else [0.1, 0.2, 0.3, 0.4, 0.5]
+        self.fail_on: Optional[Callable[[str], Any]] = None
+        self.fail_with: Optional[Exception] = None
+        self.calls: List[Any] = []
+        self.embeddings = SimpleNamespace(create=self._create)
+        self.batch_api = FakeAsyncBatch(self)
+        self.files = self.batch_api.files
+        self.batches = self.batch_api.batches
+
+    def _create(self, model: str, input: Any, encoding_format: str = "float") -> EmbResp:
+        self.calls.append(input)
+        inputs = [input] if isinstance(input, str) else input
+        if self.fail_on is not None and any(self.fail_on(text) for text in inputs):
+            raise self.fail_with
+        item = EmbItem(embedding=self.embedding)
+        return EmbResp(data=[item] * len(inputs))
+
+
+@pytest.fixture(scope="session")
+def project_paths():
+    """Repository root and its scripts directory, resolved once per session."""
+    return SimpleNamespace(root=PROJECT_ROOT, scripts=os.path.join(PROJECT_ROOT, "scripts"))
+
+
+@pytest.fixture(autouse=True)
+def lock_path(tmp_path, monkeypatch):
+    """
+    Lock file in the test's own tmp_path, so tests running in parallel (pytest-xdist) never
+    create or delete each other's lock. It is patched into every loaded copy of lock_manager
+    (the pipeline scripts import it as ``core.utils`` or ``src.core.utils`` depending on the
+    environment) and exported as PIPELINE_LOCK_FILE for subprocesses. Autouse, so every test
+    starts without a lock; request it to get the path.
+    """
+    from src.core.utils import lock_manager
+
+    path = tmp_path / lock_manager.LOCK_FILE_NAME
+    for module_name in ("src.core.utils.lock_manager", "core.utils.lock_manager"):
+        module = sys.modules.get(module_name)
+        if module is not None:
+            monkeypatch.setattr(module, "LOCK_FILE_PATH", str(path))
+    monkeypatch.setenv("PIPELINE_LOCK_FILE", str(path))
+    return path
+
+
+@pytest.fixture
+def run_pipeline_inproc():
+    """
+    Run an async pipeline entry point in-process, capturing its output like a subprocess run.
+    ``run_pipeline_inproc(module.main, *args)`` returns a namespace with ``returncode``,
+    ``stdout`` and ``stderr``; a SystemExit becomes the return code.
+    """
+    def run(main, *args) -> SimpleNamespace:
+        stdout, stderr = io.StringIO(), io.StringIO()
+        returncode = 0
+        with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+            try:
+                asyncio.run(main(*args))
+            except SystemExit as e:
+                returncode = e.code if isinstance(e.code, int) else int(e.code is not None)
+        return SimpleNamespace(returncode=returncode, stdout=stdout.getvalue(), stderr=stderr.getvalue())
+    return run
+
+
+@pytest.fixture(scope="session")
+def clustering_modules():
+    """
+    The clustering modules, imported once per session as a namespace with ``db_access``,
+    ``cluster_manager`` and ``cluster_articles``. Module identity is shared across tests,
+    so tests patch attributes with the function-scoped monkeypatch rather than reloading.
+    """
+    from src.core.clustering import cluster_manager, db_access
+    from src.modules.clustering import cluster_articles
+
+    return SimpleNamespace(db_access=db_access, cluster_manager=cluster_manager, cluster_articles=cluster_articles)
+
+
+@pytest.fixture
+def use_fake_sb(monkeypatch):
+    """
+    Install a fake Supabase client as the clustering db_access module's ``sb``.
+    The module is imported once rather than reloaded under a stubbed ``supabase`` package;
+    ``use_fake_sb(fake)`` patches ``sb`` for the current test and returns the module.
+    """
+    from src.core.clustering import db_access
+
+    def install(fake_sb):
+        monkeypatch.setattr(db_access, "sb", fake_sb)
+        return db_access
+    return install
+
+
+@pytest.fixture(autouse=True)
+def fake_openai(monkeypatch):
+    """Replace the module-level OpenAI client in create_embeddings with a FakeOpenAI."""
+    fake = FakeOpenAI()
+    monkeypatch.setattr("src.core.utils.create_embeddings.openai_client_instance", fake)
+    return fake
@@ -0,0 +1,161 @@
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock
+import sys
+import os
+
+# Adjust path to import module from parent directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.modules.processing.article_processor import process_article, process_articles_pipelined
+
+MODULE = 'src.modules.processing.article_processor'
+
+
+def _cleaned(content):
+    return {"title": "Title", "publication_date": "", "author": "Author", "main_content": content}
+
+
+def _embed(articles):
+    return [[3.0, 4.0] for _ in articles]
+
+
+def _stored_ids(mock_store):
+    return [row["SourceArticle"] for call in mock_store.call_args_list for row in call.args[0]]
+
+
+class TestProcessArticlesPipelined(unittest.IsolatedAsyncioTestCase):
+
+    @patch(f'{MODULE}.create_crawler')
+    @patch(f'{MODULE}.store_embeddings_batch', return_value=True)
+    @patch(f'{MODULE}.create_embeddings_batch', side_effect=_embed)
+    @patch(f'{MODULE}.update_article_in_db', return_value=True)
+    @patch(f'{MODULE}.analyze_content_type', return_value={"content_type": "news_article", "confidence": 0.9, "reasoning": "ok"})
+    @patch(f'{MODULE}.extract_content_with_llm', side_effect=_cleaned)
+    @patch(f'{MODULE}.extract_main_content', new_callable=AsyncMock)
+    async def test_results_follow_input_order(self, mock_extract, mock_llm, mock_analyze, mock_update, mock_embed, mock_store, mock_crawler):
+        """Every article runs through all stages and results keep input order."""
+        mock_extract.side_effect = lambda url, crawler=None: f"content for {url}"
+        articles = [{"id": i, "url": f"https://example.com/{i}"} for i in range(1, 6)]
+
+        results = await process_articles_pipelined(articles, extract_workers=3, llm_workers=2, db_workers=1)
+
+        self.assertEqual(results, [1, 2, 3, 4, 5])
+        self.assertEqual(mock_extract.await_count, 5)
+        self.assertEqual(mock_update.call_count, 5)
+        embedded = [article["id"] for call in mock_embed.call_args_list for article in call.args[0]]
+        self.assertEqual(sorted(embedded), [1, 2, 3, 4, 5])
+        self.assertEqual(sorted(_stored_ids(mock_store)), [1, 2, 3, 4, 5])
+        self.assertEqual(mock_store.call_args_list[0].args[0][0]["embedding"], [0.6, 0.8])
+        # A single crawler is opened and shared by all extract workers
+        mock_crawler.assert_called_once_with()
+        shared = mock_crawler.return_value.__aenter__.return_value
+        for call in mock_extract.await_args_list:
+            self.assertIs(call.kwargs["crawler"], shared)
+        mock_update.assert_any_call(3, {
+            "contentType": "news_article",
+            "Content": "content for https://example.com/3",
+            "Author": "Author",
+            "isProcessed": True
+        })
+
+    @patch(f'{MODULE}.create_crawler')
+    @patch(f'{MODULE}.store_embeddings_batch', return_value=True)
+    @patch(f'{MODULE}.create_embeddings_batch', side_effect=_embed)
+    @patch(f'{MODULE}.update_article_in_db')
+    @patch(f'{MODULE}.analyze_content_type', return_value={"content_type": "news_article", "confidence": 0.9, "reasoning": "ok"})
+    @patch(f'{MODULE}.extract_content_with_llm', side_effect=_cleaned)
+    @patch(f'{MODULE}.extract_main_content', new_callable=AsyncMock, return_value="some content")
+    async def test_failures_are_reported_as_none(self, mock_extract, mock_llm, mock_analyze, mock_update, mock_embed, mock_store, mock_crawler):
+        """Missing URLs and failed DB updates yield None without stopping the other articles."""
+        mock_update.side_effect = lambda article_id, data: article_id != 2
+        articles = [
+            {"id": 1, "url": "https://example.com/1"},
+            {"id": 2, "url": "https://example.com/2"},
+            {"id": 3, "url": ""},
+        ]
+
+        results = await process_articles_pipelined(articles)
+
+        self.assertEqual(results, [1, None, None])
+        self.assertEqual(mock_extract.await_count, 2)
+        mock_embed.assert_called_once_with([{"id": 1, "content": "some content"}])
+        self.assertEqual(_stored_ids(mock_store), [1])
+
+    @patch(f'{MODULE}.create_crawler')
+    @patch(f'{MODULE}.store_embeddings_batch', return_value=True)
+    @patch(f'{MODULE}.create_embeddings_batch')
+    @patch(f'{MODULE}.update_article_in_db', return_value=True)
+    @patch(f'{MODULE}.analyze_content_type', return_value={"content_type": "news_article", "confidence": 0.9, "reasoning": "ok"})
+    @patch(f'{MODULE}.extract_content_with_llm', side_effect=_cleaned)
+    @patch(f'{MODULE}.extract_main_content', new_callable=AsyncMock)
+    async def test_embedding_starts_before_crawling_finishes(self, mock_extract, mock_llm, mock_analyze, mock_update, mock_embed, mock_store, mock_crawler):
+        """The embedding stage works on early articles while later ones are still being crawled."""
+        events = []
+
+        def embed(articles):
+            events.append(("embed", [article["id"] for article in articles]))
+            return _embed(articles)
+
+        async def extract(url, crawler=None):
+            if url.endswith("/3"):
+                # Hold the last crawl until an earlier article has been embedded
+                for _ in range(500):
+                    if any(name == "embed" for name, _ in events):
+                        break
+                    await asyncio.sleep(0.01)
+            events.append(("extracted", url))
+            return f"content for {url}"
+
+        mock_embed.side_effect = embed
+        mock_extract.side_effect = extract
+        articles = [{"id": i, "url": f"https://example.com/{i}"} for i in range(1, 4)]
+
+        results = await process_articles_pipelined(articles, extract_workers=1, embed_batch_size=2)
+
+        self.assertEqual(results, [1, 2, 3])
+        first_embed = next(i for i, (name, _) in enumerate(events) if name == "embed")
+        self.assertLess(first_embed, events.index(("extracted", "https://example.com/3")))
+        self.assertTrue(all(len(ids) <= 2 for name, ids in events if name == "embed"))
+
+    @patch(f'{MODULE}.create_crawler')
+    @patch(f'{MODULE}.store_embeddings_batch', return_value=True)
+    @patch(f'{MODULE}.create_embeddings_batch', side_effect=_embed)
+    @patch(f'{MODULE}.update_article_in_db', return_value=True)
+    @patch(f'{MODULE}.analyze_content_type', return_value={"content_type": "news_article", "confidence": 0.9, "reasoning": "ok"})
+    @patch(f'{MODULE}.extract_content_with_llm', side_effect=_cleaned)
+    @patch(f'{MODULE}.extract_main_content', new_callable=AsyncMock)
+    async def test_embedding_requests_respect_token_budget(self, mock_extract, mock_llm, mock_analyze, mock_update, mock_embed, mock_store, mock_crawler):
+        """Long articles are split across requests even when embed_batch_size would allow more."""
+        # ~5000 tokens each, so no two fit in one request
+        mock_extract.side_effect = lambda url, crawler=None: url[-1] * 20000
+        articles = [{"id": i, "url": f"https://example.com/{i}"} for i in range(1, 4)]
+
+        results = await process_articles_pipelined(articles, embed_batch_size=10)
+
+        self.assertEqual(results, [1, 2, 3])
+        self.assertEqual([len(call.args[0]) for call in mock_embed.call_args_list], [1, 1, 1])
+
+    async def test_rejects_invalid_embed_batch_size(self):
+        with self.assertRaises(ValueError):
+            await process_articles_pipelined([], embed_batch_size=0)
+
+    async def test_rejects_empty_worker_pool(self):
+        with self.assertRaises(ValueError):
+            await process_articles_pipelined([], llm_workers=0)
+
+    @patch(f'{MODULE}.create_and_store_embedding')
+    @patch(f'{MODULE}.update_article_in_db', return_value=True)
+    @patch(f'{MODULE}.analyze_content_type', return_value={"content_type": "news_article", "confidence": 0.9, "reasoning": "ok"})
+    @patch(f'{MODULE}.extract_content_with_llm', side_effect=_cleaned)
+    @patch(f'{MODULE}.extract_main_content', new_callable=AsyncMock, return_value="some content")
+    async def test_process_article_decodes_url(self, mock_extract, mock_llm, mock_analyze, mock_update, mock_embed):
+        """The single-article path still composes the same stages."""
+        result = await process_article({"id": 7, "url": "example.com%2Fstory"})
+
+        self.assertEqual(result, 7)
+        mock_extract.assert_awaited_once_with("https://www.example.com/story", crawler=None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,40 +1,41 @@
 import os
 import sys
 from types import SimpleNamespace
-from unittest import mock
+
+import pytest
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
-db_access = None
+# Imported once per session; the module tolerates missing credentials and each test swaps in its own client
+from src.core.clustering import db_access as db_module
 
 class DummyTable:
     def __init__(self, data):
         self.data = data
         self.upsert_calls = []
         self.update_calls = []
-        self.delete_filters = []
-    def select(self, *args, **kwargs):
-        return self
-    @property
-    def not_(self):
-        return self
-    def is_(self, *args, **kwargs):
-        return self
-    def eq(self, *args, **kwargs):
-        return self
-    def in_(self, *args):
-        self.delete_filters.append(args)
+        # in_ filters tagged with the operation they narrow: ("update" | "delete", column, values)
+        self.in_filters = []
+        self._operation = None
+        # Builder steps that record nothing are plain attributes returning the table
+        self.select = self.is_ = self.eq = lambda *args, **kwargs: self
+        self.not_ = self
+    def in_(self, column, values):
+        self.in_filters.append((self._operation, column, values))
         return self
     def update(self, data):
+        self._operation = "update"
         self.update_calls.append(data)
         return self
     def delete(self):
-        self.delete_called = True
+        self._operation = "delete"
         return self
     def upsert(self, data, on_conflict=None):
+        self._operation = "upsert"
         self.upsert_calls.append((data, on_conflict))
         return self
     def execute(self):
+        self._operation = None
         return SimpleNamespace(data=self.data)
 
 class DummySB:
@@ -46,7 +47,8 @@ class DummySB:
     def table(self, name):
         return self.tables[name]
 
-def test_recalculate_member_counts_batch(monkeypatch):
+@pytest.fixture
+def dummy_sb():
     clusters = [
         {"cluster_id": "c1", "member_count": 1},
         {"cluster_id": "c2", "member_count": 5},
@@ -58,22 +60,21 @@ def test_recalculate_member_counts_batch(monkeypatch):
         {"id": 4, "cluster_id": "c3"},
         {"id": 5, "cluster_id": "c3"},
     ]
-    dummy = DummySB(clusters, articles)
+    return DummySB(clusters, articles)
 
-    monkeypatch.setitem(sys.modules, "supabase", mock.MagicMock(create_client=lambda u, k: dummy))
-    monkeypatch.setenv("SUPABASE_URL", "http://x")
-    monkeypatch.setenv("SUPABASE_KEY", "y")
+@pytest.fixture
+def db_access(monkeypatch, dummy_sb):
+    monkeypatch.setattr(db_module, "sb", dummy_sb)
+    return db_module
 
-    import importlib
-    import src.core.clustering.db_access as db_module
-    db_access = importlib.reload(db_module)
-    monkeypatch.setattr(db_access, "sb", dummy)
+def test_recalculate_member_counts_batch(db_access, dummy_sb):
+    dummy = dummy_sb
 
     discrepancies = db_access.recalculate_cluster_member_counts()
 
     upserts = dummy.tables["clusters"].upsert_calls
     updates = dummy.tables["clusters"].update_calls
-    deletes = dummy.tables["clusters"].delete_filters
+    filters = dummy.tables["clusters"].in_filters
     article_updates = dummy.tables["SourceArticles"].update_calls
 
     # Check that c3 was upserted (new cluster) and c2 was updated (existing cluster)
@@ -81,6 +82,39 @@ def test_recalculate_member_counts_batch(monkeypatch):
     assert upserts[0][0][0]["cluster_id"] == "c3"
     assert len(updates) == 1
     assert updates[0]["member_count"] == 2  # c2 count updated from 5 to 2
-    assert any("cluster_id" in d[0] and "c1" in d[1] for d in deletes)
+    assert ("delete", "cluster_id", ["c1"]) in filters
+    assert ("update", "cluster_id", ["c2"]) in filters
     assert article_updates and article_updates[0] == {"cluster_id": None}
+    assert dummy.tables["SourceArticles"].in_filters == [("update", "cluster_id", ["c1"])]
     assert discrepancies.get("c2") == (5, 2)
+
+def test_recalculate_groups_updates_by_count(db_access, dummy_sb):
+    dummy_sb.tables["clusters"].data = [
+        {"cluster_id": "c2", "member_count": 5},
+        {"cluster_id": "c3", "member_count": 4},
+        {"cluster_id": "c4", "member_count": 2},
+    ]
+
+    db_access.recalculate_cluster_member_counts()
+
+    clusters = dummy_sb.tables["clusters"]
+    # c2 and c3 both drop to 2 members and share one update
+    assert clusters.update_calls == [{"member_count": 2}]
+    # Single-member c1 and memberless c4 go in one delete
+    assert clusters.in_filters == [
+        ("delete", "cluster_id", ["c1", "c4"]),
+        ("update", "cluster_id", ["c2", "c3"]),
+    ]
+    assert clusters.upsert_calls == []
+
+def test_recalculate_chunks_in_filters(db_access, dummy_sb, monkeypatch):
+    monkeypatch.setattr(db_access, "IN_FILTER_CHUNK_SIZE", 2)
+    dummy_sb.tables["clusters"].data = [
+        {"cluster_id": f"e{i}", "member_count": 3} for i in range(5)
+    ]
+
+    db_access.recalculate_cluster_member_counts()
+
+    deletes = [values for op, _, values in dummy_sb.tables["clusters"].in_filters if op == "delete"]
+    # c1 (single member) and the five memberless clusters, two ids per request
+    assert deletes == [["c1", "e0"], ["e1", "e2"], ["e3", "e4"]]
@@ -0,0 +1,98 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import json
+import sys
+import os
+
+# Adjust path to import module from parent directory
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src')))
+
+from src.modules.extraction import cleanContent
+from src.modules.extraction.cleanContent import content_defined_chunks, extract_content_with_llm
+
+MODULE = 'src.modules.extraction.cleanContent'
+
+BOILERPLATE = "\n".join(f"Team intro line {i} about the franchise history." for i in range(40))
+
+
+def _fake_client():
+    """OpenAI-style client returning canned JSON for head, single-chunk and batched prompts."""
+    client = MagicMock()
+
+    def create(model, messages, response_format):
+        prompt = messages[-1]["content"]
+        if '"blocks"' in prompt:
+            count = prompt.count("\nBlock ")
+            payload = {"blocks": [f"body {i}" for i in range(count)]}
+        elif "Continue extracting" in prompt:
+            payload = {"main_content": "body"}
+        else:
+            payload = {"title": "A long enough title", "publication_date": "", "author": "Reporter", "main_content": "head"}
+        response = MagicMock()
+        response.choices[0].message.content = json.dumps(payload)
+        return response
+
+    client.chat.completions.create.side_effect = create
+    return client
+
+
+class TestContentDefinedChunks(unittest.TestCase):
+
+    def test_chunks_reassemble_to_input(self):
+        text = "Intro\n\n" + BOILERPLATE + "\nClosing line"
+        self.assertEqual("\n".join(content_defined_chunks(text)), text)
+
+    def test_shared_lines_produce_identical_chunks_at_any_position(self):
+        """Boilerplate yields the same chunks whether it opens or follows other text."""
+        alone = set(content_defined_chunks(BOILERPLATE))
+        shifted = set(content_defined_chunks("Breaking news paragraph.\nAnother unique line.\n" + BOILERPLATE))
+        self.assertGreater(len(alone), 1)
+        self.assertGreater(len(alone & shifted), len(alone) // 2)
+
+
+class TestChunkCache(unittest.TestCase):
+
+    def setUp(self):
+        cleanContent._chunk_cache.clear()
+        self.addCleanup(cleanContent._chunk_cache.clear)
+
+    @patch.dict(os.environ, {"LLM_MAX_TOKENS": "2100"})
+    @patch(f'{MODULE}.num_tokens', side_effect=lambda text, model: len(text.split()))
+    def test_shared_chunks_are_not_resent(self, mock_tokens):
+        """Repeated content is served from the chunk cache instead of the LLM."""
+        client = _fake_client()
+        with patch(f'{MODULE}.get_llm_client', return_value=(client, "gpt-5-nano")):
+            first = extract_content_with_llm("Story one headline\n" + BOILERPLATE)
+            calls_after_first = client.chat.completions.create.call_count
+            second = extract_content_with_llm("Story one headline\n" + BOILERPLATE)
+
+        self.assertEqual(first, second)
+        self.assertEqual(first["title"], "A long enough title")
+        # The metadata window holds about 100 tokens, so the body chunks take further requests
+        self.assertGreater(calls_after_first, 1)
+        self.assertEqual(client.chat.completions.create.call_count, calls_after_first)
+
+    @patch(f'{MODULE}.num_tokens', side_effect=lambda text, model: len(text.split()))
+    def test_short_article_takes_one_request(self, mock_tokens):
+        """An article within the token budget is extracted with the metadata prompt alone."""
+        client = _fake_client()
+        with patch(f'{MODULE}.get_llm_client', return_value=(client, "gpt-5-nano")):
+            extract_content_with_llm("Story one headline\n" + BOILERPLATE)
+
+        client.chat.completions.create.assert_called_once()
+        self.assertIn("Team intro line 39", client.chat.completions.create.call_args.kwargs["messages"][-1]["content"])
+
+    @patch(f'{MODULE}.num_tokens', side_effect=lambda text, model: len(text.split()))
+    def test_shared_opening_does_not_share_metadata(self, mock_tokens):
+        """Articles that open with the same boilerplate each get their own metadata request."""
+        client = _fake_client()
+        with patch(f'{MODULE}.get_llm_client', return_value=(client, "gpt-5-nano")):
+            extract_content_with_llm(BOILERPLATE + "\nBy First Reporter, Mar 14, 2025")
+            extract_content_with_llm(BOILERPLATE + "\nBy Second Reporter, Apr 2, 2025")
+
+        prompts = [c.kwargs["messages"][-1]["content"] for c in client.chat.completions.create.call_args_list]
+        self.assertEqual(len(prompts), 2)
+        self.assertIn("Second Reporter", prompts[1])
+
+if __name__ == '__main__':
+    unittest.main()
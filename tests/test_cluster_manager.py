@@ -1,38 +1,30 @@
-import importlib
 import os
 import sys
 from types import SimpleNamespace
-from unittest import mock
 import numpy as np
 import pytest
 
 # Add src directory to path
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+_SRC_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if _SRC_PATH not in sys.path:
+    sys.path.insert(0, _SRC_PATH)
 
-# Ensure modules can be reloaded with patched dependencies
-@pytest.fixture(autouse=True)
-def _prepend_parent_dir_to_syspath(monkeypatch):
-    parent_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    monkeypatch.syspath_prepend(parent_dir)
 
+@pytest.fixture(scope="module")
+def cm_modules(clustering_modules):
+    """cluster_manager and db_access from the session-wide import; tests patch attributes via monkeypatch."""
+    return clustering_modules.cluster_manager, clustering_modules.db_access
 
-@pytest.fixture(autouse=True)
-def _patch_env(monkeypatch):
-    monkeypatch.setitem(sys.modules, "supabase", mock.MagicMock(create_client=lambda u, k: mock.Mock()))
-    monkeypatch.setenv("SUPABASE_URL", "http://x")
-    monkeypatch.setenv("SUPABASE_KEY", "y")
 
-
-
-def reload_modules(monkeypatch):
-    db_module = importlib.reload(importlib.import_module("src.core.clustering.db_access"))
+@pytest.fixture
+def modules(cm_modules, monkeypatch):
+    manager_module, db_module = cm_modules
     monkeypatch.setattr(db_module, "update_old_clusters_status", lambda: 0)
-    manager_module = importlib.reload(importlib.import_module("src.core.clustering.cluster_manager"))
     return manager_module, db_module
 
 
-def test_update_cluster(monkeypatch):
-    cm_mod, db_mod = reload_modules(monkeypatch)
+def test_update_cluster(modules, monkeypatch):
+    cm_mod, db_mod = modules
     updates = {}
     monkeypatch.setattr(cm_mod, "update_cluster_in_db", lambda cid, cent, cnt, isContent=False: updates.update(dict(cid=cid, centroid=cent, count=cnt, content=isContent)))
 
@@ -49,8 +41,8 @@ def test_update_cluster(monkeypatch):
     assert updates["content"] is False
 
 
-def test_create_cluster(monkeypatch):
-    cm_mod, db_mod = reload_modules(monkeypatch)
+def test_create_cluster(modules, monkeypatch):
+    cm_mod, db_mod = modules
     created = {}
     monkeypatch.setattr(cm_mod, "create_cluster_in_db", lambda cent, cnt: created.update(dict(centroid=cent, count=cnt)) or "cid123")
     manager = cm_mod.ClusterManager(check_old_clusters=False)
@@ -63,8 +55,8 @@ def test_create_cluster(monkeypatch):
     assert created["count"] == 2
 
 
-def test_find_best_cluster_match(monkeypatch):
-    cm_mod, _ = reload_modules(monkeypatch)
+def test_find_best_cluster_match(modules):
+    cm_mod, _ = modules
     manager = cm_mod.ClusterManager(similarity_threshold=0.5, check_old_clusters=False)
     manager.clusters = [
         ("c1", np.array([1.0,0.0], dtype=np.float32), 2),
@@ -75,8 +67,48 @@ def test_find_best_cluster_match(monkeypatch):
     assert result and result[0] == "c1"
 
 
-def test_find_best_pending_match_and_remove(monkeypatch):
-    cm_mod, _ = reload_modules(monkeypatch)
+def test_find_best_cluster_match_matches_pairwise(modules):
+    cm_mod, _ = modules
+    rng = np.random.default_rng(0)
+    manager = cm_mod.ClusterManager(similarity_threshold=0.2, check_old_clusters=False)
+    manager.clusters = [(f"c{i}", rng.normal(size=8).astype(np.float32), 2) for i in range(20)]
+    manager.add_cluster("zero", np.zeros(8, dtype=np.float32), 2)
+    for _ in range(10):
+        art_vec = rng.normal(size=8).astype(np.float32)
+        fast = manager.find_best_cluster_match(art_vec)
+        slow = manager._find_best_cluster_match_pairwise(art_vec)
+        assert (fast is None) == (slow is None)
+        if fast:
+            assert fast[0] == slow[0]
+            assert fast[3] == pytest.approx(slow[3], abs=1e-5)
+
+
+def test_cluster_matrix_follows_add_and_replace(modules):
+    cm_mod, _ = modules
+    manager = cm_mod.ClusterManager(similarity_threshold=0.5, check_old_clusters=False)
+    manager.clusters = [("c1", np.array([1.0, 0.0], dtype=np.float32), 2)]
+    assert manager.find_best_cluster_match(np.array([0.0, 1.0], dtype=np.float32)) is None
+    manager.add_cluster("c2", np.array([0.0, 1.0], dtype=np.float32), 2)
+    assert manager.find_best_cluster_match(np.array([0.1, 0.9], dtype=np.float32))[0] == "c2"
+    manager.replace_cluster("c1", np.array([0.0, 1.0], dtype=np.float32), 3)
+    manager.replace_cluster("c2", np.array([1.0, 0.0], dtype=np.float32), 3)
+    best = manager.find_best_cluster_match(np.array([0.1, 0.9], dtype=np.float32))
+    assert best[0] == "c1" and best[2] == 3
+
+
+def test_find_best_cluster_match_mixed_dimensions(modules):
+    cm_mod, _ = modules
+    manager = cm_mod.ClusterManager(similarity_threshold=0.5, check_old_clusters=False)
+    manager.clusters = [
+        ("c1", np.array([1.0, 0.0, 1.0, 0.0], dtype=np.float32), 2),
+        ("c2", np.array([0.0, 1.0], dtype=np.float32), 2),
+    ]
+    result = manager.find_best_cluster_match(np.array([0.9, 0.1], dtype=np.float32))
+    assert result and result[0] == "c1"
+
+
+def test_find_best_pending_match_and_remove(modules):
+    cm_mod, _ = modules
     manager = cm_mod.ClusterManager(similarity_threshold=0.5, check_old_clusters=False)
     manager.add_to_pending(1, np.array([1.0,0.0], dtype=np.float32))
     manager.add_to_pending(2, np.array([0.0,1.0], dtype=np.float32))
@@ -86,6 +118,38 @@ def test_find_best_pending_match_and_remove(monkeypatch):
     assert 1 not in manager.pending_articles
 
 
+
+def test_pending_matrix_matches_pairwise_through_adds_and_removes(modules):
+    cm_mod, _ = modules
+    rng = np.random.default_rng(1)
+    manager = cm_mod.ClusterManager(similarity_threshold=0.1, check_old_clusters=False)
+    # More than the initial capacity, so the matrix has to grow
+    for article_id in range(150):
+        manager.add_to_pending(article_id, rng.normal(size=6).astype(np.float32))
+    for article_id in range(0, 150, 3):
+        manager.remove_from_pending(article_id)
+    assert len(manager.pending_articles) == 100
+    for _ in range(10):
+        art_vec = rng.normal(size=6).astype(np.float32)
+        fast = manager.find_best_pending_match(art_vec)
+        slow = manager._find_best_pending_match_pairwise(art_vec)
+        assert (fast is None) == (slow is None)
+        if fast:
+            assert fast[0] == slow[0]
+            assert fast[2] == pytest.approx(slow[2], abs=1e-5)
+
+
+def test_find_best_pending_match_mixed_dimensions(modules):
+    cm_mod, _ = modules
+    manager = cm_mod.ClusterManager(similarity_threshold=0.5, check_old_clusters=False)
+    manager.add_to_pending(1, np.array([1.0, 0.0, 1.0, 0.0], dtype=np.float32))
+    manager.add_to_pending(2, np.array([0.0, 1.0], dtype=np.float32))
+    best = manager.find_best_pending_match(np.array([0.9, 0.1], dtype=np.float32))
+    assert best and best[0] == 1
+    manager.remove_from_pending(1)
+    manager.remove_from_pending(2)
+    assert manager.find_best_pending_match(np.array([0.9, 0.1], dtype=np.float32)) is None
+
 class DummyTable:
     def __init__(self, data=None):
         self.data = data or []
@@ -111,8 +175,8 @@ class DummySB:
         return self.tables[name]
 
 
-def test_check_and_merge_similar_clusters(monkeypatch):
-    cm_mod, db_mod = reload_modules(monkeypatch)
+def test_check_and_merge_similar_clusters(modules, monkeypatch):
+    cm_mod, db_mod = modules
     dummy_sb = DummySB([{"id": 10}])
     monkeypatch.setattr(db_mod, "sb", dummy_sb)
     updates = []
@@ -132,8 +196,31 @@ def test_check_and_merge_similar_clusters(monkeypatch):
     assert assignments == [(10, "c1")]
 
 
-def test_update_cluster_statuses(monkeypatch):
-    cm_mod, db_mod = reload_modules(monkeypatch)
+def test_check_and_merge_merges_first_similar_pair(modules, monkeypatch):
+    cm_mod, db_mod = modules
+    monkeypatch.setattr(db_mod, "sb", DummySB([]))
+    updates = []
+    monkeypatch.setattr(cm_mod, "update_cluster_in_db", lambda cid, cent, cnt, isContent=False: updates.append((cid, cnt)))
+    monkeypatch.setattr(cm_mod, "batch_assign_articles_to_cluster", lambda assigns: None)
+
+    manager = cm_mod.ClusterManager(check_old_clusters=False)
+    manager.clusters = [
+        ("c1", np.array([1.0, 0.0], dtype=np.float32), 3),
+        ("c2", np.array([0.0, 1.0], dtype=np.float32), 2),
+        ("c3", np.array([0.99, 0.01], dtype=np.float32), 2),
+        ("c4", np.array([0.01, 0.99], dtype=np.float32), 4),
+    ]
+    assert manager.check_and_merge_similar_clusters(merge_threshold=0.9)
+    assert updates == [("c1", 5)]
+    assert [cid for cid, _, _ in manager.clusters] == ["c1", "c2", "c4"]
+    # The next pass merges the other pair, c2 into the larger c4
+    assert manager.check_and_merge_similar_clusters(merge_threshold=0.9)
+    assert [cid for cid, _, _ in manager.clusters] == ["c1", "c4"]
+    assert not manager.check_and_merge_similar_clusters(merge_threshold=0.9)
+
+
+def test_update_cluster_statuses(modules, monkeypatch):
+    cm_mod, db_mod = modules
     monkeypatch.setattr(db_mod, "update_old_clusters_status", lambda: 5)
     manager = cm_mod.ClusterManager(check_old_clusters=False)
     result = manager.update_cluster_statuses()
@@ -1,41 +1,43 @@
-import importlib
-import sys
-import os
-from unittest import mock
+from types import SimpleNamespace
 import numpy as np
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+# Two similar 768-dimensional articles, generated once from a fixed seed directly as float32
+_RNG = np.random.default_rng(0)
+_BASE = _RNG.standard_normal(768, dtype=np.float32)
+_PERTURB = 0.1 * _RNG.standard_normal(768, dtype=np.float32)
+_ARTICLES = [(1, _BASE), (2, _BASE + _PERTURB)]
 
 
-def test_run_clustering_process_creates_cluster(monkeypatch):
-    # Fake supabase client to avoid real initialization
-    dummy_sb = mock.MagicMock()
-    # Make the resp.data iterable to avoid the Mock iteration error
-    dummy_resp = mock.MagicMock()
-    dummy_resp.data = []  # Empty list instead of Mock
-    dummy_sb.table.return_value.select.return_value.not_.return_value.execute.return_value = dummy_resp
-    
-    monkeypatch.setitem(sys.modules, "supabase", mock.MagicMock(create_client=lambda u, k: dummy_sb))
-    monkeypatch.setenv("SUPABASE_URL", "http://x")
-    monkeypatch.setenv("SUPABASE_KEY", "y")
+class DummyTable:
+    """Answers every select query with no rows."""
+    def select(self, *args, **kwargs):
+        return self
+    def not_(self, *args, **kwargs):
+        return self
+    def execute(self):
+        return SimpleNamespace(data=[])
+
+class DummySB:
+    def table(self, name):
+        return DummyTable()
 
-    # Reload modules with patched supabase
-    db_access = importlib.reload(importlib.import_module("src.core.clustering.db_access"))
+# Stateless, so one instance serves every test
+_DUMMY_SB = DummySB()
+
+
+def test_run_clustering_process_creates_cluster(monkeypatch, use_fake_sb, clustering_modules):
+    # Fake supabase client to avoid real initialization
+    db_access = use_fake_sb(_DUMMY_SB)
     
     # Properly mock the update_old_clusters_status to return a number
     def mock_update_old_clusters_status():
         return 0
     monkeypatch.setattr(db_access, "update_old_clusters_status", mock_update_old_clusters_status)
     
-    cluster_manager = importlib.reload(importlib.import_module("src.core.clustering.cluster_manager"))
-    cluster_articles = importlib.reload(importlib.import_module("src.modules.clustering.cluster_articles"))
+    cluster_manager = clustering_modules.cluster_manager
+    cluster_articles = clustering_modules.cluster_articles
 
-    # Use 768-dimensional vectors to match the expected dimensions
-    base_vector = np.random.random(768).astype(np.float32)
-    articles = [
-        (1, base_vector),
-        (2, base_vector + 0.1 * np.random.random(768).astype(np.float32)),  # Similar vector
-    ]
+    articles = _ARTICLES
 
     monkeypatch.setattr(db_access, "fetch_unclustered_articles", lambda: articles)
     monkeypatch.setattr(db_access, "fetch_existing_clusters", lambda: [])
@@ -8,7 +8,8 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../src'
 
 import httpx # Import httpx for mocking request/response
 
-from src.core.utils.create_embeddings import create_embedding, normalize_embedding, store_embedding, create_and_store_embedding
+from src.core.utils import create_embeddings
+from src.core.utils.create_embeddings import create_embedding, normalize_embedding, store_embedding, create_and_store_embedding, create_and_store_embeddings_batch
 from openai import APIError, APITimeoutError, RateLimitError, APIConnectionError, APIStatusError
 import numpy as np
 import logging # Import logging for logger type hint if needed
@@ -24,6 +25,9 @@ class TestCreateEmbeddingFunction(unittest.TestCase):
 
     def setUp(self):
         mock_module_logger.reset_mock()
+        create_embeddings._embedding_cache.clear()
+        create_embeddings._simhash_bands.clear()
+        create_embeddings._simhash_by_key.clear()
 
     def test_create_embedding_success(self, mock_openai_client_instance):
         """Test successful embedding creation."""
@@ -296,5 +300,228 @@ class TestCreateAndStoreEmbeddingFunction(unittest.TestCase):
         )
 
 
+@patch('src.core.utils.create_embeddings.logger', mock_module_logger)
+@patch('src.core.utils.create_embeddings.supabase_client')
+@patch('src.core.utils.create_embeddings.openai_client_instance')
+class TestCreateAndStoreEmbeddingsBatchFunction(unittest.TestCase):
+
+    def setUp(self):
+        mock_module_logger.reset_mock()
+        create_embeddings._embedding_cache.clear()
+        create_embeddings._simhash_bands.clear()
+        create_embeddings._simhash_by_key.clear()
+
+    @staticmethod
+    def _embed_inputs(*args, **kwargs):
+        response = MagicMock()
+        response.data = [MagicMock(embedding=[3.0, 4.0]) for _ in kwargs['input']]
+        return response
+
+    @staticmethod
+    def _split_tables(mock_supabase_client_instance):
+        """Give every Supabase table its own mock; nothing is in the EmbeddingCache table."""
+        tables = {}
+        def table(name):
+            if name not in tables:
+                tables[name] = MagicMock()
+                tables[name].select.return_value.in_.return_value.execute.return_value.data = []
+            return tables[name]
+        mock_supabase_client_instance.table.side_effect = table
+        return tables
+
+    def test_batches_respect_batch_size(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that articles are split into batches with one request each and stored with one insert."""
+        mock_openai_client_instance.embeddings.create.side_effect = self._embed_inputs
+        tables = self._split_tables(mock_supabase_client_instance)
+        articles = [{"id": i, "content": f"content {i}"} for i in range(1, 6)]
+
+        stored_ids = create_and_store_embeddings_batch(articles, batch_size=2)
+
+        self.assertEqual(stored_ids, [1, 2, 3, 4, 5])
+        inputs = [c.kwargs['input'] for c in mock_openai_client_instance.embeddings.create.call_args_list]
+        self.assertEqual(inputs, [["content 1", "content 2"], ["content 3", "content 4"], ["content 5"]])
+        tables["ArticleVector"].insert.assert_called_once_with(
+            [{"embedding": [0.6, 0.8], "SourceArticle": i} for i in range(1, 6)]
+        )
+
+    @patch('src.core.utils.create_embeddings.UPSERT_BATCH', 2)
+    def test_upserts_are_flushed_every_upsert_batch_rows(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that buffered rows are written once UPSERT_BATCH rows are pending."""
+        mock_openai_client_instance.embeddings.create.side_effect = self._embed_inputs
+        tables = self._split_tables(mock_supabase_client_instance)
+        articles = [{"id": i, "content": f"content {i}"} for i in range(1, 6)]
+
+        self.assertEqual(create_and_store_embeddings_batch(articles), [1, 2, 3, 4, 5])
+
+        inserted = [[row["SourceArticle"] for row in c.args[0]] for c in tables["ArticleVector"].insert.call_args_list]
+        self.assertEqual(inserted, [[1, 2], [3, 4], [5]])
+
+    def test_batches_respect_token_budget(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that a batch is closed before it would exceed the token budget."""
+        mock_openai_client_instance.embeddings.create.side_effect = self._embed_inputs
+        articles = [{"id": i, "content": str(i) * 16000} for i in range(1, 4)]
+
+        stored_ids = create_and_store_embeddings_batch(articles)
+
+        self.assertEqual(stored_ids, [1, 2, 3])
+        self.assertEqual(mock_openai_client_instance.embeddings.create.call_count, 3)
+
+    def test_short_batched_response_falls_back_to_single_requests(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that a batched response with fewer embeddings than inputs is retried one by one."""
+        def embed(*args, **kwargs):
+            response = MagicMock()
+            # Only ever one embedding, however many inputs were sent
+            response.data = [MagicMock(embedding=[3.0, 4.0])]
+            return response
+        mock_openai_client_instance.embeddings.create.side_effect = embed
+        tables = self._split_tables(mock_supabase_client_instance)
+        articles = [{"id": 1, "content": "first"}, {"id": 2, "content": "second"}]
+
+        self.assertEqual(create_and_store_embeddings_batch(articles), [1, 2])
+
+        self.assertEqual(mock_openai_client_instance.embeddings.create.call_count, 3)
+        tables["ArticleVector"].insert.assert_called_once()
+
+    @patch('src.core.utils.create_embeddings.EMBEDDING_CACHE_TABLE', "EmbeddingCache")
+    def test_cached_content_is_not_sent_again(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that repeated content is embedded once and later served from the cache."""
+        mock_openai_client_instance.embeddings.create.side_effect = self._embed_inputs
+        tables = self._split_tables(mock_supabase_client_instance)
+        articles = [{"id": 1, "content": "same"}, {"id": 2, "content": "same"}, {"id": 3, "content": "other"}]
+
+        self.assertEqual(create_and_store_embeddings_batch(articles), [1, 2, 3])
+        self.assertEqual(create_and_store_embeddings_batch(articles), [1, 2, 3])
+
+        mock_openai_client_instance.embeddings.create.assert_called_once()
+        self.assertEqual(mock_openai_client_instance.embeddings.create.call_args.kwargs['input'], ["same", "other"])
+        tables["EmbeddingCache"].upsert.assert_called_once()
+
+    @patch('src.core.utils.create_embeddings.EMBEDDING_CACHE_TABLE', "EmbeddingCache")
+    def test_persistent_cache_hit(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that an embedding found in the EmbeddingCache table skips OpenAI."""
+        key = create_embeddings._cache_key("stored content")
+        mock_supabase_client_instance.table.return_value.select.return_value.in_.return_value.execute.return_value.data = [
+            {"key": key, "vector": "[3.0, 4.0]"}
+        ]
+
+        self.assertEqual(create_and_store_embeddings_batch([{"id": 9, "content": "stored content"}]), [9])
+
+        mock_openai_client_instance.embeddings.create.assert_not_called()
+        mock_supabase_client_instance.table.assert_any_call("EmbeddingCache")
+        self.assertIn(key, create_embeddings._embedding_cache)
+
+    def test_persistent_cache_is_skipped_unless_configured(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that without EMBEDDING_CACHE_TABLE only the in-memory cache is used."""
+        mock_openai_client_instance.embeddings.create.side_effect = self._embed_inputs
+        tables = self._split_tables(mock_supabase_client_instance)
+
+        self.assertEqual(create_and_store_embeddings_batch([{"id": 1, "content": "fresh"}]), [1])
+
+        self.assertEqual(set(tables), {"ArticleVector"})
+
+    def test_near_duplicate_content_is_not_sent(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that content differing only in punctuation reuses the embedding, while new content does not."""
+        mock_openai_client_instance.embeddings.create.side_effect = self._embed_inputs
+        self._split_tables(mock_supabase_client_instance)
+        story = "The Chiefs beat the Bills in overtime after a late field goal forced the extra period."
+
+        create_and_store_embeddings_batch([{"id": 1, "content": story}])
+        create_and_store_embeddings_batch([
+            {"id": 2, "content": story.replace(".", "!")},
+            {"id": 3, "content": "Rookie quarterback named starter for the season opener."},
+        ])
+
+        inputs = [c.kwargs['input'] for c in mock_openai_client_instance.embeddings.create.call_args_list]
+        self.assertEqual(inputs, [[story], ["Rookie quarterback named starter for the season opener."]])
+
+    def test_simhash_distance(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that SimHash ignores punctuation and separates unrelated text."""
+        a = create_embeddings._simhash("Week 3 injury report: two starters ruled out.")
+        b = create_embeddings._simhash("week 3 injury report -- two starters ruled out")
+        c = create_embeddings._simhash("Trade deadline passes quietly across the league.")
+
+        self.assertEqual(a, b)
+        self.assertGreater((a ^ c).bit_count(), create_embeddings.SIMHASH_MAX_DISTANCE)
+        self.assertIsNone(create_embeddings._simhash("  ...  "))
+
+    def test_simhash_distance_is_clamped_to_band_guarantee(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that a configured SimHash distance the band index cannot honour is clamped."""
+        self.assertEqual(create_embeddings._bounded_simhash_distance(2), 2)
+        self.assertEqual(create_embeddings._bounded_simhash_distance(3), 3)
+        self.assertEqual(create_embeddings._bounded_simhash_distance(10), create_embeddings._SIMHASH_BANDS - 1)
+        mock_module_logger.warning.assert_called_once()
+
+    @patch('src.core.utils.create_embeddings.time.sleep')
+    def test_batch_api_job_is_polled_until_completed(self, mock_sleep, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that a Batch API job is polled until it completes and its output is stored."""
+        tables = self._split_tables(mock_supabase_client_instance)
+        key = create_embeddings._cache_key("backfill")
+        mock_openai_client_instance.batches.retrieve.side_effect = [
+            MagicMock(id="job", status="in_progress"),
+            MagicMock(id="job", status="completed", output_file_id="out"),
+        ]
+        mock_openai_client_instance.files.content.return_value.text = (
+            '{"custom_id": "%s", "response": {"status_code": 200, "body": {"data": [{"embedding": [3.0, 4.0]}]}}}' % key
+        )
+
+        stored_ids = create_and_store_embeddings_batch([{"id": 7, "content": "backfill"}], use_batch_api=True)
+
+        self.assertEqual(stored_ids, [7])
+        mock_sleep.assert_called_once_with(create_embeddings.EMBEDDING_BATCH_API_POLL_SECONDS)
+        self.assertEqual(mock_openai_client_instance.files.create.call_args.kwargs['purpose'], "batch")
+        mock_openai_client_instance.embeddings.create.assert_not_called()
+        tables["ArticleVector"].insert.assert_called_once_with([{"embedding": [0.6, 0.8], "SourceArticle": 7}])
+
+    def test_batch_api_job_failure_stores_nothing(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that a Batch API job ending in a non-completed status yields no embeddings."""
+        tables = self._split_tables(mock_supabase_client_instance)
+        mock_openai_client_instance.batches.retrieve.return_value = MagicMock(id="job", status="expired")
+
+        self.assertEqual(create_and_store_embeddings_batch([{"id": 7, "content": "backfill"}], use_batch_api=True), [])
+
+        mock_openai_client_instance.files.content.assert_not_called()
+        self.assertNotIn("ArticleVector", tables)
+
+    @patch('src.core.utils.create_embeddings.EMBEDDING_BATCH_API_MAX_REQUESTS', 2)
+    def test_batch_api_requests_are_split_into_jobs(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that more requests than one job may hold are submitted as several jobs."""
+        self._split_tables(mock_supabase_client_instance)
+        mock_openai_client_instance.batches.retrieve.return_value = MagicMock(id="job", status="completed", output_file_id=None)
+        articles = [{"id": i, "content": f"backfill {i}"} for i in range(1, 6)]
+
+        create_and_store_embeddings_batch(articles, use_batch_api=True)
+
+        uploads = [c.kwargs['file'][1].decode("utf-8").splitlines() for c in mock_openai_client_instance.files.create.call_args_list]
+        self.assertEqual([len(lines) for lines in uploads], [2, 2, 1])
+        self.assertEqual(mock_openai_client_instance.batches.create.call_count, 3)
+
+    @patch('src.core.utils.create_embeddings.EMBEDDING_BATCH_API_MAX_BYTES', 300)
+    def test_batch_api_jobs_respect_file_size_limit(self, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that a job's input file is kept within the Batch API size limit."""
+        lines = ["x" * 100, "y" * 100, "z" * 100]
+
+        groups = create_embeddings._split_batch_api_requests(lines)
+
+        self.assertEqual(groups, [["x" * 100, "y" * 100], ["z" * 100]])
+
+    @patch('src.core.utils.create_embeddings.time.sleep')
+    def test_batch_api_job_is_cancelled_after_max_wait(self, mock_sleep, mock_openai_client_instance, mock_supabase_client_instance):
+        """Test that a job still running after the maximum wait is cancelled and yields no embeddings."""
+        self._split_tables(mock_supabase_client_instance)
+        mock_openai_client_instance.batches.create.return_value = MagicMock(id="job")
+        mock_openai_client_instance.batches.retrieve.return_value = MagicMock(id="job", status="in_progress")
+
+        embeddings = create_embeddings.create_embeddings_via_batch_api([{"id": 7, "content": "backfill"}], max_wait=0)
+
+        self.assertEqual(embeddings, [None])
+        mock_openai_client_instance.batches.cancel.assert_called_once_with("job")
+        mock_sleep.assert_not_called()
+        mock_openai_client_instance.files.content.assert_not_called()
+
+    def test_invalid_batch_size(self, mock_openai_client_instance, mock_supabase_client_instance):
+        with self.assertRaises(ValueError):
+            create_and_store_embeddings_batch([], batch_size=0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -221,6 +221,34 @@ class TestExtractMainContent(unittest.IsolatedAsyncioTestCase): # Use IsolatedAs
         # Timeout is no longer dynamically adjusted in extractContent.py due to API limitations,
         # so we don't assert its change here. We've already asserted that a retry happened.
 
+    @patch('src.modules.extraction.extractContent.AsyncWebCrawler')
+    @patch('src.modules.extraction.extractContent.asyncio.sleep', new_callable=AsyncMock)
+    async def test_extract_content_reuses_shared_crawler(self, mock_sleep, MockAsyncWebCrawler):
+        """Test that a caller-provided crawler is used instead of starting a new one."""
+        shared_crawler = MagicMock()
+        expected_content = "Content fetched through the shared crawler session, comfortably over fifty chars."
+        shared_crawler.arun = AsyncMock(return_value=MockCrawl4aiResult(extracted_content=expected_content))
+
+        for url in ("http://example.com/one", "http://example.com/two"):
+            content = await extract_main_content(url, crawler=shared_crawler)
+            self.assertEqual(content, expected_content)
+
+        MockAsyncWebCrawler.assert_not_called()
+        self.assertEqual(shared_crawler.arun.call_count, 2)
+
+class TestLazyLLMClients(unittest.TestCase):
+
+    @patch('src.core.utils.LLM_init.initialize_llm_client', return_value=("client", "model"))
+    def test_clients_are_created_once_on_first_use(self, mock_init):
+        """Test that get_llm_client defers client creation to first use and shares the result."""
+        from src.core.utils.LLM_init import get_llm_client
+        get_llm_client.cache_clear()
+        self.addCleanup(get_llm_client.cache_clear)
+
+        self.assertEqual(get_llm_client("gpt-5-nano"), ("client", "model"))
+        self.assertEqual(get_llm_client("gpt-5-nano"), ("client", "model"))
+
+        mock_init.assert_called_once_with("gpt-5-nano")
 
 if __name__ == '__main__':
     unittest.main()
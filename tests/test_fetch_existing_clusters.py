@@ -1,7 +1,6 @@
 import os
 import sys
 from types import SimpleNamespace
-from unittest import mock
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
@@ -22,21 +21,14 @@ class DummySB:
         return self.tables[name]
 
 
-def test_fetch_existing_clusters_skips_null(monkeypatch):
+def test_fetch_existing_clusters_skips_null(use_fake_sb):
     clusters = [
         {"cluster_id": "c1", "centroid": None, "member_count": 2},
         {"cluster_id": "c2", "centroid": [0.1, 0.2], "member_count": 1},
     ]
 
     dummy = DummySB(clusters)
-    monkeypatch.setitem(sys.modules, "supabase", mock.MagicMock(create_client=lambda u, k: dummy))
-    monkeypatch.setenv("SUPABASE_URL", "http://x")
-    monkeypatch.setenv("SUPABASE_KEY", "y")
-
-    import importlib
-    import src.core.clustering.db_access as db_module
-    db_access = importlib.reload(db_module)
-    monkeypatch.setattr(db_access, "sb", dummy)
+    db_access = use_fake_sb(dummy)
 
     result = db_access.fetch_existing_clusters()
     assert len(result) == 1
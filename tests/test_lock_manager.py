@@ -1,58 +1,67 @@
+import importlib
 import unittest
 import os
 import sys
+from unittest.mock import patch
+
+import pytest
 
 # Add the parent directory to sys.path to allow imports from src.core.utils
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
 
-from src.core.utils.lock_manager import acquire_lock, release_lock, LOCK_FILE_PATH
+from src.core.utils import lock_manager
+from src.core.utils.lock_manager import acquire_lock, release_lock
 
 class TestLockManager(unittest.TestCase):
 
-    def setUp(self):
-        """Ensure the lock file does not exist before each test."""
-        if os.path.exists(LOCK_FILE_PATH):
-            os.remove(LOCK_FILE_PATH)
-
-    def tearDown(self):
-        """Ensure the lock file is cleaned up after each test."""
-        if os.path.exists(LOCK_FILE_PATH):
-            os.remove(LOCK_FILE_PATH)
+    @pytest.fixture(autouse=True)
+    def _isolated_lock(self, lock_path):
+        """Each test gets its own lock file (conftest's lock_path), which starts out absent."""
+        self.lock_path = lock_path
 
     def test_acquire_lock_success(self):
         """Test that acquire_lock returns True and creates the lock file."""
         self.assertTrue(acquire_lock(), "acquire_lock should return True when no lock exists.")
-        self.assertTrue(os.path.exists(LOCK_FILE_PATH), "Lock file should be created.")
+        self.assertTrue(self.lock_path.exists(), "Lock file should be created.")
 
     def test_acquire_lock_failure_if_already_locked(self):
         """Test that acquire_lock returns False if the lock file already exists."""
         # Create a dummy lock file
-        with open(LOCK_FILE_PATH, "w") as f:
-            f.write("locked")
+        self.lock_path.write_text("locked")
 
         self.assertFalse(acquire_lock(), "acquire_lock should return False when lock already exists.")
         # Ensure the dummy lock file is still there (acquire_lock shouldn't delete it)
-        self.assertTrue(os.path.exists(LOCK_FILE_PATH))
+        self.assertTrue(self.lock_path.exists())
 
     def test_release_lock_success(self):
         """Test that release_lock deletes the lock file."""
         # Create a dummy lock file
-        with open(LOCK_FILE_PATH, "w") as f:
-            f.write("locked")
+        self.lock_path.write_text("locked")
 
         release_lock()
-        self.assertFalse(os.path.exists(LOCK_FILE_PATH), "Lock file should be deleted by release_lock.")
+        self.assertFalse(self.lock_path.exists(), "Lock file should be deleted by release_lock.")
 
     def test_release_lock_no_error_if_not_exists(self):
         """Test that release_lock does not raise an error if the lock file does not exist."""
-        # Ensure lock file does not exist
-        if os.path.exists(LOCK_FILE_PATH):
-            os.remove(LOCK_FILE_PATH)
+        self.assertFalse(self.lock_path.exists())
 
         try:
             release_lock()
         except Exception as e:
             self.fail(f"release_lock raised an unexpected exception: {e}")
 
+    def test_lock_file_path_env_override(self):
+        """Test that PIPELINE_LOCK_FILE overrides the default lock file location."""
+        try:
+            with patch.dict(os.environ, {"PIPELINE_LOCK_FILE": "/tmp/custom_pipeline.lock"}):
+                importlib.reload(lock_manager)
+            self.assertEqual(lock_manager.LOCK_FILE_PATH, "/tmp/custom_pipeline.lock")
+        finally:
+            importlib.reload(lock_manager)
+        # The lock_path fixture exports this test's lock file as PIPELINE_LOCK_FILE
+        self.assertEqual(lock_manager.LOCK_FILE_PATH, str(self.lock_path))
+
 if __name__ == '__main__':
     unittest.main()
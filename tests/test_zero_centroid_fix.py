@@ -1,7 +1,6 @@
 import os
 import sys
 from types import SimpleNamespace
-from unittest import mock
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
@@ -30,7 +29,7 @@ class DummySB:
     def table(self, name):
         return self.tables[name]
 
-def test_repair_zero_centroid_clusters(monkeypatch):
+def test_repair_zero_centroid_clusters(monkeypatch, use_fake_sb):
     clusters = [
         {"cluster_id": "c1", "centroid": [0.0, 0.0, 0.0]},
         {"cluster_id": "c2", "centroid": [0.1, 0.2, 0.3]},
@@ -42,14 +41,7 @@ def test_repair_zero_centroid_clusters(monkeypatch):
     ]
 
     dummy = DummySB(clusters, articles)
-    monkeypatch.setitem(sys.modules, "supabase", mock.MagicMock(create_client=lambda u, k: dummy))
-    monkeypatch.setenv("SUPABASE_URL", "http://x")
-    monkeypatch.setenv("SUPABASE_KEY", "y")
-
-    import importlib
-    import src.core.clustering.db_access as db_module
-    db_access = importlib.reload(db_module)
-    monkeypatch.setattr(db_access, "sb", dummy)
+    db_access = use_fake_sb(dummy)
 
     updates = []
     def dummy_update(cid, centroid, count, isContent=False):
@@ -65,7 +57,7 @@ def test_repair_zero_centroid_clusters(monkeypatch):
     assert count == 2
     assert centroid == [0.5, 0.5, 0.0]
 
-def test_repair_null_centroid_clusters(monkeypatch):
+def test_repair_null_centroid_clusters(monkeypatch, use_fake_sb):
     clusters = [
         {"cluster_id": "c1", "centroid": None},
         {"cluster_id": "c2", "centroid": [0.1, 0.2, 0.3]},
@@ -76,14 +68,7 @@ def test_repair_null_centroid_clusters(monkeypatch):
     ]
 
     dummy = DummySB(clusters, articles)
-    monkeypatch.setitem(sys.modules, "supabase", mock.MagicMock(create_client=lambda u, k: dummy))
-    monkeypatch.setenv("SUPABASE_URL", "http://x")
-    monkeypatch.setenv("SUPABASE_KEY", "y")
-
-    import importlib
-    import src.core.clustering.db_access as db_module
-    db_access = importlib.reload(db_module)
-    monkeypatch.setattr(db_access, "sb", dummy)
+    db_access = use_fake_sb(dummy)
 
     updates = []
     def dummy_update(cid, centroid, count, isContent=False):